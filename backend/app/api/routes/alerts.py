@@ -1,35 +1,69 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
 
-from app.core.database import get_db
-from app.models.alerts import Alert
+from app.core.database import get_db, SessionLocal
+from app.models.alerts import Alert, Incident
 from app.services.alert_service import AlertService
-from app.schemas.alerts import AlertCreate, AlertResponse, AlertUpdate
+from app.services.alert_rules import AlertRuleEngine
+from app.core.config import settings
+from app.schemas.alerts import (
+    AlertCreate, AlertResponse, AlertUpdate, IncidentResponse, AlertSelection, BulkResolveRequest
+)
 
 router = APIRouter()
-alert_service = AlertService()
+# Shared with the other routers, so every alert goes through one notification queue
+alert_service = AlertService(SessionLocal)
+# Quality check and drift writers submit their results here
+alert_rules = AlertRuleEngine(
+    alert_service,
+    SessionLocal,
+    settings.alert_rules,
+    batch_size=settings.alert_rules_batch_size,
+    max_pending=settings.alert_rules_max_pending
+)
+
+@router.on_event("startup")
+async def start_notification_dispatcher():
+    db = SessionLocal()
+    try:
+        alert_service.counters.sync(db)
+    finally:
+        db.close()
+    alert_service.dispatcher.start()
+    alert_service.throttle.start()
+    alert_rules.start()
+
+@router.on_event("shutdown")
+async def stop_notification_dispatcher():
+    # Pending results raise their alerts, then held alerts are flushed into digests before the queue stops
+    alert_rules.stop()
+    alert_service.throttle.stop()
+    alert_service.dispatcher.stop()
+    alert_service.smtp_pool.close()
 
 @router.get("/", response_model=List[AlertResponse])
 async def get_alerts(
+    response: Response,
     severity: Optional[str] = None,
     alert_type: Optional[str] = None,
     is_resolved: Optional[bool] = None,
+    cursor: Optional[str] = None,
     limit: int = 50,
     db: Session = Depends(get_db)
 ):
-    """Get all alerts with optional filtering"""
-    query = db.query(Alert)
+    """Get alerts newest first with optional filtering
     
-    if severity:
-        query = query.filter(Alert.severity == severity)
-    if alert_type:
-        query = query.filter(Alert.alert_type == alert_type)
-    if is_resolved is not None:
-        query = query.filter(Alert.is_resolved == is_resolved)
-    
-    alerts = query.order_by(Alert.created_at.desc()).limit(limit).all()
+    When more alerts follow, the X-Next-Cursor header holds the cursor to
+    pass for the next page.
+    """
+    try:
+        alerts, next_cursor = alert_service.list_alerts(db, severity, alert_type, is_resolved, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     return [
         AlertResponse(
@@ -40,7 +74,10 @@ async def get_alerts(
             message=alert.message,
             source=alert.source,
             is_resolved=alert.is_resolved,
-            created_at=alert.created_at
+            created_at=alert.created_at,
+            occurrence_count=alert.occurrence_count or 1,
+            last_seen_at=alert.last_seen_at,
+            incident_id=alert.incident_id
         ) for alert in alerts
     ]
 
@@ -56,16 +93,16 @@ async def create_alert(
         title=alert_data.title,
         message=alert_data.message,
         source=alert_data.source,
-        metadata=alert_data.metadata
+        metadata_=alert_data.metadata
     )
     
-    db.add(alert)
-    db.commit()
-    db.refresh(alert)
+    # Repeats of an open alert are counted on it rather than stored and sent again
+    alert, notify = alert_service.record_alert(db, alert)
     
     # Send notification
     try:
-        alert_service.send_notification(alert)
+        if notify:
+            alert_service.send_notification(alert)
     except Exception as e:
         # Log error but don't fail the request
         print(f"Error sending notification: {e}")
@@ -78,9 +115,80 @@ async def create_alert(
         message=alert.message,
         source=alert.source,
         is_resolved=alert.is_resolved,
-        created_at=alert.created_at
+        created_at=alert.created_at,
+        occurrence_count=alert.occurrence_count or 1,
+        last_seen_at=alert.last_seen_at,
+        incident_id=alert.incident_id
     )
 
+@router.post("/bulk")
+async def create_alerts(
+    alerts_data: List[AlertCreate],
+    db: Session = Depends(get_db)
+):
+    """Create many alerts at once, deduplicated like single alerts"""
+    alerts = [
+        Alert(
+            alert_type=alert_data.alert_type,
+            severity=alert_data.severity,
+            title=alert_data.title,
+            message=alert_data.message,
+            source=alert_data.source,
+            metadata_=alert_data.metadata
+        ) for alert_data in alerts_data
+    ]
+    try:
+        new_alerts, escalated, repeated = alert_service.record_alerts(db, alerts)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error creating alerts: {str(e)}")
+    
+    for alert in new_alerts + escalated:
+        try:
+            alert_service.send_notification(alert)
+        except Exception as e:
+            print(f"Error sending notification: {e}")
+    
+    return {
+        "created": len(new_alerts),
+        "deduplicated": repeated,
+        "escalated": len(escalated),
+        "alert_ids": [alert.id for alert in new_alerts]
+    }
+
+def bulk_conditions(selection: AlertSelection) -> list:
+    filters = selection.filter.model_dump() if selection.filter else {}
+    try:
+        return alert_service.selection(ids=selection.ids, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/bulk/resolve")
+async def resolve_alerts(
+    request: BulkResolveRequest,
+    db: Session = Depends(get_db)
+):
+    """Resolve every open alert selected by ids and/or filter in one statement"""
+    conditions = bulk_conditions(request)
+    try:
+        return alert_service.bulk_resolve(db, conditions, request.resolved_by)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error resolving alerts: {str(e)}")
+
+@router.post("/bulk/reopen")
+async def reopen_alerts(
+    selection: AlertSelection,
+    db: Session = Depends(get_db)
+):
+    """Reopen every resolved alert selected by ids and/or filter in one statement"""
+    conditions = bulk_conditions(selection)
+    try:
+        return alert_service.bulk_reopen(db, conditions)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error reopening alerts: {str(e)}")
+
 @router.put("/{alert_id}/resolve", response_model=AlertResponse)
 async def resolve_alert(
     alert_id: int,
@@ -92,12 +200,7 @@ async def resolve_alert(
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
     
-    alert.is_resolved = True
-    alert.resolved_at = datetime.now()
-    alert.resolved_by = resolved_by
-    
-    db.commit()
-    db.refresh(alert)
+    alert_service.resolve_alert(db, alert, resolved_by)
     
     return AlertResponse(
         id=alert.id,
@@ -107,38 +210,61 @@ async def resolve_alert(
         message=alert.message,
         source=alert.source,
         is_resolved=alert.is_resolved,
-        created_at=alert.created_at
+        created_at=alert.created_at,
+        occurrence_count=alert.occurrence_count or 1,
+        last_seen_at=alert.last_seen_at,
+        incident_id=alert.incident_id
     )
 
 @router.get("/summary")
 async def get_alert_summary(db: Session = Depends(get_db)):
     """Get alert summary statistics"""
-    total_alerts = db.query(Alert).count()
-    unresolved_alerts = db.query(Alert).filter(Alert.is_resolved == False).count()
-    
-    # Get alerts by severity
-    critical_alerts = db.query(Alert).filter(
-        Alert.severity == "critical",
-        Alert.is_resolved == False
-    ).count()
-    
-    high_alerts = db.query(Alert).filter(
-        Alert.severity == "high",
-        Alert.is_resolved == False
-    ).count()
-    
-    # Get recent alerts (last 24 hours)
-    yesterday = datetime.now() - timedelta(days=1)
-    recent_alerts = db.query(Alert).filter(Alert.created_at >= yesterday).count()
+    return alert_service.counters.summary(db)
+
+@router.get("/incidents", response_model=List[IncidentResponse])
+async def get_incidents(
+    status: Optional[str] = "open",
+    limit: int = 50,
+    db: Session = Depends(get_db)
+):
+    """Get incidents grouping related alerts, most recently active first"""
+    query = db.query(Incident)
+    if status:
+        query = query.filter(Incident.status == status)
+    incidents = query.order_by(Incident.last_seen_at.desc()).limit(limit).all()
+    return [IncidentResponse.model_validate(incident) for incident in incidents]
+
+@router.get("/incidents/{incident_id}")
+async def get_incident(incident_id: int, db: Session = Depends(get_db)):
+    """Get an incident with its alerts"""
+    incident = db.query(Incident).filter(Incident.id == incident_id).first()
+    if not incident:
+        raise HTTPException(status_code=404, detail="Incident not found")
     
+    alerts = db.query(Alert)\
+        .filter(Alert.incident_id == incident_id)\
+        .order_by(Alert.created_at.desc())\
+        .all()
     return {
-        "total_alerts": total_alerts,
-        "unresolved_alerts": unresolved_alerts,
-        "critical_alerts": critical_alerts,
-        "high_alerts": high_alerts,
-        "recent_alerts_24h": recent_alerts
+        "incident": IncidentResponse.model_validate(incident),
+        "alerts": [AlertResponse.model_validate(alert) for alert in alerts]
     }
 
+@router.get("/notifications")
+async def get_notification_stats(db: Session = Depends(get_db)):
+    """Get queued, sent, retried and failed notification counts per channel"""
+    return alert_service.dispatcher.get_stats(db)
+
+@router.get("/rate-limits")
+async def get_rate_limit_stats():
+    """Get notification rate limits, suppression counts per source and severity, and digests sent"""
+    return alert_service.throttle.get_stats()
+
+@router.get("/rules")
+async def get_alert_rule_stats():
+    """Get alert rules with their match counts and evaluation time per batch"""
+    return alert_rules.get_stats()
+
 @router.post("/test")
 async def test_alert_system(db: Session = Depends(get_db)):
     """Test the alert system by creating a sample alert"""
@@ -148,14 +274,12 @@ async def test_alert_system(db: Session = Depends(get_db)):
         title="Test Alert",
         message="This is a test alert to verify the alerting system is working correctly.",
         source="test_system",
-        metadata={"test": True}
+        metadata_={"test": True}
     )
     
-    db.add(test_alert)
-    db.commit()
-    db.refresh(test_alert)
+    test_alert, _ = alert_service.record_alert(db, test_alert)
     
-    # Send test notification
+    # Send test notification, even when the test alert is already open
     try:
         alert_service.send_notification(test_alert)
         notification_sent = True
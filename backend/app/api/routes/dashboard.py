@@ -7,6 +7,7 @@ from app.core.database import get_db
 from app.models.data_quality import DataSource, DataQualityCheck
 from app.models.model_monitoring import ModelPerformance, ModelDrift
 from app.models.alerts import Alert
+from app.api.routes.alerts import alert_service
 
 router = APIRouter()
 
@@ -47,12 +48,10 @@ async def get_dashboard_overview(db: Session = Depends(get_db)):
     drift_alerts = sum(1 for d in recent_drift if d.is_drift_detected)
     
     # Alert Summary
-    total_alerts = db.query(Alert).count()
-    unresolved_alerts = db.query(Alert).filter(Alert.is_resolved == False).count()
-    critical_alerts = db.query(Alert).filter(
-        Alert.severity == "critical",
-        Alert.is_resolved == False
-    ).count()
+    alert_summary = alert_service.counters.summary(db)
+    total_alerts = alert_summary["total_alerts"]
+    unresolved_alerts = alert_summary["unresolved_alerts"]
+    critical_alerts = alert_summary["critical_alerts"]
     
     return {
         "data_quality": {
@@ -243,9 +242,7 @@ async def get_system_status(db: Session = Depends(get_db)):
             model_status = "warning" if drift_detected < 3 else "critical"
     
     # Check alert status
-    critical_alerts = db.query(Alert)\
-        .filter(Alert.severity == "critical", Alert.is_resolved == False)\
-        .count()
+    critical_alerts = alert_service.counters.summary(db)["critical_alerts"]
     
     alert_status = "healthy" if critical_alerts == 0 else "critical"
     
@@ -8,6 +8,7 @@ from datetime import datetime
 from app.core.database import get_db
 from app.models.data_quality import DataSource, DataQualityCheck
 from app.services.data_quality_service import DataQualityService
+from app.api.routes.alerts import alert_rules
 from app.schemas.data_quality import (
     DataSourceCreate, DataSourceResponse, 
     QualityCheckResponse, QualityCheckCreate
@@ -58,6 +59,10 @@ async def upload_data_source(
             db.add(quality_check)
         
         db.commit()
+        alert_rules.submit("quality", [
+            {**result, "data_source_id": data_source.id, "source_name": data_source.name}
+            for result in quality_results
+        ])
         
         return DataSourceResponse(
             id=data_source.id,
@@ -140,6 +145,10 @@ async def run_quality_check(
             checks.append(quality_check)
         
         db.commit()
+        alert_rules.submit("quality", [
+            {**result, "data_source_id": source_id, "source_name": data_source.name}
+            for result in quality_results
+        ])
         
         return [
             QualityCheckResponse(
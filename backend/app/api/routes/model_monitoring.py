@@ -1,41 +1,190 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
+import io
 import json
+import time
+import uuid
+import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, SessionLocal
 from app.models.model_monitoring import ModelPerformance, ModelDrift
 from app.services.model_monitoring_service import ModelMonitoringService
+from app.api.routes.alerts import alert_service, alert_rules
+from app.services.micro_batcher import MicroBatcher
+from app.services.prediction_log_writer import PredictionLogWriter
+from app.services.drift_scheduler import DriftCheckScheduler
+from app.services.metric_rollups import MetricRollups, RESOLUTIONS
+from app.services.feature_vectorizer import MissingFeaturesError
 from app.schemas.model_monitoring import (
     ModelPerformanceCreate, ModelPerformanceResponse,
-    ModelDriftResponse, ModelSummary
+    ModelDriftResponse, ModelSummary, PredictionFeedback
 )
 
 router = APIRouter()
 model_service = ModelMonitoringService()
+prediction_batcher = MicroBatcher(
+    model_service.predict_batch,
+    max_batch_size=settings.prediction_batch_max_size,
+    max_delay=settings.prediction_batch_max_delay_ms / 1000
+)
+metric_rollups = MetricRollups(
+    {
+        "raw": settings.rollup_raw_retention_days,
+        "minute": settings.rollup_minute_retention_days,
+        "hour": settings.rollup_hour_retention_days,
+        "day": settings.rollup_day_retention_days
+    },
+    max_points=settings.rollup_max_points,
+    compaction_interval=settings.rollup_compaction_interval,
+    state_file=str(settings.DATA_PATH / "rollup_backfill.json")
+)
+prediction_log = PredictionLogWriter(
+    SessionLocal,
+    ModelPerformance,
+    max_buffer=settings.prediction_log_max_buffer,
+    batch_size=settings.prediction_log_batch_size,
+    flush_interval=settings.prediction_log_flush_interval,
+    overflow_policy=settings.prediction_log_overflow_policy,
+    block_timeout=settings.prediction_log_block_timeout,
+    on_write=metric_rollups.record_performance
+)
+drift_scheduler = DriftCheckScheduler(
+    model_service,
+    SessionLocal,
+    default_interval=settings.drift_check_interval,
+    intervals=settings.drift_check_intervals,
+    max_workers=settings.drift_check_max_workers,
+    jitter=settings.drift_check_jitter,
+    max_rows=settings.drift_check_max_rows,
+    claim_timeout=settings.drift_check_claim_timeout,
+    multivariate_params=model_service.multivariate_drift.get_params() if settings.multivariate_drift_enabled else None,
+    on_write=metric_rollups.record_drift,
+    # Only results that were stored raise alerts
+    after_commit=lambda rows: alert_rules.submit("drift", rows)
+)
+
+def record_drift_alert(model_name: str, drift_type: str, feature_name: Optional[str], drift_score: float, threshold: float):
+    """Persist and send an alert when a drift window or a concept drift detector crosses its threshold"""
+    label = f"{drift_type} ({feature_name})" if feature_name else drift_type
+    alert = alert_service.create_model_drift_alert(model_name, label, drift_score, threshold)
+    
+    db = SessionLocal()
+    try:
+        alert, notify = alert_service.record_alert(db, alert)
+        if notify:
+            alert_service.send_notification(alert)
+    finally:
+        db.close()
+
+async def activate_on_first_use(model_name: str) -> None:
+    """Train a sample model's first version in the threadpool instead of on the event loop"""
+    model_info = model_service.models.get(model_name)
+    if model_info is not None and model_info["version"] is None:
+        await run_in_threadpool(model_service.ensure_active, model_name)
+
+model_service.drift_monitor.on_drift = record_drift_alert
+model_service.concept_drift.on_drift = record_drift_alert
+
+@router.on_event("startup")
+async def start_drift_monitor():
+    # Before any writer starts, so the backfill knows which rows predate rollups
+    metric_rollups.start(SessionLocal)
+    model_service.drift_monitor.start()
+    model_service.concept_drift.start()
+    prediction_log.start()
+    if settings.drift_check_enabled:
+        drift_scheduler.start()
+
+@router.on_event("shutdown")
+async def stop_drift_monitor():
+    await prediction_batcher.stop()
+    drift_scheduler.stop()
+    model_service.shadow.stop()
+    prediction_log.stop()
+    model_service.drift_monitor.stop()
+    model_service.concept_drift.stop()
+    metric_rollups.stop()
 
 @router.post("/deploy", response_model=dict)
 async def deploy_model(
     model_name: str,
     model_type: str = "classification",
+    random_state: int = 42,
+    activate: bool = True,
     db: Session = Depends(get_db)
 ):
-    """Deploy a sample ML model"""
+    """Train and deploy a sample ML model as a new version
+    
+    The version is loaded and warmed up off the event loop while the
+    current version keeps serving, then swapped in. With activate=false
+    it is only stored, e.g. to shadow it first.
+    """
     try:
-        # Deploy sample model
-        model_info = model_service.deploy_sample_model(model_name, model_type)
+        model_info = await run_in_threadpool(model_service.deploy_sample_model, model_name, model_type, random_state, activate)
         
         return {
-            "message": "Model deployed successfully",
+            "message": "Model deployed successfully" if model_info["created"] else "Model version already deployed",
             "model_name": model_name,
-            "model_type": model_type,
+            "model_type": model_info["type"],
             "version": model_info["version"],
-            "status": "active"
+            "status": "active" if model_info["active"] else "candidate",
+            "warmup_ms": model_info["warmup_ms"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deploying model: {str(e)}")
 
+@router.get("/models/{model_name}/versions", response_model=List[dict])
+async def get_model_versions(model_name: str):
+    """Get every stored version of a model and which one is active"""
+    try:
+        return await run_in_threadpool(model_service.get_versions, model_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/models/{model_name}/versions/{version}/activate", response_model=dict)
+async def activate_model_version(model_name: str, version: str):
+    """Make a stored version active, e.g. to promote a candidate or roll back"""
+    try:
+        return await run_in_threadpool(model_service.activate_version, model_name, version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error activating version: {str(e)}")
+
+@router.put("/models/{model_name}/shadow", response_model=dict)
+async def set_shadow_version(model_name: str, version: str, sample_rate: float = 0.1):
+    """Score a sample of live traffic with a candidate version and compare it with the active one"""
+    if not 0 < sample_rate <= 1:
+        raise HTTPException(status_code=400, detail="sample_rate must be in (0, 1]")
+    try:
+        return await run_in_threadpool(model_service.set_shadow, model_name, version, sample_rate)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/models/{model_name}/shadow", response_model=dict)
+async def get_shadow_stats(model_name: str):
+    """Get how the shadowed candidate's predictions compare with the active version's"""
+    stats = model_service.shadow.get_stats(model_name)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"Model {model_name} has no shadow version")
+    return {"model_name": model_name, "active_version": model_service.models[model_name]["version"], **stats}
+
+@router.delete("/models/{model_name}/shadow", response_model=dict)
+async def remove_shadow_version(model_name: str):
+    """Stop shadow scoring and return the final comparison"""
+    stats = model_service.shadow.remove(model_name)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"Model {model_name} has no shadow version")
+    return {"model_name": model_name, **stats}
+
 @router.get("/models", response_model=List[str])
 async def get_deployed_models(db: Session = Depends(get_db)):
     """Get list of deployed models"""
@@ -48,49 +197,322 @@ async def get_deployed_models(db: Session = Depends(get_db)):
 @router.post("/models/{model_name}/predict", response_model=dict)
 async def make_prediction(
     model_name: str,
-    features: dict,
-    db: Session = Depends(get_db)
+    features: Union[dict, list] = Body(...)
 ):
-    """Make a prediction using the deployed model"""
+    """Make a prediction from a {feature: value} dict or a list in model feature order"""
     try:
-        prediction = model_service.make_prediction(model_name, features)
+        await activate_on_first_use(model_name)
+        # Concurrent requests for the same model are scored together
+        row = model_service.vectorize(model_name, features)
+        prediction_value, confidence, version = await prediction_batcher.submit(model_name, row)
+        prediction = model_service.prediction_result(model_name, prediction_value, confidence, version)
+        # Clients send this ID back with the actual outcome
+        prediction["prediction_id"] = uuid.uuid4().hex
         
-        # Record performance metrics
-        performance = ModelPerformance(
-            model_name=model_name,
-            model_version="1.0",
-            metric_name="prediction",
-            metric_value=prediction["confidence"],
-            sample_size=1,
-            metadata={"features": features, "prediction": prediction["prediction"]}
-        )
-        db.add(performance)
-        db.commit()
+        # Record performance metrics; the log writer inserts them in batches
+        log_start = time.perf_counter_ns()
+        await prediction_log.submit_async({
+            "model_name": model_name,
+            "model_version": prediction["model_version"],
+            "metric_name": "prediction",
+            "metric_value": prediction["confidence"],
+            "sample_size": 1,
+            "timestamp": datetime.now(),
+            "prediction_id": prediction["prediction_id"],
+            "metadata_": {
+                "features": features if isinstance(features, dict) else dict(zip(prediction["features_used"], features)),
+                "prediction": prediction["prediction"]
+            }
+        })
+        model_service.record_latency(model_name, "logging", log_start, version=prediction["model_version"])
         
         return prediction
+    except MissingFeaturesError as e:
+        raise HTTPException(status_code=422, detail={"message": str(e), "missing_features": e.missing})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error making prediction: {str(e)}")
 
+def log_batch_predictions(
+    model_name: str,
+    model_version: str,
+    features: List[str],
+    X: np.ndarray,
+    result: dict,
+    batch_id: str
+):
+    """Record a batch of predictions with one multi-row INSERT"""
+    start = time.perf_counter_ns()
+    records = pd.DataFrame(X, columns=features).to_dict("records")
+    predictions = result["predictions"].tolist()
+    confidence = result["confidence"].tolist()
+    timestamp = datetime.now()
+    
+    rows = [
+        {
+            "model_name": model_name,
+            "model_version": model_version,
+            "metric_name": "prediction",
+            "metric_value": confidence[i],
+            "sample_size": 1,
+            "timestamp": timestamp,
+            "prediction_id": f"{batch_id}-{i}",
+            "metadata_": {"features": records[i], "prediction": predictions[i]}
+        }
+        for i in range(len(records))
+    ]
+    
+    db = SessionLocal()
+    try:
+        db.execute(insert(ModelPerformance), rows)
+        metric_rollups.record_performance(db, rows)
+        db.commit()
+    finally:
+        db.close()
+    model_service.latency.since(start, model_name, model_version, "logging", len(rows))
+
+def stream_batch_results(result: dict, batch_id: str, chunk_size: int = 10000):
+    """Yield predictions as NDJSON, one chunk of rows at a time"""
+    predictions = result["predictions"]
+    confidence = result["confidence"]
+    
+    for start in range(0, len(predictions), chunk_size):
+        rows = zip(predictions[start:start + chunk_size].tolist(), confidence[start:start + chunk_size].tolist())
+        yield "".join(
+            f'{{"row": {start + i}, "prediction_id": "{batch_id}-{start + i}", "prediction": {p}, "confidence": {c}}}\n'
+            for i, (p, c) in enumerate(rows)
+        )
+
+def parse_batch(model_name: str, content_type: str, body: bytes) -> np.ndarray:
+    """Feature matrix of a batch request body in model feature order"""
+    if content_type == "application/json":
+        return model_service.batch_from_json(model_name, json.loads(body))
+    if content_type in ("application/x-ndjson", "application/jsonl"):
+        return model_service.batch_from_frame(model_name, pd.read_json(io.BytesIO(body), lines=True))
+    return model_service.batch_from_frame(model_name, pd.read_csv(io.BytesIO(body)))
+
+@router.post("/models/{model_name}/predict-batch")
+async def make_batch_prediction(model_name: str, request: Request):
+    """Make predictions for many rows sent as columnar JSON, NDJSON or CSV
+    
+    Results are streamed back as NDJSON in input order and logged in bulk
+    once the response has been sent. Row i gets prediction ID "{batch}-{i}".
+    """
+    content_type = request.headers.get("content-type", "application/json").split(";")[0].strip()
+    body = await request.body()
+    
+    if model_name not in model_service.get_deployed_models():
+        raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
+    
+    if content_type not in ("application/json", "application/x-ndjson", "application/jsonl", "text/csv"):
+        raise HTTPException(status_code=415, detail=f"Unsupported content type: {content_type}")
+    
+    # Parsing, vectorizing and scoring run in the threadpool, off the event loop
+    try:
+        X = await run_in_threadpool(parse_batch, model_name, content_type, body)
+    except MissingFeaturesError as e:
+        raise HTTPException(status_code=422, detail={"message": str(e), "missing_features": e.missing})
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error parsing batch: {str(e)}")
+    
+    try:
+        result = await run_in_threadpool(model_service.predict_batch, model_name, X)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error making predictions: {str(e)}")
+    
+    # Logged with the version that scored the batch, even if another was activated since
+    features = model_service.versions[(model_name, result["version"])]["features"]
+    batch_id = uuid.uuid4().hex
+    return StreamingResponse(
+        stream_batch_results(result, batch_id),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(
+            log_batch_predictions, model_name, result["version"], features, X, result, batch_id
+        )
+    )
+
+@router.post("/models/{model_name}/feedback", response_model=dict)
+async def record_feedback(
+    model_name: str,
+    feedback: Union[PredictionFeedback, List[PredictionFeedback]] = Body(...),
+    db: Session = Depends(get_db)
+):
+    """Report actual outcomes for earlier predictions by prediction ID"""
+    if not isinstance(feedback, list):
+        feedback = [feedback]
+    
+    model_info = model_service.models.get(model_name)
+    if model_info is None:
+        raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
+    if model_info["type"] == "regression":
+        # Regression errors need numeric outcomes; labels are only meaningful for classifiers
+        invalid = []
+        for item in feedback:
+            try:
+                if not np.isfinite(float(item.actual)):
+                    invalid.append(item.prediction_id)
+            except ValueError:
+                invalid.append(item.prediction_id)
+        if invalid:
+            raise HTTPException(
+                status_code=422,
+                detail={"message": f"actual must be a finite number for regression model {model_name}", "prediction_ids": invalid}
+            )
+    
+    try:
+        await activate_on_first_use(model_name)
+        return model_service.record_feedback(db, model_name, [item.model_dump() for item in feedback])
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error recording feedback: {str(e)}")
+
+@router.get("/models/{model_name}/metrics", response_model=dict)
+async def get_model_metrics(
+    model_name: str,
+    days: int = 30,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    version: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Get accuracy, precision, recall and F1 (or RMSE) from ground-truth feedback
+    
+    The window defaults to the last `days`; explicit start/end take precedence.
+    """
+    if start is None:
+        start = datetime.now() - timedelta(days=days)
+    
+    try:
+        await activate_on_first_use(model_name)
+        metrics = model_service.get_model_performance_metrics(db, model_name, start, end, version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting metrics: {str(e)}")
+    
+    return {
+        "model_name": model_name,
+        "model_version": version,
+        "start": start,
+        "end": end,
+        **metrics
+    }
+
+@router.get("/models/{model_name}/concept-drift")
+async def get_concept_drift(model_name: str):
+    """Get ADWIN, Page-Hinkley and DDM state on the model's confidence and error streams"""
+    try:
+        await activate_on_first_use(model_name)
+        return model_service.get_concept_drift_state(model_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/metrics/model-cache")
+async def get_model_cache_metrics():
+    """Get loaded models, their estimated footprint and cache hit/miss/eviction counts"""
+    return model_service.model_cache.get_stats()
+
+@router.get("/metrics/prediction-cache")
+async def get_prediction_cache_metrics():
+    """Get cached prediction counts and hit ratios per model"""
+    return model_service.prediction_cache.get_stats()
+
+@router.put("/models/{model_name}/prediction-cache", response_model=dict)
+async def set_prediction_cache(model_name: str, enabled: bool = True, ttl_seconds: Optional[float] = None):
+    """Turn caching of a model's prediction results on or off"""
+    if ttl_seconds is not None and ttl_seconds <= 0:
+        raise HTTPException(status_code=400, detail="ttl_seconds must be positive")
+    try:
+        return model_service.set_prediction_cache(model_name, enabled, ttl_seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/metrics/latency")
+async def get_latency_metrics(model_name: Optional[str] = None):
+    """Get p50/p90/p99/p999 latency of vectorization, inference and logging, and QPS, per model version"""
+    return model_service.latency.get_stats(model_name)
+
+@router.get("/metrics/prediction-log")
+async def get_prediction_log_metrics():
+    """Get buffered, written and dropped counts of the prediction log writer"""
+    return prediction_log.get_stats()
+
+@router.get("/metrics/batching")
+async def get_batching_metrics():
+    """Get micro-batching queue depth and batch-size histograms per model"""
+    return prediction_batcher.get_metrics()
+
+def history_resolution(resolution: str, start: datetime, end: datetime) -> str:
+    if resolution == "auto":
+        return metric_rollups.choose_resolution(start, end)
+    if resolution != "raw" and resolution not in RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown resolution: {resolution}")
+    return resolution
+
+def downsample_raw(records: list, max_points: int, value_key: str) -> list:
+    """LTTB over raw history rows given newest first, per version, metric and feature"""
+    points = [
+        {
+            "model_version": record.model_version,
+            "metric_name": getattr(record, "metric_name", None) or getattr(record, "drift_type", None),
+            "feature_name": getattr(record, "feature_name", None),
+            "timestamp": record.timestamp,
+            "value": getattr(record, value_key),
+            "record": record
+        }
+        for record in reversed(records)
+    ]
+    kept = MetricRollups.downsample(points, max_points, "value")
+    kept.sort(key=lambda point: point["timestamp"], reverse=True)
+    return [point["record"] for point in kept]
+
 @router.get("/models/{model_name}/performance", response_model=List[ModelPerformanceResponse])
 async def get_model_performance(
     model_name: str,
     metric: Optional[str] = None,
     days: int = 30,
+    resolution: str = "auto",
+    max_points: Optional[int] = Query(None, ge=3),
     db: Session = Depends(get_db)
 ):
-    """Get model performance metrics"""
+    """Get model performance metrics
+    
+    `resolution` is raw, minute, hour or day; auto picks the finest rollup
+    with at most `rollup_max_points` buckets per series. `max_points`
+    downsamples every series with LTTB.
+    """
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+    resolution = history_resolution(resolution, start_date, end_date)
+    
+    if resolution != "raw":
+        points = metric_rollups.series(db, "performance", model_name, start_date, end_date, resolution, metric, max_points)
+        return [
+            ModelPerformanceResponse(
+                model_name=point["model_name"],
+                model_version=point["model_version"],
+                metric_name=point["metric_name"],
+                metric_value=point["mean"],
+                sample_size=point["sample_size"],
+                timestamp=point["timestamp"],
+                resolution=resolution,
+                count=point["count"],
+                min_value=point["min"],
+                max_value=point["max"]
+            ) for point in points
+        ]
+    
     query = db.query(ModelPerformance).filter(ModelPerformance.model_name == model_name)
     
     if metric:
         query = query.filter(ModelPerformance.metric_name == metric)
     
     # Filter by date range
-    start_date = datetime.now() - timedelta(days=days)
     query = query.filter(ModelPerformance.timestamp >= start_date)
     
     performances = query.order_by(ModelPerformance.timestamp.desc()).all()
     
-    return [
+    response = [
         ModelPerformanceResponse(
             id=perf.id,
             model_name=perf.model_name,
@@ -101,33 +523,55 @@ async def get_model_performance(
             timestamp=perf.timestamp
         ) for perf in performances
     ]
+    if max_points:
+        response = downsample_raw(response, max_points, "metric_value")
+    return response
 
 @router.post("/models/{model_name}/drift-check", response_model=List[ModelDriftResponse])
 async def check_model_drift(
     model_name: str,
+    days: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    """Check for model drift"""
+    """Check for model drift on the streaming window, or on logged predictions of the last `days`"""
     try:
-        drift_results = model_service.check_model_drift(model_name)
+        await activate_on_first_use(model_name)
+        if days is None:
+            drift_results = model_service.check_window_drift(model_name)
+        else:
+            # Rescan logged predictions and compare them against the training reference
+            start_date = datetime.now() - timedelta(days=days)
+            logs = db.query(ModelPerformance.metadata_)\
+                .filter(ModelPerformance.model_name == model_name)\
+                .filter(ModelPerformance.metric_name == "prediction")\
+                .filter(ModelPerformance.timestamp >= start_date)\
+                .all()
+            
+            recent = model_service.features_from_logs(model_name, [log[0] for log in logs])
+            drift_results = model_service.check_model_drift(model_name, recent["X"], recent["predictions"])
         
         # Save drift results
-        drift_records = []
-        for result in drift_results:
-            drift_record = ModelDrift(
-                model_name=model_name,
-                model_version="1.0",
-                drift_type=result["drift_type"],
-                drift_score=result["drift_score"],
-                threshold=result["threshold"],
-                is_drift_detected=result["is_drift_detected"],
-                feature_name=result.get("feature_name"),
-                details=result["details"]
-            )
-            db.add(drift_record)
-            drift_records.append(drift_record)
+        checked_at = datetime.now()
+        rows = [
+            {
+                "model_name": model_name,
+                "model_version": result["model_version"],
+                "drift_type": result["drift_type"],
+                "drift_score": result["drift_score"],
+                "threshold": result["threshold"],
+                "is_drift_detected": result["is_drift_detected"],
+                "feature_name": result.get("feature_name"),
+                "details": result["details"],
+                "timestamp": checked_at
+            }
+            for result in drift_results
+        ]
+        drift_records = [ModelDrift(**row) for row in rows]
+        db.add_all(drift_records)
+        metric_rollups.record_drift(db, rows)
         
         db.commit()
+        alert_rules.submit("drift", rows)
         
         return [
             ModelDriftResponse(
@@ -146,14 +590,79 @@ async def check_model_drift(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error checking drift: {str(e)}")
 
+@router.get("/drift-scheduler", response_model=dict)
+async def get_drift_scheduler_status():
+    """Get scheduled drift check intervals, next runs and cycle statistics"""
+    return drift_scheduler.get_stats()
+
+@router.post("/drift-scheduler/run", response_model=dict)
+async def run_scheduled_drift_checks():
+    """Run one drift check cycle for every deployed model now"""
+    try:
+        return await run_in_threadpool(drift_scheduler.run_cycle, model_service.get_deployed_models())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error running drift checks: {str(e)}")
+
+@router.put("/models/{model_name}/drift-schedule", response_model=dict)
+async def set_drift_schedule(model_name: str, interval_seconds: float):
+    """Set how often a model's scheduled drift check runs"""
+    if model_name not in model_service.get_deployed_models():
+        raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
+    if interval_seconds <= 0:
+        raise HTTPException(status_code=400, detail="interval_seconds must be positive")
+    
+    drift_scheduler.set_interval(model_name, interval_seconds)
+    return {"model_name": model_name, "interval_seconds": interval_seconds}
+
+@router.get("/models/{model_name}/reference", response_model=dict)
+async def get_model_reference(model_name: str):
+    """Get the training-data sketch drift checks compare against"""
+    try:
+        await activate_on_first_use(model_name)
+        return model_service.get_reference_summary(model_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/models/{model_name}/drift/live", response_model=List[dict])
+async def get_live_drift(model_name: str):
+    """Get current drift scores of the streaming window without recording them"""
+    try:
+        await activate_on_first_use(model_name)
+        return model_service.check_window_drift(model_name)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 @router.get("/models/{model_name}/drift", response_model=List[ModelDriftResponse])
 async def get_model_drift_history(
     model_name: str,
     days: int = 30,
+    resolution: str = "auto",
+    max_points: Optional[int] = Query(None, ge=3),
     db: Session = Depends(get_db)
 ):
-    """Get model drift history"""
-    start_date = datetime.now() - timedelta(days=days)
+    """Get model drift history at a raw, minute, hour, day or automatically chosen resolution"""
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+    resolution = history_resolution(resolution, start_date, end_date)
+    
+    if resolution != "raw":
+        points = metric_rollups.series(db, "drift", model_name, start_date, end_date, resolution, max_points=max_points)
+        return [
+            ModelDriftResponse(
+                model_name=point["model_name"],
+                model_version=point["model_version"],
+                drift_type=point["metric_name"],
+                drift_score=point["mean"],
+                threshold=point["threshold"],
+                is_drift_detected=point["detected_count"] > 0,
+                feature_name=point["feature_name"],
+                timestamp=point["timestamp"],
+                resolution=resolution,
+                count=point["count"],
+                max_drift_score=point["max"],
+                detected_count=point["detected_count"]
+            ) for point in points
+        ]
     
     drift_records = db.query(ModelDrift)\
         .filter(ModelDrift.model_name == model_name)\
@@ -161,7 +670,7 @@ async def get_model_drift_history(
         .order_by(ModelDrift.timestamp.desc())\
         .all()
     
-    return [
+    response = [
         ModelDriftResponse(
             id=drift.id,
             model_name=drift.model_name,
@@ -174,6 +683,14 @@ async def get_model_drift_history(
             timestamp=drift.timestamp
         ) for drift in drift_records
     ]
+    if max_points:
+        response = downsample_raw(response, max_points, "drift_score")
+    return response
+
+@router.get("/metrics/rollups")
+async def get_rollup_metrics():
+    """Get rollup retention, backfill progress and rows compacted so far"""
+    return metric_rollups.get_stats()
 
 @router.get("/summary", response_model=ModelSummary)
 async def get_model_summary(db: Session = Depends(get_db)):
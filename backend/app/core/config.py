@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional, List
+from typing import Any, Optional, List, Dict
 import os
 from pathlib import Path
 
@@ -24,6 +24,125 @@ class Settings(BaseSettings):
     smtp_port: int = int(os.getenv("SMTP_PORT", "587"))
     smtp_user: Optional[str] = os.getenv("SMTP_USER")
     smtp_password: Optional[str] = os.getenv("SMTP_PASSWORD")
+    smtp_use_tls: bool = True
+    alert_email_recipients: List[str] = []
+    smtp_timeout: float = 30.0
+    smtp_idle_timeout: float = 60.0  # Pooled connections idle longer are checked with NOOP before reuse
+    
+    # Background delivery of queued alert notifications
+    notification_channel_concurrency: Dict[str, int] = {"email": 4}  # Concurrent deliveries (and SMTP connections) per channel
+    notification_max_attempts: int = 5
+    notification_backoff_base: float = 2.0  # Seconds before the first retry, doubling per attempt
+    notification_backoff_max: float = 300.0
+    notification_claim_timeout: float = 300.0  # Seconds a dispatcher may spend sending before another takes the row over
+    
+    # Alert deduplication and incident grouping
+    alert_fingerprint_keys: Dict[str, List[str]] = {  # Metadata identifying an alert per type; other types use every non-float value
+        "model_drift": ["drift_type"],
+        "data_quality": ["issue_type"]
+    }
+    alert_incident_window_minutes: int = 60  # New alerts from a source join its open incident if it fired this recently
+    alert_counters_enabled: bool = True  # Keep summary counts in alert_counters instead of aggregating alerts per request
+    
+    # Alert notification rate limits, as [burst, notifications per minute]; alerts over them go into digests
+    alert_source_rate_limit: List[float] = [5, 1.0]
+    alert_severity_rate_limits: Dict[str, List[float]] = {
+        "low": [5, 0.5],
+        "medium": [10, 1.0],
+        "high": [20, 4.0],
+        "critical": [50, 20.0]
+    }
+    alert_digest_interval_seconds: float = 300.0
+    alert_severity_recipients: Dict[str, List[str]] = {}  # Recipients per severity instead of alert_email_recipients
+    
+    # Rules raising alerts from written quality check and drift results; `when` maps a field to a value
+    # or [operator, operand], and `alert` (data_quality, model_drift or system) defaults to the source's type
+    alert_rules: List[Dict[str, Any]] = [
+        {"name": "quality_failed", "source": "quality", "when": {"status": "failed"}, "severity": "high"},
+        {"name": "quality_warning", "source": "quality", "when": {"status": "warning"}, "severity": "medium"},
+        {"name": "drift_detected", "source": "drift", "when": {"is_drift_detected": True}}
+    ]
+    alert_rules_batch_size: int = 1000  # Most results evaluated together
+    alert_rules_max_pending: int = 10000  # Queued results waiting for evaluation; more are dropped
+    
+    # Streaming drift windows
+    drift_window_type: str = "sliding"  # sliding or tumbling
+    drift_window_unit: str = "count"  # count (predictions) or time (seconds)
+    drift_window_size: int = 10000
+    drift_window_slices: int = 10
+    drift_min_samples: int = 100
+    drift_snapshot_interval: float = 60.0
+    
+    # Scheduled drift checks over newly logged predictions of every deployed model
+    drift_check_enabled: bool = True
+    drift_check_interval: float = 3600.0
+    drift_check_intervals: Dict[str, float] = {}  # Per-model overrides, in seconds
+    drift_check_max_workers: int = 4
+    drift_check_jitter: float = 0.1  # Fraction of the interval
+    drift_check_max_rows: int = 10000  # Most recent new rows scored per check
+    drift_check_claim_timeout: float = 900.0  # Seconds before another process may take over a model's unfinished check
+    
+    # Multivariate drift tests (MMD and domain classifier) on subsampled rows
+    multivariate_drift_enabled: bool = True
+    multivariate_drift_max_samples: int = 500
+    multivariate_drift_permutations: int = 200
+    multivariate_drift_fourier_features: int = 256
+    multivariate_drift_significance: float = 0.05
+    
+    # Online change detection on prediction confidence and feedback errors
+    concept_drift_enabled: bool = True
+    concept_drift_adwin_delta: float = 0.002
+    concept_drift_ph_delta: float = 0.005
+    concept_drift_ph_threshold: float = 50.0
+    concept_drift_min_samples: int = 30
+    # Queued stream updates waiting for the detectors; more are dropped
+    concept_drift_max_pending: int = 1000
+    
+    # Memory budget of the in-process LRU cache of loaded models
+    model_cache_max_mb: int = 512
+    # Memory-map model arrays read-only so worker processes share them; None loads private copies.
+    # sklearn copies tree nodes into private memory when unpickling, so forests are
+    # only shared through the flat backend's arrays, i.e. with tree_inference_backend
+    # "flat" and for batches up to tree_inference_flat_max_batch rows
+    model_mmap_mode: Optional[str] = "r"
+    # "flat" runs tree ensembles on compiled NumPy node arrays instead of sklearn
+    tree_inference_backend: str = "sklearn"
+    # Larger batches go to sklearn, whose compiled traversal wins once per-call overhead is amortized
+    tree_inference_flat_max_batch: int = 256
+    
+    # Cache of prediction results by feature-vector digest; only listed models are cached
+    prediction_cache_models: List[str] = []
+    prediction_cache_max_mb: int = 64
+    prediction_cache_ttl: float = 300.0
+    
+    # Rows a new model version is run on before it goes live
+    model_warmup_rows: int = 64
+    # Sampled batches waiting for a shadow candidate; more are dropped
+    shadow_max_pending_batches: int = 64
+    
+    # Micro-batching of concurrent single-row predictions
+    prediction_batch_max_size: int = 64
+    prediction_batch_max_delay_ms: float = 5.0
+    
+    # Buffered prediction log writer
+    prediction_log_max_buffer: int = 100000
+    prediction_log_batch_size: int = 500
+    prediction_log_flush_interval: float = 1.0
+    prediction_log_overflow_policy: str = "drop"  # drop (oldest) or block
+    prediction_log_block_timeout: float = 1.0
+    
+    # Width of the time buckets ground-truth metrics are accumulated in; should divide a day
+    performance_bucket_seconds: int = 3600
+    
+    # Minute, hour and day rollups of performance and drift history
+    rollup_max_points: int = 2000  # Most buckets per series an automatically chosen resolution returns
+    # Opt-in: deleting raw rows also deletes the logged predictions feedback
+    # and drift-check rescans (?days=) read, so those only reach back this far
+    rollup_raw_retention_days: Optional[float] = None  # None keeps raw rows forever
+    rollup_minute_retention_days: Optional[float] = 7.0
+    rollup_hour_retention_days: Optional[float] = 180.0
+    rollup_day_retention_days: Optional[float] = None
+    rollup_compaction_interval: float = 3600.0
     
     # CORS settings
     cors_origins: List[str] = [
@@ -40,6 +159,8 @@ class Settings(BaseSettings):
     
     class Config:
         env_file = ".env"
+        # Allows the model_* settings without pydantic's namespace warning
+        protected_namespaces = ()
 
 settings = Settings()
 
@@ -0,0 +1,52 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import MetaData
+
+def upgrade_schema(engine: Engine, metadata: MetaData) -> None:
+    """Add columns and indexes declared on the models but missing from existing tables
+
+    create_all only creates absent tables, so databases created by an
+    older release would otherwise never get new columns. Added columns
+    are nullable; tables themselves are still created by create_all.
+    Missing indexes are created too, on Postgres with CONCURRENTLY.
+    """
+    inspector = inspect(engine)
+    missing_indexes = []
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                print(f"Added column {table.name}.{column.name}")
+
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    if engine.dialect.name == "postgresql":
+                        missing_indexes.append(index)
+                        continue
+                    index.create(conn)
+                    print(f"Created index {index.name}")
+
+    if not missing_indexes:
+        return
+    # Existing tables may be large, so Postgres builds their indexes without blocking
+    # writes; CREATE INDEX CONCURRENTLY can't run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for index in missing_indexes:
+            index.dialect_options["postgresql"]["concurrently"] = True
+            try:
+                index.create(conn)
+                print(f"Created index {index.name}")
+            except Exception as e:
+                # A failed concurrent build leaves an invalid index behind; drop it so the next start retries
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+                print(f"Error creating index {index.name}: {e}")
+            finally:
+                index.dialect_options["postgresql"]["concurrently"] = False
@@ -20,6 +20,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Health check endpoint
@@ -64,10 +65,12 @@ async def system_status():
 # Try to import and include API routes if database is available
 try:
     from app.core.database import engine, Base
+    from app.core.migrations import upgrade_schema
     from app.api.routes import data_quality, model_monitoring, alerts, dashboard
     
-    # Create database tables
+    # Create database tables and add columns introduced since they were created
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine, Base.metadata)
     
     # Include API routes
     app.include_router(data_quality.router, prefix=f"{settings.api_v1_prefix}/data-quality", tags=["Data Quality"])
@@ -1,5 +1,5 @@
 from .data_quality import DataQualityCheck, DataSource
-from .model_monitoring import ModelPerformance, ModelDrift
-from .alerts import Alert
+from .model_monitoring import ModelPerformance, ModelDrift, ModelMetricBucket, MetricRollup
+from .alerts import Alert, AlertCounter, Incident, Notification
 
-__all__ = ["DataQualityCheck", "DataSource", "ModelPerformance", "ModelDrift", "Alert"] 
\ No newline at end of file
+__all__ = ["DataQualityCheck", "DataSource", "ModelPerformance", "ModelDrift", "ModelMetricBucket", "MetricRollup", "Alert", "AlertCounter", "Incident", "Notification"] 
\ No newline at end of file
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, JSON, Index
+from sqlalchemy import text
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -11,11 +12,87 @@ class Alert(Base):
     title = Column(String(255), nullable=False)
     message = Column(Text, nullable=False)
     source = Column(String(255))  # data_source_name or model_name
-    metadata = Column(JSON)  # Additional alert data
+    metadata_ = Column("metadata", JSON)  # Additional alert data ("metadata" is reserved by SQLAlchemy)
     is_resolved = Column(Boolean, default=False)
     resolved_at = Column(DateTime(timezone=True))
     resolved_by = Column(String(255))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    fingerprint = Column(String(64))  # Hash of type, source and identifying metadata; repeats of an open alert share it
+    occurrence_count = Column(Integer, default=1)
+    last_seen_at = Column(DateTime)
+    incident_id = Column(Integer, index=True)
+    
+    __table_args__ = (
+        # At most one open alert per fingerprint; also the lookup index for deduplication
+        Index(
+            "ix_alerts_open_fingerprint", "fingerprint", unique=True,
+            sqlite_where=text("is_resolved = 0"), postgresql_where=text("is_resolved = false")
+        ),
+        # Newest alert per fingerprint, the only one that may be reopened
+        Index("ix_alerts_fingerprint_id", "fingerprint", "id"),
+        # Listing pages through (created_at, id) newest first after equality filters on any
+        # combination of type, severity and resolved, so each combination has its own index
+        Index("ix_alerts_created_at_id", "created_at", "id"),
+        Index("ix_alerts_severity_created_at_id", "severity", "created_at", "id"),
+        Index("ix_alerts_type_created_at_id", "alert_type", "created_at", "id"),
+        Index("ix_alerts_resolved_created_at_id", "is_resolved", "created_at", "id"),
+        Index("ix_alerts_severity_resolved_created_at_id", "severity", "is_resolved", "created_at", "id"),
+        Index("ix_alerts_type_severity_created_at_id", "alert_type", "severity", "created_at", "id"),
+        Index("ix_alerts_type_resolved_created_at_id", "alert_type", "is_resolved", "created_at", "id"),
+        Index("ix_alerts_type_severity_resolved_created_at_id", "alert_type", "severity", "is_resolved", "created_at", "id"),
+    )
+    
+    def __repr__(self):
+        return f"<Alert(id={self.id}, type='{self.alert_type}', severity='{self.severity}')>"
+
+class Incident(Base):
+    """Alerts from one source that fired close together, handled as one problem"""
+    __tablename__ = "incidents"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    group_key = Column(String(255), nullable=False, index=True)  # Source, or alert type for alerts without one
+    title = Column(String(255), nullable=False)
+    severity = Column(String(20), nullable=False)  # Highest severity of its alerts
+    status = Column(String(20), nullable=False, default="open")  # open or resolved
+    alert_count = Column(Integer, nullable=False, default=0)  # Distinct alerts
+    occurrence_count = Column(Integer, nullable=False, default=0)  # Including repeats
+    first_seen_at = Column(DateTime, nullable=False)
+    last_seen_at = Column(DateTime, nullable=False)
+    resolved_at = Column(DateTime)
+    
+    def __repr__(self):
+        return f"<Incident(id={self.id}, group='{self.group_key}', status='{self.status}')>"
+
+class AlertCounter(Base):
+    """Alert counts kept up to date in the transactions that create and resolve alerts"""
+    __tablename__ = "alert_counters"
+    
+    # alerts:<severity>:<open|resolved>, occurrences, incidents:open or created:<hour>
+    name = Column(String(100), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<AlertCounter(name='{self.name}', value={self.value})>"
+
+class Notification(Base):
+    """Outbound notification waiting for, or done with, delivery by the dispatcher"""
+    __tablename__ = "notification_queue"
+    __table_args__ = (
+        Index("ix_notification_queue_due", "status", "next_attempt_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    channel = Column(String(50), nullable=False)  # email
+    alert_id = Column(Integer, index=True)
+    payload = Column(JSON, nullable=False)  # Channel-specific message, e.g. subject, body and recipients
+    status = Column(String(20), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(Text)
+    created_at = Column(DateTime, nullable=False)
+    sent_at = Column(DateTime)
+    claimed_by = Column(String(255))  # host:pid of the dispatcher sending it
+    claimed_until = Column(DateTime)  # Other dispatchers may take over a "sending" row after this
     
     def __repr__(self):
-        return f"<Alert(id={self.id}, type='{self.alert_type}', severity='{self.severity}')>" 
\ No newline at end of file
+        return f"<Notification(id={self.id}, channel='{self.channel}', status='{self.status}')>"
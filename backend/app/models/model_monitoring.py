@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, Boolean, JSON, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -12,7 +12,9 @@ class ModelPerformance(Base):
     metric_value = Column(Float, nullable=False)
     sample_size = Column(Integer)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
-    metadata = Column(JSON)  # Additional model metadata
+    metadata_ = Column("metadata", JSON)  # Additional model metadata ("metadata" is reserved by SQLAlchemy)
+    prediction_id = Column(String(64), unique=True, index=True)  # Returned to clients to report ground truth
+    ground_truth = Column(String(255))  # Actual label or value, once feedback arrives
     
     def __repr__(self):
         return f"<ModelPerformance(id={self.id}, model='{self.model_name}', metric='{self.metric_name}')>"
@@ -32,4 +34,84 @@ class ModelDrift(Base):
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     
     def __repr__(self):
-        return f"<ModelDrift(id={self.id}, model='{self.model_name}', type='{self.drift_type}')>" 
\ No newline at end of file
+        return f"<ModelDrift(id={self.id}, model='{self.model_name}', type='{self.drift_type}')>"
+
+class DriftCheckState(Base):
+    """Schedule and progress of one model's scheduled drift checks, shared by every app process
+    
+    A process only checks a model after claiming it with a conditional
+    UPDATE; the claim lapses at claimed_until, so a process that dies
+    mid-check doesn't hold the model for good.
+    """
+    __tablename__ = "drift_check_state"
+    
+    model_name = Column(String(255), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)  # Highest prediction log id covered by the last check
+    next_run_at = Column(DateTime, nullable=False)
+    interval = Column(Float)  # Seconds between checks, overriding the configured interval
+    claimed_by = Column(String(255))  # host:pid of the process running the check
+    claimed_until = Column(DateTime)
+    
+    def __repr__(self):
+        return f"<DriftCheckState(model='{self.model_name}', last_id={self.last_id}, next_run_at='{self.next_run_at}')>"
+
+class ModelMetricBucket(Base):
+    """Running ground-truth metric sums of one model version over one time bucket
+    
+    Classification feedback keeps one row per confusion matrix cell;
+    regression feedback keeps one row of error moments with empty labels.
+    """
+    __tablename__ = "model_metric_buckets"
+    __table_args__ = (
+        UniqueConstraint("model_name", "model_version", "bucket_start", "actual_label", "predicted_label", name="uq_model_metric_buckets_cell"),
+        Index("ix_model_metric_buckets_model_bucket", "model_name", "bucket_start"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    model_name = Column(String(255), nullable=False)
+    model_version = Column(String(50), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)  # Start of the prediction-time bucket
+    actual_label = Column(String(255), nullable=False, default="")
+    predicted_label = Column(String(255), nullable=False, default="")
+    count = Column(Integer, nullable=False, default=0)
+    sum_error = Column(Float, nullable=False, default=0.0)  # Sums of (prediction - actual) for regression
+    sum_squared_error = Column(Float, nullable=False, default=0.0)
+    sum_abs_error = Column(Float, nullable=False, default=0.0)
+    
+    def __repr__(self):
+        return f"<ModelMetricBucket(model='{self.model_name}', bucket='{self.bucket_start}', count={self.count})>"
+
+class MetricRollup(Base):
+    """Aggregate of performance or drift rows of one series over one minute, hour or day
+    
+    A series is a (model, version, metric or drift type, feature) of one
+    source. Rollups are updated as raw rows are written, so history
+    queries read one row per bucket instead of every raw row.
+    """
+    __tablename__ = "metric_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "source", "model_name", "model_version", "metric_name", "feature_name", "resolution", "bucket_start",
+            name="uq_metric_rollups_bucket"
+        ),
+        Index("ix_metric_rollups_series", "model_name", "source", "resolution", "bucket_start"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String(20), nullable=False)  # performance or drift
+    model_name = Column(String(255), nullable=False)
+    model_version = Column(String(50), nullable=False)
+    metric_name = Column(String(100), nullable=False)  # Performance metric name or drift type
+    feature_name = Column(String(255), nullable=False, default="")
+    resolution = Column(String(10), nullable=False)  # minute, hour or day
+    bucket_start = Column(DateTime, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    sum_value = Column(Float, nullable=False, default=0.0)  # Metric value or drift score
+    min_value = Column(Float, nullable=False)
+    max_value = Column(Float, nullable=False)
+    sum_sample_size = Column(Integer, nullable=False, default=0)
+    sum_threshold = Column(Float, nullable=False, default=0.0)
+    detected_count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<MetricRollup(model='{self.model_name}', metric='{self.metric_name}', {self.resolution}='{self.bucket_start}')>"
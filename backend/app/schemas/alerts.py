@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 class AlertCreate(BaseModel):
@@ -19,10 +19,44 @@ class AlertResponse(BaseModel):
     source: Optional[str] = None
     is_resolved: bool
     created_at: datetime
+    occurrence_count: int = 1
+    last_seen_at: Optional[datetime] = None
+    incident_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+class IncidentResponse(BaseModel):
+    id: int
+    group_key: str
+    title: str
+    severity: str
+    status: str
+    alert_count: int
+    occurrence_count: int
+    first_seen_at: datetime
+    last_seen_at: datetime
+    resolved_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
 class AlertUpdate(BaseModel):
     is_resolved: Optional[bool] = None
-    resolved_by: Optional[str] = None 
\ No newline at end of file
+    resolved_by: Optional[str] = None
+
+class AlertFilter(BaseModel):
+    severity: Optional[str] = None
+    alert_type: Optional[str] = None
+    source: Optional[str] = None
+    incident_id: Optional[int] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+class AlertSelection(BaseModel):
+    """Alerts by id, by filter, or the ids among those matching the filter"""
+    ids: Optional[List[int]] = None
+    filter: Optional[AlertFilter] = None
+
+class BulkResolveRequest(AlertSelection):
+    resolved_by: str = "system"
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
 from datetime import datetime
 
 class ModelPerformanceCreate(BaseModel):
@@ -11,27 +11,35 @@ class ModelPerformanceCreate(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 class ModelPerformanceResponse(BaseModel):
-    id: int
+    id: Optional[int] = None  # None for rollup buckets
     model_name: str
     model_version: str
     metric_name: str
-    metric_value: float
+    metric_value: float  # Mean over the bucket for rollups
     sample_size: Optional[int] = None
-    timestamp: datetime
+    timestamp: datetime  # Bucket start for rollups
+    resolution: str = "raw"  # raw, minute, hour or day
+    count: int = 1
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
 
     class Config:
         from_attributes = True
 
 class ModelDriftResponse(BaseModel):
-    id: int
+    id: Optional[int] = None  # None for rollup buckets
     model_name: str
     model_version: str
     drift_type: str
-    drift_score: float
+    drift_score: float  # Mean over the bucket for rollups
     threshold: float
-    is_drift_detected: bool
+    is_drift_detected: bool  # Any check in the bucket detected drift
     feature_name: Optional[str] = None
-    timestamp: datetime
+    timestamp: datetime  # Bucket start for rollups
+    resolution: str = "raw"  # raw, minute, hour or day
+    count: int = 1
+    max_drift_score: Optional[float] = None
+    detected_count: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -45,8 +53,13 @@ class ModelSummary(BaseModel):
 class PredictionRequest(BaseModel):
     features: Dict[str, Any]
 
+class PredictionFeedback(BaseModel):
+    prediction_id: str
+    actual: Union[float, str]
+
 class PredictionResponse(BaseModel):
     prediction: Any
     confidence: float
     model_name: str
-    model_version: str 
\ No newline at end of file
+    model_version: str
+    prediction_id: Optional[str] = None
@@ -0,0 +1,206 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, or_, update
+from sqlalchemy.orm import Session
+
+from app.models.alerts import Alert, AlertCounter, Incident
+
+HOUR_FORMAT = "%Y-%m-%dT%H"
+# Set once the counters have been built from the alerts table
+INITIALIZED = "initialized"
+
+def created_key(moment: datetime) -> str:
+    return f"created:{moment.strftime(HOUR_FORMAT)}"
+
+class AlertCounters:
+    """Alert summary counts, aggregated on demand or read from maintained counters
+
+    Without counters a summary is one grouped aggregate over the alerts
+    table. With them, AlertService adds deltas to `alert_counters` in the
+    same transaction that creates, repeats or resolves an alert, and a
+    summary reads a fixed number of counter rows however many alerts
+    exist. Alerts created in the last 24 hours are counted per hour; the
+    part of the oldest hour inside the window is counted from the alerts
+    themselves over the (created_at, id) index.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def alert_created(self, db: Session, severity: str, created_at: datetime, incident_opened: bool) -> None:
+        self.alerts_created(db, {severity: 1}, 1, created_at, int(incident_opened))
+
+    def alert_repeated(self, db: Session, old_severity: str, new_severity: str) -> None:
+        self.alerts_repeated(db, 1, [(old_severity, new_severity)])
+
+    def alert_resolved(self, db: Session, severity: str, incident_resolved: bool) -> None:
+        self.alerts_resolved(db, {severity: 1}, int(incident_resolved))
+
+    def alerts_created(
+        self,
+        db: Session,
+        by_severity: Dict[str, int],
+        occurrences: int,
+        created_at: datetime,
+        incidents_opened: int
+    ) -> None:
+        deltas = {f"alerts:{severity}:open": count for severity, count in by_severity.items()}
+        deltas["occurrences"] = occurrences
+        deltas[created_key(created_at)] = sum(by_severity.values())
+        deltas["incidents:open"] = incidents_opened
+        self._add(db, deltas)
+
+    def alerts_repeated(self, db: Session, occurrences: int, severity_changes: List[Tuple[str, str]]) -> None:
+        """Repeats counted on open alerts, with the (old, new) severity of each alert they touched"""
+        deltas = {"occurrences": occurrences}
+        for old_severity, new_severity in severity_changes:
+            if new_severity != old_severity:
+                deltas[f"alerts:{old_severity}:open"] = deltas.get(f"alerts:{old_severity}:open", 0) - 1
+                deltas[f"alerts:{new_severity}:open"] = deltas.get(f"alerts:{new_severity}:open", 0) + 1
+        self._add(db, deltas)
+
+    def alerts_resolved(self, db: Session, by_severity: Dict[str, int], incidents_resolved: int) -> None:
+        self._move(db, by_severity, "open", "resolved", -incidents_resolved)
+
+    def alerts_reopened(self, db: Session, by_severity: Dict[str, int], incidents_reopened: int) -> None:
+        self._move(db, by_severity, "resolved", "open", incidents_reopened)
+
+    def _move(self, db: Session, by_severity: Dict[str, int], source: str, target: str, open_incidents: int) -> None:
+        deltas = {"incidents:open": open_incidents}
+        for severity, count in by_severity.items():
+            deltas[f"alerts:{severity}:{source}"] = -count
+            deltas[f"alerts:{severity}:{target}"] = count
+        self._add(db, deltas)
+
+    def _add(self, db: Session, deltas: Dict[str, int]) -> None:
+        """Add deltas to counters in the caller's transaction; the caller commits"""
+        if not self.enabled:
+            return
+        rows = [{"name": name, "value": value} for name, value in deltas.items() if value]
+        if not rows:
+            return
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            for row in rows:
+                result = db.execute(
+                    update(AlertCounter)
+                    .where(AlertCounter.name == row["name"])
+                    .values(value=AlertCounter.value + row["value"])
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount == 0:
+                    db.add(AlertCounter(**row))
+            return
+
+        statement = upsert(AlertCounter)
+        statement = statement.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"value": AlertCounter.value + statement.excluded.value}
+        )
+        db.execute(statement, rows)
+
+    def sync(self, db: Session, now: Optional[datetime] = None) -> None:
+        """Build the counters if they don't reflect the alerts yet, otherwise drop expired hours"""
+        now = now or datetime.now()
+        if not self.enabled:
+            # Counters stop being maintained, so they are rebuilt if enabled again
+            db.query(AlertCounter).filter(AlertCounter.name == INITIALIZED).delete(synchronize_session=False)
+        elif db.get(AlertCounter, INITIALIZED) is None:
+            self.rebuild(db, now)
+        else:
+            db.query(AlertCounter)\
+                .filter(AlertCounter.name.like("created:%"))\
+                .filter(AlertCounter.name < created_key(now - timedelta(days=1)))\
+                .delete(synchronize_session=False)
+        db.commit()
+
+    def rebuild(self, db: Session, now: datetime) -> None:
+        """Recount every counter from the alerts and incidents tables"""
+        db.query(AlertCounter).delete(synchronize_session=False)
+
+        values: Dict[str, int] = {INITIALIZED: 1, "occurrences": 0}
+        grouped = db.query(
+            Alert.severity,
+            Alert.is_resolved,
+            func.count(Alert.id),
+            func.sum(func.coalesce(Alert.occurrence_count, 1))
+        ).group_by(Alert.severity, Alert.is_resolved).all()
+        for severity, is_resolved, count, occurrences in grouped:
+            name = f"alerts:{severity}:{'resolved' if is_resolved else 'open'}"
+            values[name] = values.get(name, 0) + count
+            values["occurrences"] += int(occurrences or 0)
+        values["incidents:open"] = db.query(func.count(Incident.id)).filter(Incident.status == "open").scalar() or 0
+
+        since = (now - timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        hourly = db.query(Alert.created_at).filter(Alert.created_at >= since).all()
+        for (created_at,) in hourly:
+            name = created_key(created_at)
+            values[name] = values.get(name, 0) + 1
+
+        db.add_all(AlertCounter(name=name, value=value) for name, value in values.items())
+
+    def summary(self, db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Counts of alerts by severity and state, occurrences, open incidents and alerts of the last 24 hours"""
+        now = now or datetime.now()
+        since = now - timedelta(days=1)
+        by_severity: Dict[str, Dict[str, int]] = {}
+
+        if self.enabled:
+            # The hours after the one the window starts in, then that hour's part from the alerts
+            counters = db.query(AlertCounter.name, AlertCounter.value).filter(or_(
+                ~AlertCounter.name.like("created:%"),
+                and_(AlertCounter.name > created_key(since), AlertCounter.name <= created_key(now))
+            )).all()
+            occurrences = open_incidents = recent = 0
+            for name, value in counters:
+                if name.startswith("alerts:"):
+                    if not value:
+                        continue
+                    _, severity, state = name.split(":")
+                    by_severity.setdefault(severity, {"open": 0, "resolved": 0})[state] = value
+                elif name == "occurrences":
+                    occurrences = value
+                elif name == "incidents:open":
+                    open_incidents = value
+                elif name.startswith("created:"):
+                    recent += value
+            hour_end = since.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            recent += db.query(func.count(Alert.id))\
+                .filter(Alert.created_at >= since)\
+                .filter(Alert.created_at < hour_end)\
+                .scalar() or 0
+        else:
+            grouped = db.query(
+                Alert.severity,
+                Alert.is_resolved,
+                func.count(Alert.id),
+                func.sum(func.coalesce(Alert.occurrence_count, 1)),
+                func.sum(case((Alert.created_at >= since, 1), else_=0))
+            ).group_by(Alert.severity, Alert.is_resolved).all()
+            occurrences = recent = 0
+            for severity, is_resolved, count, severity_occurrences, severity_recent in grouped:
+                state = "resolved" if is_resolved else "open"
+                counts = by_severity.setdefault(severity, {"open": 0, "resolved": 0})
+                counts[state] += count
+                occurrences += int(severity_occurrences or 0)
+                recent += int(severity_recent or 0)
+            open_incidents = db.query(func.count(Incident.id)).filter(Incident.status == "open").scalar() or 0
+
+        total = sum(counts["open"] + counts["resolved"] for counts in by_severity.values())
+        return {
+            "total_alerts": total,
+            "unresolved_alerts": sum(counts["open"] for counts in by_severity.values()),
+            "critical_alerts": by_severity.get("critical", {}).get("open", 0),
+            "high_alerts": by_severity.get("high", {}).get("open", 0),
+            "recent_alerts_24h": recent,
+            "total_occurrences": occurrences,
+            "deduplicated_occurrences": occurrences - total,
+            "open_incidents": open_incidents,
+            "by_severity": by_severity
+        }
@@ -0,0 +1,273 @@
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.alerts import Alert
+
+SOURCES = {"quality": "data_quality", "drift": "model_drift"}
+
+def _isin(column: np.ndarray, values: Any) -> np.ndarray:
+    return np.isin(column, np.asarray(list(values), dtype=column.dtype if column.dtype != object else object))
+
+OPERATORS: Dict[str, Callable[[np.ndarray, Any], np.ndarray]] = {
+    "==": np.equal,
+    "!=": np.not_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "in": _isin
+}
+
+def columns(rows: List[Dict[str, Any]], fields: List[str]) -> Dict[str, np.ndarray]:
+    """One array per field over a batch of result rows; numbers and booleans get numeric arrays"""
+    arrays = {}
+    for field in fields:
+        values = [row.get(field) for row in rows]
+        if all(isinstance(value, (bool, np.bool_)) for value in values):
+            arrays[field] = np.array(values, dtype=bool)
+            continue
+        try:
+            # Missing numbers become NaN, which fails every comparison
+            arrays[field] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+        except (TypeError, ValueError):
+            arrays[field] = np.array(values, dtype=object)
+    return arrays
+
+class AlertRule:
+    """A rule compiled from its settings entry into vectorized conditions
+
+    `when` maps a result field to a value it must equal, or to an
+    [operator, operand] pair; the operand is a constant or
+    {"field": name, "scale": k} to compare against another field of the
+    same result. All conditions must hold.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.name = spec["name"]
+        self.source = spec["source"]
+        if self.source not in SOURCES:
+            raise ValueError(f"Unknown alert rule source: {self.source}")
+        self.alert_type = spec.get("alert", SOURCES[self.source])
+        if self.alert_type not in ("data_quality", "model_drift", "system"):
+            raise ValueError(f"Unknown alert type of rule {self.name}: {self.alert_type}")
+        self.severity = spec.get("severity")
+        self.title = spec.get("title", f"Alert rule {self.name} matched")
+        self.message = spec.get("message", "")
+
+        self.conditions: List[Tuple[str, Callable, Any]] = []
+        for field, condition in spec.get("when", {}).items():
+            operator, operand = condition if isinstance(condition, (list, tuple)) else ("==", condition)
+            if operator not in OPERATORS:
+                raise ValueError(f"Unknown operator in rule {self.name}: {operator}")
+            self.conditions.append((field, OPERATORS[operator], operand))
+
+    @property
+    def fields(self) -> List[str]:
+        fields = []
+        for field, _, operand in self.conditions:
+            fields.append(field)
+            if isinstance(operand, dict):
+                fields.append(operand["field"])
+        return fields
+
+    def evaluate(self, arrays: Dict[str, np.ndarray], n_rows: int) -> np.ndarray:
+        """Boolean mask of the rows matching every condition"""
+        mask = np.ones(n_rows, dtype=bool)
+        for field, operator, operand in self.conditions:
+            if isinstance(operand, dict):
+                operand = arrays[operand["field"]] * operand.get("scale", 1.0)
+            mask &= operator(arrays[field], operand)
+        return mask
+
+class AlertRuleEngine:
+    """Turns quality check and drift results into alerts as they are written
+
+    Writers `submit` their result rows; one background thread drains the
+    queue and evaluates every rule of a source over all of its pending
+    rows at once, each condition as one array comparison. Matches become
+    alerts through the AlertService factories and are stored together
+    with `record_alerts`, so repeats are deduplicated. Evaluation and
+    alert write time are recorded per batch.
+    """
+
+    def __init__(
+        self,
+        alert_service: Any,
+        session_factory: Optional[Callable],
+        rules: List[Dict[str, Any]],
+        batch_size: int = 1000,
+        max_pending: int = 10000,
+        history: int = 100
+    ):
+        self.alert_service = alert_service
+        self.session_factory = session_factory
+        self.rules = [AlertRule(spec) for spec in rules]
+        self.batch_size = batch_size
+
+        self.batches = 0
+        self.evaluated = 0
+        self.matched = 0
+        self.alerts_created = 0
+        self.dropped = 0
+        self.failures = 0
+        self.recent: deque = deque(maxlen=history)
+        self.rule_matches: Dict[str, int] = {rule.name: 0 for rule in self.rules}
+
+        self._queue: "queue.Queue" = queue.Queue(max_pending)
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, source: str, rows: List[Dict[str, Any]]) -> None:
+        """Queue written result rows; dropped when evaluation falls behind"""
+        for row in rows:
+            try:
+                self._queue.put_nowait((source, row))
+            except queue.Full:
+                self.dropped += 1
+
+    def evaluate(self, source: str, rows: List[Dict[str, Any]]) -> List[Tuple[AlertRule, Dict[str, Any]]]:
+        """(rule, row) of every match, rules in configured order"""
+        rules = [rule for rule in self.rules if rule.source == source]
+        if not rules or not rows:
+            return []
+        arrays = columns(rows, sorted({field for rule in rules for field in rule.fields}))
+        matches = []
+        for rule in rules:
+            indices = np.flatnonzero(rule.evaluate(arrays, len(rows)))
+            self.rule_matches[rule.name] += len(indices)
+            matches.extend((rule, rows[i]) for i in indices)
+        return matches
+
+    def build_alert(self, rule: AlertRule, row: Dict[str, Any]) -> Alert:
+        if rule.alert_type == "data_quality":
+            alert = self.alert_service.create_data_quality_alert(
+                row.get("source_name") or f"data_source_{row.get('data_source_id')}",
+                row["check_type"],
+                row.get("details") or "",
+                severity=rule.severity or "medium"
+            )
+        elif rule.alert_type == "model_drift":
+            feature_name = row.get("feature_name")
+            label = f"{row['drift_type']} ({feature_name})" if feature_name else row["drift_type"]
+            alert = self.alert_service.create_model_drift_alert(row["model_name"], label, row["drift_score"], row["threshold"])
+            if rule.severity:
+                alert.severity = rule.severity
+        else:
+            fields = {key: value for key, value in row.items() if not isinstance(value, (dict, list))}
+            alert = self.alert_service.create_system_alert(
+                rule.title.format_map(_Missing(fields)),
+                rule.message.format_map(_Missing(fields)),
+                severity=rule.severity or "medium"
+            )
+        alert.metadata_ = {**(alert.metadata_ or {}), "rule": rule.name}
+        return alert
+
+    def process(self, batch: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Evaluate the rules over a batch and store the alerts of its matches"""
+        by_source: Dict[str, List[Dict[str, Any]]] = {}
+        for source, row in batch:
+            by_source.setdefault(source, []).append(row)
+
+        started = time.perf_counter()
+        matches = []
+        for source, rows in by_source.items():
+            matches.extend(self.evaluate(source, rows))
+        eval_ms = (time.perf_counter() - started) * 1000
+
+        # Building and storing the alerts, timed apart from rule evaluation
+        started = time.perf_counter()
+        alerts = [self.build_alert(rule, row) for rule, row in matches]
+        created = 0
+        if alerts and self.session_factory is not None:
+            db = self.session_factory()
+            try:
+                new_alerts, escalated, _ = self.alert_service.record_alerts(db, alerts)
+                created = len(new_alerts)
+                for alert in new_alerts + escalated:
+                    self.alert_service.send_notification(alert)
+            finally:
+                db.close()
+        write_ms = (time.perf_counter() - started) * 1000
+
+        stats = {
+            "rows": len(batch),
+            "matches": len(matches),
+            "alerts_created": created,
+            "eval_ms": round(eval_ms, 3),
+            "eval_us_per_row": round(eval_ms * 1000 / len(batch), 3) if batch else 0.0,
+            "write_ms": round(write_ms, 3),
+            "at": time.time()
+        }
+        self.batches += 1
+        self.evaluated += len(batch)
+        self.matched += len(matches)
+        self.alerts_created += created
+        self.recent.append(stats)
+        return stats
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="alert-rules", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            # Everything already queued joins the batch, up to its size
+            batch = []
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self.process(batch)
+                except Exception as e:
+                    self.failures += 1
+                    print(f"Error evaluating alert rules: {e}")
+            if item is None:
+                return
+
+    def get_stats(self) -> Dict[str, Any]:
+        recent = list(self.recent)
+        eval_ms = [batch["eval_ms"] for batch in recent]
+        per_row = [batch["eval_us_per_row"] for batch in recent]
+        return {
+            "running": self._thread is not None,
+            "rules": [
+                {"name": rule.name, "source": rule.source, "alert": rule.alert_type, "matches": self.rule_matches[rule.name]}
+                for rule in self.rules
+            ],
+            "batches": self.batches,
+            "evaluated": self.evaluated,
+            "matched": self.matched,
+            "alerts_created": self.alerts_created,
+            "dropped": self.dropped,
+            "failures": self.failures,
+            "pending": self._queue.qsize(),
+            "eval_ms_p50": float(np.median(eval_ms)) if eval_ms else None,
+            "eval_ms_max": max(eval_ms) if eval_ms else None,
+            "eval_us_per_row_p50": float(np.median(per_row)) if per_row else None,
+            "recent_batches": recent[-10:]
+        }
+
+class _Missing(dict):
+    """Leaves unknown template fields as they are instead of failing"""
+
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
@@ -1,31 +1,519 @@
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import base64
+import hashlib
+import json
 import os
 
+from sqlalchemy import bindparam, func, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+
 from app.core.config import settings
-from app.models.alerts import Alert
+from app.models.alerts import Alert, Incident
+from app.services.alert_counters import AlertCounters
+from app.services.alert_throttle import AlertThrottle
+from app.services.notification_dispatcher import NotificationDispatcher, SmtpConnectionPool
+
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+def encode_cursor(alert: Alert) -> str:
+    """Opaque cursor for the page after this alert"""
+    key = json.dumps([alert.created_at.isoformat(), alert.id])
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(created_at, id) of the last alert of the previous page; raises ValueError if malformed"""
+    try:
+        created_at, alert_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(alert_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
 
 class AlertService:
     """Service for managing alerts and notifications"""
     
-    def __init__(self):
-        self.smtp_host = settings.SMTP_HOST
-        self.smtp_port = settings.SMTP_PORT
-        self.smtp_user = settings.SMTP_USER
-        self.smtp_password = settings.SMTP_PASSWORD
-        self.smtp_use_tls = settings.SMTP_USE_TLS
+    def __init__(self, session_factory: Optional[Callable] = None):
+        """With a session factory, notifications are queued and delivered in the background"""
+        self.smtp_host = settings.smtp_host
+        self.smtp_port = settings.smtp_port
+        self.smtp_user = settings.smtp_user
+        self.smtp_password = settings.smtp_password
+        self.smtp_use_tls = settings.smtp_use_tls
+        self.smtp_pool = SmtpConnectionPool(
+            self.smtp_host,
+            self.smtp_port,
+            self.smtp_user,
+            self.smtp_password,
+            use_tls=self.smtp_use_tls,
+            size=settings.notification_channel_concurrency.get("email", 1),
+            timeout=settings.smtp_timeout,
+            idle_timeout=settings.smtp_idle_timeout
+        )
+        self.dispatcher: Optional[NotificationDispatcher] = None
+        if session_factory is not None:
+            self.dispatcher = NotificationDispatcher(
+                session_factory,
+                {"email": self.deliver_email},
+                concurrency=settings.notification_channel_concurrency,
+                max_attempts=settings.notification_max_attempts,
+                backoff_base=settings.notification_backoff_base,
+                backoff_max=settings.notification_backoff_max,
+                claim_timeout=settings.notification_claim_timeout
+            )
+        self.fingerprint_keys = settings.alert_fingerprint_keys
+        self.incident_window = timedelta(minutes=settings.alert_incident_window_minutes)
+        self.deduplicated = 0
+        self.counters = AlertCounters(settings.alert_counters_enabled)
+        self.throttle = AlertThrottle(
+            settings.alert_source_rate_limit,
+            settings.alert_severity_rate_limits,
+            digest_interval=settings.alert_digest_interval_seconds,
+            on_digest=self.send_digest
+        )
+    
+    def list_alerts(
+        self,
+        db: Session,
+        severity: Optional[str] = None,
+        alert_type: Optional[str] = None,
+        is_resolved: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[Alert], Optional[str]]:
+        """One page of alerts newest first, and the cursor of the next page if there is one
+        
+        Pages continue from the (created_at, id) of the previous page's last
+        alert rather than skipping rows, so every page walks the same
+        number of index entries however deep it is.
+        """
+        query = db.query(Alert)
+        if severity:
+            query = query.filter(Alert.severity == severity)
+        if alert_type:
+            query = query.filter(Alert.alert_type == alert_type)
+        if is_resolved is not None:
+            query = query.filter(Alert.is_resolved == is_resolved)
+        if cursor:
+            query = query.filter(tuple_(Alert.created_at, Alert.id) < tuple_(*decode_cursor(cursor)))
+        
+        # One extra row tells whether another page follows
+        alerts = query.order_by(Alert.created_at.desc(), Alert.id.desc()).limit(limit + 1).all()
+        if len(alerts) <= limit:
+            return alerts, None
+        alerts = alerts[:limit]
+        return alerts, encode_cursor(alerts[-1])
+    
+    def fingerprint(self, alert: Alert) -> str:
+        """Hash of the alert type, source and the metadata identifying the problem"""
+        metadata = alert.metadata_ or {}
+        keys = self.fingerprint_keys.get(alert.alert_type)
+        if keys is None:
+            # Scores and other measurements change between occurrences of the same problem
+            keys = [key for key, value in metadata.items() if not isinstance(value, float)]
+        identity = [alert.alert_type, alert.source or "", sorted((key, str(metadata.get(key))) for key in keys)]
+        return hashlib.sha256(json.dumps(identity).encode()).hexdigest()
+    
+    def record_alert(self, db: Session, alert: Alert) -> Tuple[Alert, bool]:
+        """Persist an alert, or count it as a repeat of the open alert with the same fingerprint
+        
+        Returns the stored alert and whether to notify: new alerts are
+        notified, repeats only when they raise the severity.
+        """
+        alert.fingerprint = self.fingerprint(alert)
+        for attempt in range(2):
+            now = datetime.now()
+            existing = db.query(Alert)\
+                .filter(Alert.fingerprint == alert.fingerprint)\
+                .filter(Alert.is_resolved == False)\
+                .with_for_update()\
+                .first()
+            if existing is not None:
+                previous_severity = existing.severity
+                escalated = SEVERITY_RANK.get(alert.severity, 0) > SEVERITY_RANK.get(previous_severity, 0)
+                # In SQL, so concurrent repeats are all counted
+                existing.occurrence_count = func.coalesce(Alert.occurrence_count, 1) + 1
+                existing.last_seen_at = now
+                existing.message = alert.message
+                existing.metadata_ = alert.metadata_
+                if escalated:
+                    existing.severity = alert.severity
+                if existing.incident_id is not None:
+                    self._add_to_incident(db.get(Incident, existing.incident_id), alert.severity, now, 0, 1)
+                self.counters.alert_repeated(db, previous_severity, existing.severity)
+                db.commit()
+                db.refresh(existing)
+                self.deduplicated += 1
+                return existing, escalated
+            
+            alert.occurrence_count = 1
+            alert.created_at = now
+            alert.last_seen_at = now
+            incident, incident_opened = self._open_incident(db, alert, now)
+            alert.incident_id = incident.id
+            db.add(alert)
+            self.counters.alert_created(db, alert.severity, now, incident_opened)
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another writer opened an alert with this fingerprint first; count against it
+                db.rollback()
+                if attempt:
+                    raise
+                continue
+            db.refresh(alert)
+            return alert, True
+    
+    def _open_incident(self, db: Session, alert: Alert, now: datetime) -> Tuple[Incident, bool]:
+        """The source's open incident if it fired within the window, otherwise a new one, and whether it is new"""
+        group_key = alert.source or alert.alert_type
+        incident = db.query(Incident)\
+            .filter(Incident.group_key == group_key)\
+            .filter(Incident.status == "open")\
+            .filter(Incident.last_seen_at >= now - self.incident_window)\
+            .order_by(Incident.last_seen_at.desc())\
+            .first()
+        opened = incident is None
+        if opened:
+            incident = Incident(
+                group_key=group_key,
+                title=f"Alerts from {group_key}",
+                severity=alert.severity,
+                status="open",
+                alert_count=0,
+                occurrence_count=0,
+                first_seen_at=now,
+                last_seen_at=now
+            )
+            db.add(incident)
+            db.flush()
+        self._add_to_incident(incident, alert.severity, now, 1, 1)
+        return incident, opened
+    
+    @staticmethod
+    def _add_to_incident(incident: Optional[Incident], severity: str, now: datetime, new_alerts: int, occurrences: int) -> None:
+        if incident is None:
+            return
+        if new_alerts:
+            incident.alert_count = Incident.alert_count + new_alerts
+        incident.occurrence_count = Incident.occurrence_count + occurrences
+        incident.last_seen_at = now
+        if SEVERITY_RANK.get(severity, 0) > SEVERITY_RANK.get(incident.severity, 0):
+            incident.severity = severity
+    
+    def resolve_alert(self, db: Session, alert: Alert, resolved_by: str) -> None:
+        """Resolve an alert, and its incident once none of the incident's alerts are open"""
+        if alert.is_resolved:
+            return
+        now = datetime.now()
+        alert.is_resolved = True
+        alert.resolved_at = now
+        alert.resolved_by = resolved_by
+        db.flush()
+        
+        incident_resolved = False
+        if alert.incident_id is not None:
+            still_open = db.query(Alert.id)\
+                .filter(Alert.incident_id == alert.incident_id)\
+                .filter(Alert.is_resolved == False)\
+                .first()
+            incident = db.get(Incident, alert.incident_id)
+            if still_open is None and incident is not None and incident.status == "open":
+                incident.status = "resolved"
+                incident.resolved_at = now
+                incident_resolved = True
+        self.counters.alert_resolved(db, alert.severity, incident_resolved)
+        db.commit()
+        db.refresh(alert)
+    
+    def record_alerts(self, db: Session, alerts: List[Alert]) -> Tuple[List[Alert], List[Alert], int]:
+        """Persist many alerts at once with the same deduplication as `record_alert`
+        
+        Alerts sharing a fingerprint collapse into one, open alerts they
+        repeat are updated with one executemany UPDATE, and the rest are
+        inserted in one batched INSERT. Returns the new alerts and the
+        escalated existing ones, both to notify, and the number of alerts
+        counted as repeats.
+        """
+        groups: Dict[str, List[Alert]] = {}
+        for alert in alerts:
+            groups.setdefault(self.fingerprint(alert), []).append(alert)
+        
+        for attempt in range(2):
+            now = datetime.now()
+            existing = db.query(Alert.id, Alert.fingerprint, Alert.severity, Alert.incident_id)\
+                .filter(Alert.fingerprint.in_(list(groups)))\
+                .filter(Alert.is_resolved == False)\
+                .with_for_update()\
+                .all()
+            existing_by_fingerprint = {row.fingerprint: row for row in existing}
+            
+            # Per incident: [new alerts, occurrences, highest severity]
+            incident_changes: Dict[int, List[Any]] = {}
+            def touch_incident(incident_id: int, severity: str, new_alerts: int, occurrences: int) -> None:
+                change = incident_changes.setdefault(incident_id, [0, 0, severity])
+                change[0] += new_alerts
+                change[1] += occurrences
+                if SEVERITY_RANK.get(severity, 0) > SEVERITY_RANK.get(change[2], 0):
+                    change[2] = severity
+            
+            repeats, severity_changes, escalated_ids = [], [], []
+            for row in existing:
+                group = groups[row.fingerprint]
+                severity = max([row.severity] + [alert.severity for alert in group], key=lambda s: SEVERITY_RANK.get(s, 0))
+                if severity != row.severity:
+                    escalated_ids.append(row.id)
+                severity_changes.append((row.severity, severity))
+                repeats.append({
+                    "alert_id": row.id,
+                    "repeats": len(group),
+                    "new_severity": severity,
+                    "new_message": group[-1].message,
+                    "new_metadata": group[-1].metadata_
+                })
+                if row.incident_id is not None:
+                    touch_incident(row.incident_id, severity, 0, len(group))
+            if repeats:
+                # On the table rather than the entity, so it runs as a plain executemany
+                alerts_table = Alert.__table__
+                db.execute(
+                    update(alerts_table)
+                    .where(alerts_table.c.id == bindparam("alert_id"))
+                    .values({
+                        "occurrence_count": func.coalesce(alerts_table.c.occurrence_count, 1) + bindparam("repeats"),
+                        "severity": bindparam("new_severity"),
+                        "message": bindparam("new_message"),
+                        "metadata": bindparam("new_metadata", type_=alerts_table.c.metadata.type),
+                        "last_seen_at": now
+                    }),
+                    repeats
+                )
+            
+            # One new alert per remaining fingerprint, carrying its repeats within the batch
+            new_groups = {fingerprint: group for fingerprint, group in groups.items() if fingerprint not in existing_by_fingerprint}
+            group_keys = {group[0].source or group[0].alert_type for group in new_groups.values()}
+            incidents: Dict[str, Incident] = {}
+            if group_keys:
+                open_incidents = db.query(Incident)\
+                    .filter(Incident.group_key.in_(group_keys))\
+                    .filter(Incident.status == "open")\
+                    .filter(Incident.last_seen_at >= now - self.incident_window)\
+                    .order_by(Incident.last_seen_at)\
+                    .all()
+                # Most recently active last, so it wins
+                incidents = {incident.group_key: incident for incident in open_incidents}
+            opened = [
+                Incident(
+                    group_key=group_key,
+                    title=f"Alerts from {group_key}",
+                    severity="low",
+                    status="open",
+                    alert_count=0,
+                    occurrence_count=0,
+                    first_seen_at=now,
+                    last_seen_at=now
+                )
+                for group_key in group_keys if group_key not in incidents
+            ]
+            db.add_all(opened)
+            db.flush()
+            incidents.update((incident.group_key, incident) for incident in opened)
+            
+            new_alerts = []
+            for fingerprint, group in new_groups.items():
+                first, last = group[0], group[-1]
+                severity = max((alert.severity for alert in group), key=lambda s: SEVERITY_RANK.get(s, 0))
+                incident = incidents[first.source or first.alert_type]
+                new_alerts.append(Alert(
+                    alert_type=first.alert_type,
+                    severity=severity,
+                    title=last.title,
+                    message=last.message,
+                    source=first.source,
+                    metadata_=last.metadata_,
+                    is_resolved=False,
+                    created_at=now,
+                    fingerprint=fingerprint,
+                    occurrence_count=len(group),
+                    last_seen_at=now,
+                    incident_id=incident.id
+                ))
+                touch_incident(incident.id, severity, 1, len(group))
+            # Flushed together, as batched INSERTs with RETURNING for the ids
+            db.add_all(new_alerts)
+            db.flush()
+            new_ids = [alert.id for alert in new_alerts]
+            
+            by_id = {incident.id: incident for incident in incidents.values()}
+            missing = [incident_id for incident_id in incident_changes if incident_id not in by_id]
+            if missing:
+                by_id.update((incident.id, incident) for incident in db.query(Incident).filter(Incident.id.in_(missing)))
+            for incident_id, (new_count, occurrences, severity) in incident_changes.items():
+                self._add_to_incident(by_id.get(incident_id), severity, now, new_count, occurrences)
+            
+            by_severity: Dict[str, int] = {}
+            for alert in new_alerts:
+                by_severity[alert.severity] = by_severity.get(alert.severity, 0) + 1
+            self.counters.alerts_created(db, by_severity, sum(alert.occurrence_count for alert in new_alerts), now, len(opened))
+            self.counters.alerts_repeated(db, sum(repeat["repeats"] for repeat in repeats), severity_changes)
+            try:
+                db.commit()
+            except IntegrityError:
+                # A concurrent writer opened one of these fingerprints; redo against it
+                db.rollback()
+                if attempt:
+                    raise
+                continue
+            
+            repeated = len(alerts) - len(new_alerts)
+            self.deduplicated += repeated
+            # Reloaded with one query each, rather than a refresh per expired alert
+            new_alerts = db.query(Alert).filter(Alert.id.in_(new_ids)).order_by(Alert.id).all() if new_ids else []
+            escalated = db.query(Alert).filter(Alert.id.in_(escalated_ids)).all() if escalated_ids else []
+            return new_alerts, escalated, repeated
+    
+    def selection(
+        self,
+        ids: Optional[List[int]] = None,
+        severity: Optional[str] = None,
+        alert_type: Optional[str] = None,
+        source: Optional[str] = None,
+        incident_id: Optional[int] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> List[Any]:
+        """WHERE conditions selecting alerts by id and by filter; raises ValueError if nothing narrows it"""
+        conditions = []
+        if ids is not None:
+            conditions.append(Alert.id.in_(ids))
+        if severity:
+            conditions.append(Alert.severity == severity)
+        if alert_type:
+            conditions.append(Alert.alert_type == alert_type)
+        if source:
+            conditions.append(Alert.source == source)
+        if incident_id is not None:
+            conditions.append(Alert.incident_id == incident_id)
+        if created_after:
+            conditions.append(Alert.created_at >= created_after)
+        if created_before:
+            conditions.append(Alert.created_at < created_before)
+        if not conditions:
+            raise ValueError("Select alerts by ids or at least one filter")
+        return conditions
+    
+    def bulk_resolve(self, db: Session, conditions: List[Any], resolved_by: str) -> Dict[str, int]:
+        """Resolve every open alert matching the conditions in one UPDATE, then their finished incidents"""
+        now = datetime.now()
+        rows = self._update_returning(
+            db, Alert, conditions + [Alert.is_resolved == False],
+            {"is_resolved": True, "resolved_at": now, "resolved_by": resolved_by},
+            Alert.severity, Alert.incident_id
+        )
+        
+        incident_ids = {row.incident_id for row in rows if row.incident_id is not None}
+        incidents_resolved = []
+        if incident_ids:
+            still_open = select(Alert.id)\
+                .where(Alert.incident_id == Incident.id)\
+                .where(Alert.is_resolved == False)\
+                .exists()
+            incidents_resolved = self._update_returning(
+                db, Incident, [Incident.id.in_(incident_ids), Incident.status == "open", ~still_open],
+                {"status": "resolved", "resolved_at": now}
+            )
+        
+        by_severity: Dict[str, int] = {}
+        for row in rows:
+            by_severity[row.severity] = by_severity.get(row.severity, 0) + 1
+        self.counters.alerts_resolved(db, by_severity, len(incidents_resolved))
+        db.commit()
+        return {"resolved": len(rows), "incidents_resolved": len(incidents_resolved)}
+    
+    def bulk_reopen(self, db: Session, conditions: List[Any]) -> Dict[str, int]:
+        """Reopen every resolved alert matching the conditions in one UPDATE, with their incidents
+        
+        Only the newest alert of a fingerprint is reopened; older ones were
+        superseded by it and would duplicate it as open alerts.
+        """
+        newer = aliased(Alert)
+        superseded = select(newer.id)\
+            .where(newer.fingerprint == Alert.fingerprint)\
+            .where(newer.id > Alert.id)\
+            .exists()
+        rows = self._update_returning(
+            db, Alert, conditions + [Alert.is_resolved == True, ~superseded],
+            {"is_resolved": False, "resolved_at": None, "resolved_by": None},
+            Alert.severity, Alert.incident_id
+        )
+        
+        incident_ids = {row.incident_id for row in rows if row.incident_id is not None}
+        incidents_reopened = []
+        if incident_ids:
+            incidents_reopened = self._update_returning(
+                db, Incident, [Incident.id.in_(incident_ids), Incident.status == "resolved"],
+                {"status": "open", "resolved_at": None}
+            )
+        
+        by_severity: Dict[str, int] = {}
+        for row in rows:
+            by_severity[row.severity] = by_severity.get(row.severity, 0) + 1
+        self.counters.alerts_reopened(db, by_severity, len(incidents_reopened))
+        db.commit()
+        return {"reopened": len(rows), "incidents_reopened": len(incidents_reopened)}
+    
+    @staticmethod
+    def _update_returning(db: Session, model: Any, conditions: List[Any], values: Dict[str, Any], *columns: Any) -> List[Any]:
+        """UPDATE the matching rows and return their ids and `columns`
+        
+        One UPDATE ... RETURNING where the database supports it, otherwise
+        the rows are locked and read first, then updated by id.
+        """
+        if db.get_bind().dialect.update_returning:
+            return db.execute(
+                update(model)
+                .where(*conditions)
+                .values(**values)
+                .returning(model.id, *columns)
+                .execution_options(synchronize_session=False)
+            ).all()
+        rows = db.query(model.id, *columns).filter(*conditions).with_for_update().all()
+        if rows:
+            db.execute(
+                update(model)
+                .where(model.id.in_([row.id for row in rows]))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        return rows
     
     def send_notification(self, alert: Alert) -> bool:
-        """Send notification for an alert"""
+        """Send notification for an alert, or queue it when a dispatcher is running
+        
+        Alerts over their source's or severity's rate limit are held for the
+        next digest instead.
+        """
         try:
+            if not self.throttle.allow(alert.source or alert.alert_type, alert.severity):
+                self.throttle.suppress(self.recipients_for(alert.severity), {
+                    "id": alert.id,
+                    "alert_type": alert.alert_type,
+                    "severity": alert.severity,
+                    "title": alert.title,
+                    "source": alert.source,
+                    "time": alert.last_seen_at or alert.created_at
+                })
+                print(f"Alert notification rate limited, held for digest: {alert.title} - {alert.severity}")
+                return True
+            
             # Send email notification
             if self.smtp_user and self.smtp_password:
                 self._send_email_notification(alert)
             
             # Log notification (in production, you might also send to Slack, etc.)
-            print(f"Alert notification sent: {alert.title} - {alert.severity}")
+            print(f"Alert notification {'queued' if self.dispatcher else 'sent'}: {alert.title} - {alert.severity}")
             
             return True
         except Exception as e:
@@ -38,12 +526,14 @@ class AlertService:
             print("SMTP configuration incomplete, skipping email notification")
             return
         
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = self.smtp_user
-        msg['To'] = ", ".join(settings.ALERT_EMAIL_RECIPIENTS)
-        msg['Subject'] = f"[{alert.severity.upper()}] {alert.title}"
-        
+        email = self.build_email(alert)
+        if self.dispatcher is not None:
+            self.dispatcher.enqueue("email", email, alert_id=alert.id)
+        else:
+            self.deliver_email(email)
+    
+    def build_email(self, alert: Alert) -> Dict[str, Any]:
+        """Sender, recipients, subject and body of an alert's email"""
         # Create email body
         body = f"""
         Alert Details:
@@ -60,14 +550,64 @@ class AlertService:
         This is an automated alert from DataOps Inspector.
         """
         
-        msg.attach(MIMEText(body, 'plain'))
+        return {
+            "from": self.smtp_user,
+            "to": self.recipients_for(alert.severity),
+            "subject": f"[{alert.severity.upper()}] {alert.title}",
+            "body": body
+        }
+    
+    def recipients_for(self, severity: str) -> List[str]:
+        return list(settings.alert_severity_recipients.get(severity, settings.alert_email_recipients))
+    
+    def send_digest(self, recipients: Tuple[str, ...], alerts: List[Dict[str, Any]]) -> None:
+        """Send one email summarizing alerts held back by the rate limits"""
+        if not all([self.smtp_host, self.smtp_user, self.smtp_password]):
+            print(f"SMTP configuration incomplete, skipping digest of {len(alerts)} alerts")
+            return
+        
+        by_severity: Dict[str, int] = {}
+        by_source: Dict[str, int] = {}
+        for alert in alerts:
+            by_severity[alert["severity"]] = by_severity.get(alert["severity"], 0) + 1
+            source = alert["source"] or "Unknown"
+            by_source[source] = by_source.get(source, 0) + 1
+        
+        lines = [f"[{alert['severity'].upper()}] {alert['time']} {alert['source'] or 'Unknown'}: {alert['title']}" for alert in alerts[:100]]
+        if len(alerts) > 100:
+            lines.append(f"... and {len(alerts) - 100} more")
+        body = "\n".join([
+            f"{len(alerts)} alerts were over their notification rate limit and held for this digest.",
+            "",
+            "By severity: " + ", ".join(f"{severity} {count}" for severity, count in by_severity.items()),
+            "By source: " + ", ".join(f"{source} {count}" for source, count in sorted(by_source.items(), key=lambda item: -item[1])),
+            "",
+            *lines,
+            "",
+            "---",
+            "This is an automated alert digest from DataOps Inspector."
+        ])
+        
+        email = {
+            "from": self.smtp_user,
+            "to": list(recipients),
+            "subject": f"[DIGEST] {len(alerts)} rate-limited alerts",
+            "body": body
+        }
+        if self.dispatcher is not None:
+            self.dispatcher.enqueue("email", email)
+        else:
+            self.deliver_email(email)
+    
+    def deliver_email(self, email: Dict[str, Any]) -> None:
+        """Send a built email on a pooled SMTP connection"""
+        msg = MIMEMultipart()
+        msg['From'] = email["from"]
+        msg['To'] = ", ".join(email["to"])
+        msg['Subject'] = email["subject"]
+        msg.attach(MIMEText(email["body"], 'plain'))
         
-        # Send email
-        with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-            if self.smtp_use_tls:
-                server.starttls()
-            server.login(self.smtp_user, self.smtp_password)
-            server.send_message(msg)
+        self.smtp_pool.send(msg)
     
     def create_data_quality_alert(self, source_name: str, issue_type: str, details: str, severity: str = "medium") -> Alert:
         """Create a data quality alert"""
@@ -77,7 +617,7 @@ class AlertService:
             title=f"Data Quality Issue: {issue_type}",
             message=f"Data quality issue detected in {source_name}: {details}",
             source=source_name,
-            metadata={"issue_type": issue_type}
+            metadata_={"issue_type": issue_type}
         )
         return alert
     
@@ -91,7 +631,7 @@ class AlertService:
             title=f"Model Drift Detected: {drift_type}",
             message=f"Model drift detected in {model_name}. Drift score: {drift_score:.3f} (threshold: {threshold:.3f})",
             source=model_name,
-            metadata={
+            metadata_={
                 "drift_type": drift_type,
                 "drift_score": drift_score,
                 "threshold": threshold
@@ -107,6 +647,6 @@ class AlertService:
             title=title,
             message=message,
             source="system",
-            metadata={"system_alert": True}
+            metadata_={"system_alert": True}
         )
         return alert 
\ No newline at end of file
@@ -0,0 +1,157 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+class TokenBucket:
+    """Allows bursts of up to `burst` events, refilled at `rate` events per second"""
+
+    def __init__(self, burst: float, rate: float):
+        self.burst = burst
+        self.rate = rate
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    @property
+    def full(self) -> bool:
+        return self.tokens >= self.burst
+
+class AlertThrottle:
+    """Token-bucket rate limits on alert notifications per source and per severity
+
+    A notification needs a token from both its source's bucket and its
+    severity's bucket, so one noisy model can't use up the allowance of
+    the others and a flood of low-severity alerts can't crowd out
+    critical ones. Suppressed alerts are kept per recipient list and
+    handed to `on_digest` every `digest_interval` seconds, one call per
+    list that collected any.
+    """
+
+    def __init__(
+        self,
+        source_limit: Sequence[float],
+        severity_limits: Dict[str, Sequence[float]],
+        digest_interval: float = 300.0,
+        on_digest: Optional[Callable[[Tuple[str, ...], List[Dict[str, Any]]], None]] = None
+    ):
+        # (burst, notifications per minute)
+        self.source_limit = source_limit
+        self.severity_limits = severity_limits
+        self.digest_interval = digest_interval
+        self.on_digest = on_digest
+
+        self._sources: Dict[str, TokenBucket] = {}
+        self._severities: Dict[str, TokenBucket] = {}
+        self._pending: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+        self.allowed = 0
+        self.suppressed_by_source: Dict[str, int] = {}
+        self.suppressed_by_severity: Dict[str, int] = {}
+        self.digests_sent = 0
+        self.digested_alerts = 0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _bucket(buckets: Dict[str, TokenBucket], key: str, limit: Optional[Sequence[float]]) -> Optional[TokenBucket]:
+        if limit is None:
+            return None
+        bucket = buckets.get(key)
+        if bucket is None:
+            burst, per_minute = limit
+            bucket = buckets[key] = TokenBucket(burst, per_minute / 60.0)
+        return bucket
+
+    def allow(self, source: str, severity: str) -> bool:
+        """Take a token from both buckets, or count the alert as suppressed if either is empty"""
+        now = time.monotonic()
+        with self._lock:
+            buckets = [
+                bucket for bucket in (
+                    self._bucket(self._sources, source, self.source_limit),
+                    self._bucket(self._severities, severity, self.severity_limits.get(severity))
+                ) if bucket is not None
+            ]
+            for bucket in buckets:
+                bucket.refill(now)
+            # Only take tokens when both have one, so a refusal costs nothing
+            if all(bucket.tokens >= 1 for bucket in buckets):
+                for bucket in buckets:
+                    bucket.tokens -= 1
+                self.allowed += 1
+                return True
+            self.suppressed_by_source[source] = self.suppressed_by_source.get(source, 0) + 1
+            self.suppressed_by_severity[severity] = self.suppressed_by_severity.get(severity, 0) + 1
+            return False
+
+    def suppress(self, recipients: Sequence[str], alert: Dict[str, Any]) -> None:
+        """Hold a suppressed alert's summary for the next digest to these recipients"""
+        with self._lock:
+            self._pending.setdefault(tuple(sorted(recipients)), []).append(alert)
+
+    def flush(self) -> int:
+        """Hand every recipient list's held alerts to `on_digest`; returns the number of digests"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            # Buckets that refilled completely carry no state worth keeping
+            now = time.monotonic()
+            for buckets in (self._sources, self._severities):
+                for key in list(buckets):
+                    buckets[key].refill(now)
+                    if buckets[key].full:
+                        del buckets[key]
+
+        sent = 0
+        for recipients, alerts in pending.items():
+            try:
+                if self.on_digest is not None:
+                    self.on_digest(recipients, alerts)
+                sent += 1
+                self.digests_sent += 1
+                self.digested_alerts += len(alerts)
+            except Exception as e:
+                print(f"Error sending alert digest to {', '.join(recipients)}: {e}")
+        return sent
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="alert-digest", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the digest thread, sending what is held so it isn't lost"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.digest_interval):
+            self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = sum(len(alerts) for alerts in self._pending.values())
+            return {
+                "source_limit": {"burst": self.source_limit[0], "per_minute": self.source_limit[1]},
+                "severity_limits": {
+                    severity: {"burst": limit[0], "per_minute": limit[1]}
+                    for severity, limit in self.severity_limits.items()
+                },
+                "digest_interval_seconds": self.digest_interval,
+                "allowed": self.allowed,
+                "suppressed": sum(self.suppressed_by_source.values()),
+                "suppressed_by_source": dict(self.suppressed_by_source),
+                "suppressed_by_severity": dict(self.suppressed_by_severity),
+                "pending_digest_alerts": pending,
+                "digests_sent": self.digests_sent,
+                "digested_alerts": self.digested_alerts
+            }
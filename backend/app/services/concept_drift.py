@@ -0,0 +1,397 @@
+import math
+import queue
+import threading
+import time
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+class Adwin:
+    """ADWIN2 adaptive window over a real-valued stream
+
+    The window is an exponential histogram: level i holds up to
+    `max_buckets` buckets of 2^i values, each kept as a total and a
+    variance in fixed (levels, max_buckets + 1) arrays, so memory is
+    O(log n) in the window width. A change is detected when two
+    sub-windows have means further apart than the Hoeffding-style bound
+    for confidence `delta`; the older sub-window is then dropped.
+    """
+
+    def __init__(self, delta: float = 0.002, max_buckets: int = 5, max_levels: int = 32, clock: int = 32, min_window: int = 5):
+        self.delta = delta
+        self.max_buckets = max_buckets
+        self.clock = clock
+        self.min_window = min_window
+        # Oldest bucket first within each level
+        self.totals = np.zeros((max_levels, max_buckets + 1))
+        self.variances = np.zeros((max_levels, max_buckets + 1))
+        self.counts = np.zeros(max_levels, dtype=np.int64)
+        # Width, total, variance and values since the last check
+        self.state = np.zeros(4)
+        self.detections = 0
+        self.last_statistic = 0.0
+        self.last_threshold = 0.0
+
+    @property
+    def width(self) -> int:
+        return int(self.state[0])
+
+    @property
+    def mean(self) -> float:
+        return self.state[1] / self.state[0] if self.state[0] else 0.0
+
+    def update(self, values: np.ndarray) -> Optional[int]:
+        """Add values in order; returns the index of the first value at which a change was detected"""
+        # Plain lists are much faster than array indexing in the per-value loop
+        totals = self.totals.tolist()
+        variances = self.variances.tolist()
+        counts = self.counts.tolist()
+        width, total, variance, since_check = self.state.tolist()
+        detected_at = None
+
+        for i, x in enumerate(values.tolist()):
+            if width > 0:
+                variance += width * (x - total / width) ** 2 / (width + 1)
+            width += 1
+            total += x
+
+            level = 0
+            totals[0][counts[0]] = x
+            variances[0][counts[0]] = 0.0
+            counts[0] += 1
+            # Merge the two oldest buckets of every overflowing level into the next one
+            while counts[level] > self.max_buckets and level + 1 < len(counts):
+                size = 1 << level
+                t1, t2 = totals[level][0], totals[level][1]
+                merged_variance = variances[level][0] + variances[level][1] + size * (t1 / size - t2 / size) ** 2 / 2
+                del totals[level][:2], variances[level][:2]
+                totals[level].extend((0.0, 0.0))
+                variances[level].extend((0.0, 0.0))
+                counts[level] -= 2
+                totals[level + 1][counts[level + 1]] = t1 + t2
+                variances[level + 1][counts[level + 1]] = merged_variance
+                counts[level + 1] += 1
+                level += 1
+
+            since_check += 1
+            if since_check >= self.clock or i == len(values) - 1:
+                since_check = 0
+                while True:
+                    cut = self._find_cut(totals, counts, width, total, variance)
+                    if not cut:
+                        break
+                    # Drop the oldest bucket and test again on the shorter window
+                    top = max(level for level, count in enumerate(counts) if count)
+                    size = 1 << top
+                    t, v = totals[top][0], variances[top][0]
+                    del totals[top][0], variances[top][0]
+                    totals[top].append(0.0)
+                    variances[top].append(0.0)
+                    counts[top] -= 1
+                    width -= size
+                    total -= t
+                    if width > 0:
+                        variance -= v + size * width * (t / size - total / width) ** 2 / (size + width)
+                        variance = max(variance, 0.0)
+                    else:
+                        variance = 0.0
+                    if detected_at is None:
+                        detected_at = i
+                        self.detections += 1
+
+        self.totals[:] = totals
+        self.variances[:] = variances
+        self.counts[:] = counts
+        self.state[:] = (width, total, variance, since_check)
+        return detected_at
+
+    def _find_cut(self, totals: List[List[float]], counts: List[int], width: float, total: float, variance: float) -> bool:
+        if width < 2 * self.min_window:
+            return False
+        delta_prime = math.log(2 * math.log(width) / self.delta)
+        window_variance = variance / width
+        n0, total0 = 0.0, 0.0
+        # Split points from the oldest bucket towards the newest
+        for level in range(len(counts) - 1, -1, -1):
+            size = 1 << level
+            for position in range(counts[level]):
+                n0 += size
+                total0 += totals[level][position]
+                n1 = width - n0
+                if n1 < self.min_window:
+                    return False
+                if n0 < self.min_window:
+                    continue
+                m = 1 / (1 / (n0 - self.min_window + 1) + 1 / (n1 - self.min_window + 1))
+                epsilon = math.sqrt(2 * m * window_variance * delta_prime) / m + 2 / (3 * m) * delta_prime
+                difference = abs(total0 / n0 - (total - total0) / n1)
+                if difference > epsilon:
+                    self.last_statistic, self.last_threshold = difference, epsilon
+                    return True
+        return False
+
+    def get_state(self) -> Dict[str, Any]:
+        return {"width": self.width, "mean": round(self.mean, 6), "buckets": int(self.counts.sum()), "detections": self.detections}
+
+class PageHinkley:
+    """Page-Hinkley test for a shift of the stream mean in either direction
+
+    State is four cumulative sums per direction, updated for a whole
+    batch at once with cumulative sums.
+    """
+
+    def __init__(self, delta: float = 0.005, threshold: float = 50.0, min_samples: int = 30):
+        self.delta = delta
+        self.threshold = threshold
+        self.min_samples = min_samples
+        # Count, running mean, then cumulative deviation and its extreme for increases and decreases
+        self.state = np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+        self.detections = 0
+        self.last_statistic = 0.0
+
+    def update(self, values: np.ndarray) -> Optional[int]:
+        """Add values in order; returns the index of the first value at which a change was detected"""
+        offset = 0
+        detected_at = None
+        while offset < len(values):
+            x = values[offset:]
+            n0, mean0, up0, up_min0, down0, down_max0 = self.state
+            n = n0 + np.arange(1, len(x) + 1)
+            mean = (n0 * mean0 + np.cumsum(x)) / n
+            up = up0 + np.cumsum(x - mean - self.delta)
+            down = down0 + np.cumsum(x - mean + self.delta)
+            up_min = np.minimum(up_min0, np.minimum.accumulate(up))
+            down_max = np.maximum(down_max0, np.maximum.accumulate(down))
+            statistic = np.maximum(up - up_min, down_max - down)
+
+            alarms = np.flatnonzero((statistic > self.threshold) & (n >= self.min_samples))
+            if len(alarms) == 0:
+                self.state[:] = (n[-1], mean[-1], up[-1], up_min[-1], down[-1], down_max[-1])
+                self.last_statistic = float(statistic[-1])
+                return detected_at
+
+            first = int(alarms[0])
+            self.last_statistic = float(statistic[first])
+            self.detections += 1
+            if detected_at is None:
+                detected_at = offset + first
+            # Start over after the change point
+            self.state[:] = 0.0
+            offset += first + 1
+        return detected_at
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "samples": int(self.state[0]),
+            "mean": round(float(self.state[1]), 6),
+            "statistic": round(self.last_statistic, 6),
+            "detections": self.detections
+        }
+
+class Ddm:
+    """Drift Detection Method for a stream of values in [0, 1], such as error indicators
+
+    Tracks the running rate p and its deviation s; a warning is raised
+    when p + s exceeds the lowest seen p + s by two of that point's
+    deviations and a change by three. State is five numbers.
+    """
+
+    def __init__(self, min_samples: int = 30, warning_level: float = 2.0, drift_level: float = 3.0):
+        self.min_samples = min_samples
+        self.warning_level = warning_level
+        self.drift_level = drift_level
+        # Count, sum, lowest p + s and the s at that point, warning flag
+        self.state = np.array([0.0, 0.0, np.inf, 0.0, 0.0])
+        self.detections = 0
+        self.last_statistic = 0.0
+        self.last_threshold = 0.0
+
+    def update(self, values: np.ndarray) -> Optional[int]:
+        """Add values in order; returns the index of the first value at which a change was detected"""
+        offset = 0
+        detected_at = None
+        while offset < len(values):
+            x = values[offset:]
+            n0, sum0, ps_min0, s_min0, _ = self.state
+            n = n0 + np.arange(1, len(x) + 1)
+            # Agresti-Coull estimate; the plain rate is often 0 early on, which
+            # pins the minimum to s = 0 and turns the first error into a change
+            p = (sum0 + np.cumsum(x) + 2) / (n + 4)
+            s = np.sqrt(p * (1 - p) / (n + 4))
+            ps = np.where(n >= self.min_samples, p + s, np.inf)
+
+            ps_min = np.minimum(ps_min0, np.minimum.accumulate(ps))
+            # Deviation at the point where the minimum was reached
+            improved = ps < np.concatenate([[ps_min0], ps_min[:-1]])
+            last_improved = np.maximum.accumulate(np.where(improved, np.arange(len(x)), -1))
+            s_min = np.where(last_improved >= 0, s[np.maximum(last_improved, 0)], s_min0)
+
+            drift = np.isfinite(ps) & (ps > ps_min + (self.drift_level - 1) * s_min)
+            alarms = np.flatnonzero(drift)
+            if len(alarms) == 0:
+                warning = bool(np.isfinite(ps[-1]) and ps[-1] > ps_min[-1] + (self.warning_level - 1) * s_min[-1])
+                self.state[:] = (n[-1], sum0 + x.sum(), ps_min[-1], s_min[-1], float(warning))
+                self.last_statistic = float(ps[-1]) if np.isfinite(ps[-1]) else 0.0
+                self.last_threshold = float(ps_min[-1] + (self.drift_level - 1) * s_min[-1]) if np.isfinite(ps_min[-1]) else 0.0
+                return detected_at
+
+            first = int(alarms[0])
+            self.last_statistic = float(ps[first])
+            self.last_threshold = float(ps_min[first] + (self.drift_level - 1) * s_min[first])
+            self.detections += 1
+            if detected_at is None:
+                detected_at = offset + first
+            self.state[:] = (0.0, 0.0, np.inf, 0.0, 0.0)
+            offset += first + 1
+        return detected_at
+
+    def get_state(self) -> Dict[str, Any]:
+        n = int(self.state[0])
+        return {
+            "samples": n,
+            "rate": round(float(self.state[1] / n), 6) if n else None,
+            "warning": bool(self.state[4]),
+            "detections": self.detections
+        }
+
+class ConceptDriftMonitor:
+    """Online change detection on every model's confidence and error streams
+
+    Each (model, stream) runs ADWIN and Page-Hinkley, plus DDM when the
+    stream is bounded to [0, 1]. Updates are queued and consumed by one
+    background thread, so detectors never run on the request path. A
+    detector that fires calls `on_drift` while processing the update
+    that contains the change point.
+
+    A reset only bumps the model's generation; the thread drops the
+    model's detectors before the first update of a newer generation and
+    skips updates queued before the reset, so resetting never waits on
+    the queue.
+    """
+
+    BOUNDED_STREAMS = ("confidence", "classification_error")
+
+    def __init__(
+        self,
+        adwin_delta: float = 0.002,
+        ph_delta: float = 0.005,
+        ph_threshold: float = 50.0,
+        min_samples: int = 30,
+        max_pending: int = 1000
+    ):
+        self.adwin_delta = adwin_delta
+        self.ph_delta = ph_delta
+        self.ph_threshold = ph_threshold
+        self.min_samples = min_samples
+        self.detectors: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # on_drift(model_name, drift_type, stream, score, threshold)
+        self.on_drift: Optional[Callable[[str, str, Optional[str], float, float], None]] = None
+
+        self.dropped = 0
+        self.processed = 0
+        self.stale = 0
+        # Bumped by reset; the generation each model's detectors were built in
+        self._generations: Dict[str, int] = {}
+        self._detector_generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue(max_pending)
+        self._thread: Optional[threading.Thread] = None
+
+    def update(self, model_name: str, stream: str, values: np.ndarray) -> None:
+        """Queue values of a stream; dropped when the detectors fall behind"""
+        if len(values) == 0:
+            return
+        generation = self._generations.get(model_name, 0)
+        try:
+            self._queue.put_nowait((model_name, stream, generation, np.asarray(values, dtype=np.float64)))
+        except queue.Full:
+            self.dropped += len(values)
+
+    def reset(self, model_name: str) -> None:
+        """Forget a model's detector state, e.g. when a new version goes live; never blocks"""
+        with self._lock:
+            self._generations[model_name] = self._generations.get(model_name, 0) + 1
+
+    def process(self, model_name: str, stream: str, values: np.ndarray) -> List[Dict[str, Any]]:
+        """Run every detector of the stream over values and report the ones that fired"""
+        detectors = self.detectors.get((model_name, stream))
+        if detectors is None:
+            detectors = {
+                "adwin": Adwin(self.adwin_delta, min_window=5),
+                "page_hinkley": PageHinkley(self.ph_delta, self.ph_threshold, self.min_samples)
+            }
+            if stream in self.BOUNDED_STREAMS:
+                detectors["ddm"] = Ddm(self.min_samples)
+            self.detectors[(model_name, stream)] = detectors
+
+        # DDM watches the rate of bad outcomes, so confidence is turned into uncertainty
+        bounded = 1.0 - values if stream == "confidence" else values
+        fired = []
+        for name, detector in detectors.items():
+            index = detector.update(bounded if name == "ddm" else values)
+            if index is None:
+                continue
+            threshold = self.ph_threshold if name == "page_hinkley" else detector.last_threshold
+            change = {
+                "model_name": model_name,
+                "detector": name,
+                "stream": stream,
+                "index": index,
+                "statistic": detector.last_statistic,
+                "threshold": threshold
+            }
+            fired.append(change)
+            if self.on_drift is not None:
+                try:
+                    self.on_drift(model_name, f"concept_drift_{name}", stream, change["statistic"], threshold)
+                except Exception as e:
+                    print(f"Error raising concept drift alert for {model_name}: {e}")
+        self.processed += len(values)
+        return fired
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="concept-drift", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            model_name, stream, generation, values = item
+            current = self._generations.get(model_name, 0)
+            if generation < current:
+                # Queued before the model was reset
+                self.stale += len(values)
+                continue
+            if self._detector_generations.get(model_name, 0) != current:
+                for key in [key for key in self.detectors if key[0] == model_name]:
+                    del self.detectors[key]
+                self._detector_generations[model_name] = current
+            try:
+                self.process(model_name, stream, values)
+            except Exception as e:
+                print(f"Error updating concept drift detectors for {model_name}: {e}")
+
+    def get_state(self, model_name: str) -> Dict[str, Any]:
+        return {
+            stream: {name: detector.get_state() for name, detector in detectors.items()}
+            for (name_, stream), detectors in list(self.detectors.items())
+            if name_ == model_name
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "stale": self.stale,
+            "pending": self._queue.qsize(),
+            "updated_at": time.time()
+        }
@@ -0,0 +1,202 @@
+import numpy as np
+from typing import List, Dict, Optional
+
+# Smoothing applied to empty bins so PSI and JS stay finite
+EPSILON = 1e-6
+
+class ReferenceDistribution:
+    """Binned training-time distribution of every feature of a model"""
+
+    def __init__(self, features: List[str], lower: np.ndarray, upper: np.ndarray, counts: np.ndarray):
+        self.features = list(features)
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.float64)
+        self.counts = np.asarray(counts, dtype=np.float64)
+
+    @property
+    def n_features(self) -> int:
+        return self.counts.shape[0]
+
+    @property
+    def n_bins(self) -> int:
+        return self.counts.shape[1]
+
+    @classmethod
+    def from_data(cls, features: List[str], X: np.ndarray, n_bins: int = 10) -> "ReferenceDistribution":
+        """Build equal-width histograms over the observed range of each feature"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(-1, 1)
+
+        lower = np.nanmin(X, axis=0)
+        upper = np.nanmax(X, axis=0)
+        reference = cls(features, lower, upper, np.zeros((X.shape[1], n_bins)))
+        reference.counts = reference.bin_counts(X)
+        return reference
+
+    def flat_bin_indices(self, X: np.ndarray) -> np.ndarray:
+        """Map a (rows, features) matrix to flat (feature, bin) indices
+
+        Bins are laid out with one extra trash bin per feature, which is
+        where missing values end up.
+        """
+        n_bins = self.n_bins
+        width = (self.upper - self.lower) / n_bins
+        width[width == 0] = 1.0
+
+        idx = np.asarray(X, dtype=np.float64) - self.lower
+        idx *= 1.0 / width
+        # Values outside the training range land in the edge bins
+        np.clip(idx, 0, n_bins - 1, out=idx)
+        idx[np.isnan(idx)] = n_bins
+        flat = idx.astype(np.int64)
+        flat += np.arange(self.n_features) * (n_bins + 1)
+        return flat
+
+    def bin_counts(self, X: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        """Histogram a (rows, features) matrix onto the reference bins in one pass"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(-1, self.n_features)
+
+        n_features, stride = self.n_features, self.n_bins + 1
+        counts = np.zeros(n_features * stride, dtype=np.int64)
+        # Chunk rows so memory stays bounded for very large windows
+        for start in range(0, X.shape[0], chunk_size):
+            flat = self.flat_bin_indices(X[start:start + chunk_size])
+            counts += np.bincount(flat.ravel(), minlength=n_features * stride)
+
+        return counts.reshape(n_features, stride)[:, :self.n_bins].astype(np.float64)
+
+class DriftEngine:
+    """Batched PSI, Kolmogorov-Smirnov and Jensen-Shannon drift scoring"""
+
+    # Drift score thresholds; PSI is the headline score for feature drift
+    psi_threshold = 0.2
+    ks_threshold = 0.1
+    js_threshold = 0.1
+    # Share of drifted features above which the whole dataset counts as drifted
+    data_drift_threshold = 0.5
+
+    def __init__(self, min_samples: int = 1):
+        # Fewer current observations are scored but never reported as drift
+        self.min_samples = min_samples
+
+    def compare(self, reference: ReferenceDistribution, current_counts: np.ndarray) -> Dict[str, np.ndarray]:
+        """Score every feature at once from (features, bins) histogram counts"""
+        ref = np.asarray(reference.counts, dtype=np.float64)
+        cur = np.asarray(current_counts, dtype=np.float64)
+        if ref.shape != cur.shape:
+            raise ValueError(f"Histogram shape {cur.shape} does not match reference {ref.shape}")
+
+        ref_total = ref.sum(axis=1, keepdims=True)
+        cur_total = cur.sum(axis=1, keepdims=True)
+        p = ref / np.maximum(ref_total, 1.0)
+        q = cur / np.maximum(cur_total, 1.0)
+
+        # Kolmogorov-Smirnov statistic on the binned CDFs
+        ks = np.abs(np.cumsum(q, axis=1) - np.cumsum(p, axis=1)).max(axis=1)
+
+        # Smoothed distributions for the log-based measures
+        p_s = (p + EPSILON) / (1.0 + EPSILON * p.shape[1])
+        q_s = (q + EPSILON) / (1.0 + EPSILON * q.shape[1])
+
+        psi = ((q_s - p_s) * np.log(q_s / p_s)).sum(axis=1)
+
+        m = 0.5 * (p_s + q_s)
+        js_divergence = 0.5 * (p_s * np.log2(p_s / m)).sum(axis=1) + 0.5 * (q_s * np.log2(q_s / m)).sum(axis=1)
+        js = np.sqrt(np.clip(js_divergence, 0.0, 1.0))
+
+        # Features without recent observations cannot drift
+        empty = cur_total[:, 0] == 0
+        psi[empty] = 0.0
+        ks[empty] = 0.0
+        js[empty] = 0.0
+
+        return {
+            "psi": psi,
+            "ks": ks,
+            "js": js,
+            "sample_size": cur_total[:, 0],
+            "is_drift_detected": (psi > self.psi_threshold) & (cur_total[:, 0] >= self.min_samples)
+        }
+
+    def feature_drift_results(self, reference: ReferenceDistribution, scores: Dict[str, np.ndarray]) -> List[Dict]:
+        """Convert batched scores into per-feature drift result dicts"""
+        psi = scores["psi"].round(3).tolist()
+        ks = scores["ks"].round(3).tolist()
+        js = scores["js"].round(3).tolist()
+        detected = scores["is_drift_detected"].tolist()
+        sample_size = scores["sample_size"].astype(int).tolist()
+
+        return [
+            {
+                "drift_type": "feature_drift",
+                "drift_score": psi[i],
+                "threshold": self.psi_threshold,
+                "is_drift_detected": detected[i],
+                "feature_name": feature,
+                "details": {"psi": psi[i], "ks": ks[i], "js": js[i], "sample_size": sample_size[i]}
+            }
+            for i, feature in enumerate(reference.features)
+        ]
+
+    def summary_result(
+        self,
+        drift_type: str,
+        score: float,
+        threshold: float,
+        details: Optional[Dict] = None,
+        enough_samples: bool = True
+    ) -> Dict:
+        """Build a model-level drift result dict"""
+        return {
+            "drift_type": drift_type,
+            "drift_score": round(float(score), 3),
+            "threshold": threshold,
+            "is_drift_detected": bool(score > threshold) and enough_samples,
+            "feature_name": None,
+            "details": details or {}
+        }
+
+    def score_model(
+        self,
+        reference: ReferenceDistribution,
+        prediction_reference: ReferenceDistribution,
+        feature_counts: np.ndarray,
+        prediction_counts: np.ndarray
+    ) -> List[Dict]:
+        """Feature, prediction and data drift results of one model from binned counts"""
+        # Feature drift for every feature in one batched computation
+        scores = self.compare(reference, feature_counts)
+        drift_results = self.feature_drift_results(reference, scores)
+
+        # Prediction drift on the distribution of model outputs
+        pred_scores = self.compare(prediction_reference, prediction_counts)
+        prediction_samples = int(pred_scores["sample_size"][0])
+        drift_results.append(self.summary_result(
+            "prediction_drift",
+            pred_scores["psi"][0],
+            self.psi_threshold,
+            {
+                "ks": round(float(pred_scores["ks"][0]), 3),
+                "js": round(float(pred_scores["js"][0]), 3),
+                "sample_size": prediction_samples
+            },
+            enough_samples=prediction_samples >= self.min_samples
+        ))
+
+        # Data drift as the share of drifted features, which already require enough samples
+        drifted_share = float(scores["is_drift_detected"].mean()) if reference.n_features else 0.0
+        drift_results.append(self.summary_result(
+            "data_drift",
+            drifted_share,
+            self.data_drift_threshold,
+            {
+                "drifted_features": int(scores["is_drift_detected"].sum()),
+                "total_features": reference.n_features,
+                "sample_size": prediction_samples
+            }
+        ))
+
+        return drift_results
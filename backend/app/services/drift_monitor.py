@@ -0,0 +1,325 @@
+import os
+import queue
+import threading
+import time
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.drift_engine import DriftEngine, ReferenceDistribution
+
+class WindowHistogram:
+    """Ring of per-slice histograms over the bins of a reference distribution"""
+
+    def __init__(self, reference: ReferenceDistribution, n_slices: int):
+        self.reference = reference
+        # Each slice keeps the reference bins plus one trash bin for missing values
+        self.stride = reference.n_bins + 1
+        self.slices = np.zeros((n_slices, reference.n_features * self.stride), dtype=np.int64)
+        self.totals = np.zeros(reference.n_features * self.stride, dtype=np.int64)
+
+    def add_many(self, slot: int, X: np.ndarray) -> None:
+        """Count a block of observations with a single bincount"""
+        flat = self.reference.flat_bin_indices(X).ravel()
+        counts = np.bincount(flat, minlength=self.totals.shape[0])
+        self.slices[slot] += counts
+        self.totals += counts
+
+    def expire(self, slot: int) -> None:
+        """Drop a slice from the window totals and reset it"""
+        self.totals -= self.slices[slot]
+        self.slices[slot] = 0
+
+    def counts(self) -> np.ndarray:
+        """Current window counts shaped like the reference histograms"""
+        return self.totals.reshape(self.reference.n_features, self.stride)[:, :-1].astype(np.float64)
+
+    def restore(self, slices: np.ndarray) -> None:
+        self.slices[:] = slices
+        self.totals[:] = slices.sum(axis=0)
+
+class StreamingDriftMonitor:
+    """Windowed drift monitoring fed one prediction at a time
+
+    Windows are split into slices so that a sliding window advances one
+    slice at a time; a tumbling window uses a single slice that is scored
+    and cleared when it fills up. Windows are measured either in number of
+    predictions ("count") or in seconds ("time").
+
+    Thresholds crossed while scoring are collected under the lock and
+    handed to `on_drift` on a background thread afterwards, so callbacks
+    that write alerts never hold up predictions.
+    """
+
+    def __init__(
+        self,
+        drift_engine: DriftEngine,
+        snapshot_path: str,
+        window_type: str = "sliding",
+        window_unit: str = "count",
+        window_size: int = 10000,
+        n_slices: int = 10,
+        min_samples: int = 100,
+        snapshot_interval: float = 60.0,
+        sample_size: int = 500,
+        max_pending_alerts: int = 1000
+    ):
+        if window_type not in ("sliding", "tumbling"):
+            raise ValueError(f"Unknown window type: {window_type}")
+        if window_unit not in ("count", "time"):
+            raise ValueError(f"Unknown window unit: {window_unit}")
+
+        self.drift_engine = drift_engine
+        self.snapshot_path = snapshot_path
+        self.window_type = window_type
+        self.window_unit = window_unit
+        self.window_size = window_size
+        self.n_slices = n_slices if window_type == "sliding" else 1
+        self.slice_size = window_size / self.n_slices
+        self.min_samples = min_samples
+        self.snapshot_interval = snapshot_interval
+        # Most recent raw rows kept per model for multivariate tests
+        self.sample_size = sample_size
+
+        # Called as on_drift(model_name, drift_type, feature_name, drift_score, threshold)
+        self.on_drift: Optional[Callable[[str, str, Optional[str], float, float], None]] = None
+        self.dropped_alerts = 0
+
+        self.windows: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._alerts: "queue.Queue" = queue.Queue(max_pending_alerts)
+        self._alert_thread: Optional[threading.Thread] = None
+
+        os.makedirs(self.snapshot_path, exist_ok=True)
+
+    def register(
+        self,
+        model_name: str,
+        reference: ReferenceDistribution,
+        prediction_reference: ReferenceDistribution,
+        resume: bool = True
+    ) -> None:
+        """Start a window for a model, resuming from its last snapshot if one exists and `resume` is set"""
+        window = {
+            "features": WindowHistogram(reference, self.n_slices),
+            "prediction": WindowHistogram(prediction_reference, self.n_slices),
+            "slot": 0,
+            "slot_count": 0,
+            "slot_started": time.time(),
+            # Last evaluated drift state of each feature plus the prediction
+            "drifted": np.zeros(reference.n_features + 1, dtype=bool),
+            # Ring of recent raw rows and the number of rows ever added to it
+            "recent": np.full((self.sample_size, reference.n_features), np.nan),
+            "seen": 0
+        }
+        if resume:
+            self._restore(model_name, window)
+
+        with self._lock:
+            self.windows[model_name] = window
+
+    def update_batch(self, model_name: str, X: np.ndarray, predictions: np.ndarray) -> None:
+        """Add a batch of predictions, split at slice boundaries of count windows"""
+        window = self.windows.get(model_name)
+        if window is None:
+            return
+
+        predictions = np.asarray(predictions, dtype=np.float64).reshape(-1, 1)
+        crossed = []
+        with self._lock:
+            start = 0
+            while start < len(X):
+                crossed.extend(self._advance(model_name, window, time.time()))
+                if self.window_unit == "count":
+                    end = start + max(int(np.ceil(self.slice_size)) - window["slot_count"], 1)
+                else:
+                    end = len(X)
+                window["features"].add_many(window["slot"], X[start:end])
+                window["prediction"].add_many(window["slot"], predictions[start:end])
+                window["slot_count"] += len(X[start:end])
+                start = end
+            self._remember(window, X)
+        self._raise(crossed)
+
+    def window_counts(self, model_name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Current feature and prediction histograms of a model's window"""
+        window = self.windows[model_name]
+        crossed = []
+        with self._lock:
+            if self.window_unit == "time":
+                crossed = self._advance(model_name, window, time.time())
+            counts = window["features"].counts(), window["prediction"].counts()
+        self._raise(crossed)
+        return counts
+
+    def recent_rows(self, model_name: str) -> Tuple[np.ndarray, int]:
+        """Up to `sample_size` most recent feature rows and the total rows seen so far"""
+        window = self.windows[model_name]
+        with self._lock:
+            n = min(window["seen"], self.sample_size)
+            return window["recent"][:n].copy(), window["seen"]
+
+    def _remember(self, window: Dict, X: np.ndarray) -> None:
+        if self.sample_size == 0:
+            return
+        n_rows = len(X)
+        X = X[-self.sample_size:]
+        positions = (window["seen"] + n_rows - len(X) + np.arange(len(X))) % self.sample_size
+        window["recent"][positions] = X
+        window["seen"] += n_rows
+
+    def _advance(self, model_name: str, window: Dict, now: float) -> List[Tuple]:
+        """Rotate expired slices; a slice boundary is where the window is scored"""
+        if self.window_unit == "count":
+            if window["slot_count"] >= self.slice_size:
+                return self._rotate(model_name, window, now)
+            return []
+
+        elapsed = now - window["slot_started"]
+        if elapsed < self.slice_size:
+            return []
+        # Idle gaps longer than the window only need one pass over the slices
+        steps = min(int(elapsed // self.slice_size), self.n_slices)
+        crossed = []
+        for _ in range(steps):
+            crossed.extend(self._rotate(model_name, window, now))
+        return crossed
+
+    def _rotate(self, model_name: str, window: Dict, now: float) -> List[Tuple]:
+        crossed = self._evaluate(model_name, window)
+
+        window["slot"] = (window["slot"] + 1) % self.n_slices
+        window["features"].expire(window["slot"])
+        window["prediction"].expire(window["slot"])
+        window["slot_count"] = 0
+        window["slot_started"] = now
+        return crossed
+
+    def _evaluate(self, model_name: str, window: Dict) -> List[Tuple]:
+        """Score the full window; (model, drift type, feature, score, threshold) of thresholds crossed since the last evaluation"""
+        feature_hist = window["features"]
+        prediction_hist = window["prediction"]
+
+        feature_scores = self.drift_engine.compare(feature_hist.reference, feature_hist.counts())
+        prediction_scores = self.drift_engine.compare(prediction_hist.reference, prediction_hist.counts())
+
+        scores = np.concatenate([feature_scores["psi"], prediction_scores["psi"]])
+        sample_size = np.concatenate([feature_scores["sample_size"], prediction_scores["sample_size"]])
+        detected = (scores > self.drift_engine.psi_threshold) & (sample_size >= self.min_samples)
+
+        crossed = np.flatnonzero(detected & ~window["drifted"])
+        window["drifted"] = detected
+
+        names = feature_hist.reference.features
+        return [
+            (
+                model_name,
+                "feature_drift" if i < len(names) else "prediction_drift",
+                names[i] if i < len(names) else None,
+                float(scores[i]),
+                self.drift_engine.psi_threshold
+            )
+            for i in crossed.tolist()
+        ]
+
+    def _raise(self, crossed: List[Tuple]) -> None:
+        """Hand crossed thresholds to on_drift; called once the lock is released"""
+        if not crossed or self.on_drift is None:
+            return
+        for crossing in crossed:
+            if self._alert_thread is None:
+                self._fire(crossing)
+                continue
+            try:
+                self._alerts.put_nowait(crossing)
+            except queue.Full:
+                self.dropped_alerts += 1
+
+    def _fire(self, crossing: Tuple) -> None:
+        try:
+            self.on_drift(*crossing)
+        except Exception as e:
+            print(f"Error raising drift alert for {crossing[0]}: {e}")
+
+    def _snapshot_file(self, model_name: str) -> str:
+        return os.path.join(self.snapshot_path, f"{model_name}.window.npz")
+
+    def snapshot(self) -> None:
+        """Write every model window to disk so it survives a restart"""
+        with self._lock:
+            states = {
+                model_name: {
+                    "feature_slices": window["features"].slices.copy(),
+                    "prediction_slices": window["prediction"].slices.copy(),
+                    "position": np.array([window["slot"], window["slot_count"], window["slot_started"]]),
+                    "drifted": window["drifted"].copy()
+                }
+                for model_name, window in self.windows.items()
+            }
+
+        for model_name, state in states.items():
+            file_path = self._snapshot_file(model_name)
+            tmp_path = f"{file_path}.tmp.npz"
+            np.savez(tmp_path, **state)
+            os.replace(tmp_path, file_path)
+
+    def _restore(self, model_name: str, window: Dict) -> None:
+        file_path = self._snapshot_file(model_name)
+        if not os.path.exists(file_path):
+            return
+
+        try:
+            with np.load(file_path) as state:
+                feature_slices = state["feature_slices"]
+                prediction_slices = state["prediction_slices"]
+                # Snapshots from a different window layout or model schema are discarded
+                if feature_slices.shape != window["features"].slices.shape \
+                        or prediction_slices.shape != window["prediction"].slices.shape:
+                    return
+
+                window["features"].restore(feature_slices)
+                window["prediction"].restore(prediction_slices)
+                slot, slot_count, slot_started = state["position"].tolist()
+                window["slot"] = int(slot)
+                window["slot_count"] = int(slot_count)
+                window["slot_started"] = float(slot_started)
+                window["drifted"] = state["drifted"]
+        except Exception as e:
+            print(f"Could not restore drift window for {model_name}: {e}")
+
+    def start(self) -> None:
+        """Start periodic snapshots and drift callbacks in background threads"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="drift-snapshots", daemon=True)
+        self._thread.start()
+        self._alert_thread = threading.Thread(target=self._run_alerts, name="drift-alerts", daemon=True)
+        self._alert_thread.start()
+
+    def stop(self) -> None:
+        """Stop periodic snapshots and write a final one; queued callbacks run first"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if self._alert_thread is not None:
+            self._alerts.put(None)
+            self._alert_thread.join()
+            self._alert_thread = None
+        self.snapshot()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.snapshot_interval):
+            try:
+                self.snapshot()
+            except Exception as e:
+                print(f"Error writing drift window snapshot: {e}")
+
+    def _run_alerts(self) -> None:
+        while True:
+            crossing = self._alerts.get()
+            if crossing is None:
+                return
+            self._fire(crossing)
@@ -0,0 +1,372 @@
+import multiprocessing
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from app.models.model_monitoring import ModelPerformance, ModelDrift, DriftCheckState
+from app.services.drift_worker import run_drift_check
+
+class DriftCheckScheduler:
+    """Runs drift checks for every deployed model on per-model intervals
+
+    Each model's next run is jittered, so checks spread out rather than
+    all starting at once. When checks come due, one grouped query finds
+    which models logged predictions since their last check. Only those
+    are scored, in a process pool capped at `max_workers`, and all
+    results of the cycle are written with one bulk INSERT.
+
+    Schedules and the last log id each check covered live in
+    `drift_check_state`, so every app process can run a scheduler: a
+    model is checked by whichever process claims its run with a
+    conditional UPDATE, and its results, new last id and released claim
+    are committed together. Claims older than `claim_timeout` seconds
+    are taken over.
+    """
+
+    def __init__(
+        self,
+        model_service: Any,
+        session_factory: Callable,
+        default_interval: float = 3600.0,
+        intervals: Optional[Dict[str, float]] = None,
+        max_workers: int = 4,
+        jitter: float = 0.1,
+        max_rows: int = 10000,
+        multivariate_params: Optional[Dict[str, Any]] = None,
+        tick: float = 1.0,
+        claim_timeout: float = 900.0,
+        on_write: Optional[Callable[[Any, List[Dict[str, Any]]], None]] = None,
+        after_commit: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+    ):
+        self.model_service = model_service
+        self.session_factory = session_factory
+        self.default_interval = default_interval
+        self.intervals = dict(intervals or {})
+        self.max_workers = max_workers
+        self.jitter = jitter
+        self.max_rows = max_rows
+        # Constructor arguments of the workers' multivariate detector; None skips those tests
+        self.multivariate_params = multivariate_params
+        self.tick = tick
+        self.claim_timeout = claim_timeout
+        # Runs after the results INSERT, before its commit
+        self.on_write = on_write
+        # Gets the rows once they are committed
+        self.after_commit = after_commit
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self.cycles = 0
+        self.checks = 0
+        self.skipped = 0
+        # Runs another process had already claimed
+        self.claimed_elsewhere = 0
+        self.failures = 0
+        self.last_cycle: Dict[str, Any] = {}
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def interval(self, model_name: str) -> float:
+        return self.intervals.get(model_name, self.default_interval)
+
+    def set_interval(self, model_name: str, seconds: float) -> None:
+        """Change a model's check interval for every process, rescheduling its next run"""
+        self.intervals[model_name] = seconds
+        now = datetime.now()
+        db = self.session_factory()
+        try:
+            self._ensure_states(db, [model_name], now)
+            db.query(DriftCheckState)\
+                .filter(DriftCheckState.model_name == model_name)\
+                .update(
+                    {"interval": seconds, "next_run_at": now + timedelta(seconds=self._jittered(seconds))},
+                    synchronize_session=False
+                )
+            db.commit()
+        finally:
+            db.close()
+
+    def _jittered(self, interval: float) -> float:
+        return interval * (1.0 + random.uniform(-self.jitter, self.jitter))
+
+    def _ensure_states(self, db: Any, model_names: List[str], now: datetime) -> None:
+        """Add schedule rows for models seen for the first time, staggering their first runs over one interval"""
+        existing = {
+            name for (name,) in db.query(DriftCheckState.model_name)
+            .filter(DriftCheckState.model_name.in_(model_names))
+            .all()
+        }
+        for model_name in model_names:
+            if model_name in existing:
+                continue
+            db.add(DriftCheckState(
+                model_name=model_name,
+                last_id=0,
+                next_run_at=now + timedelta(seconds=random.uniform(0, self.interval(model_name)))
+            ))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another process added it first
+                db.rollback()
+
+    def due_models(self, now: datetime) -> List[str]:
+        """Deployed models whose next run has come and that no process is checking"""
+        model_names = self.model_service.get_deployed_models()
+        if not model_names:
+            return []
+        db = self.session_factory()
+        try:
+            self._ensure_states(db, model_names, now)
+            due = db.query(DriftCheckState.model_name)\
+                .filter(DriftCheckState.model_name.in_(model_names))\
+                .filter(DriftCheckState.next_run_at <= now)\
+                .filter(or_(DriftCheckState.claimed_until == None, DriftCheckState.claimed_until < now))\
+                .all()
+        finally:
+            db.close()
+        return [name for (name,) in due]
+
+    def _claim(self, db: Any, model_names: List[str], now: datetime, due_only: bool) -> Dict[str, int]:
+        """Claim the runs of models no other process is checking; last checked log id of each claimed model"""
+        self._ensure_states(db, model_names, now)
+        states = db.query(DriftCheckState.model_name, DriftCheckState.interval)\
+            .filter(DriftCheckState.model_name.in_(model_names))\
+            .all()
+        claimed = {}
+        for model_name, interval in states:
+            conditions = [
+                DriftCheckState.model_name == model_name,
+                or_(DriftCheckState.claimed_until == None, DriftCheckState.claimed_until < now)
+            ]
+            if due_only:
+                conditions.append(DriftCheckState.next_run_at <= now)
+            # Conditional update, so another scheduler process can't claim it too
+            result = db.execute(
+                update(DriftCheckState)
+                .where(*conditions)
+                .values(
+                    claimed_by=self.owner,
+                    claimed_until=now + timedelta(seconds=self.claim_timeout),
+                    next_run_at=now + timedelta(seconds=self._jittered(interval or self.interval(model_name)))
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            if result.rowcount == 0:
+                self.claimed_elsewhere += 1
+                continue
+            # Read after claiming, since the previous claimant may have just advanced it
+            claimed[model_name] = db.query(DriftCheckState.last_id)\
+                .filter(DriftCheckState.model_name == model_name)\
+                .scalar()
+        return claimed
+
+    def _release(self, db: Any, model_names: List[str]) -> None:
+        """Give up this process's claims, in the caller's transaction"""
+        if not model_names:
+            return
+        db.execute(
+            update(DriftCheckState)
+            .where(DriftCheckState.model_name.in_(model_names))
+            .where(DriftCheckState.claimed_by == self.owner)
+            .values(claimed_by=None, claimed_until=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="drift-check-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.tick):
+            try:
+                due = self.due_models(datetime.now())
+                if due:
+                    self.run_cycle(due, due_only=True)
+            except Exception as e:
+                print(f"Error running scheduled drift checks: {e}")
+
+    def run_cycle(self, model_names: List[str], due_only: bool = False) -> Dict[str, Any]:
+        """Check the given models once and write all results together
+
+        Models another process is checking are left to it; with `due_only`,
+        so are models whose next run hasn't come yet.
+        """
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            last_ids = self._claim(db, model_names, datetime.now(), due_only) if model_names else {}
+        finally:
+            db.close()
+        claimed = list(last_ids)
+
+        try:
+            new_data = self._models_with_new_data(claimed, last_ids) if claimed else {}
+            to_check = [name for name in claimed if name in new_data]
+            self.skipped += len(claimed) - len(to_check)
+
+            results = self._score(to_check, new_data, last_ids) if to_check else []
+            written = self._write_results(results, new_data, claimed)
+        except Exception:
+            db = self.session_factory()
+            try:
+                self._release(db, claimed)
+                db.commit()
+            finally:
+                db.close()
+            raise
+
+        self.cycles += 1
+        self.last_cycle = {
+            "due": len(model_names),
+            "claimed": len(claimed),
+            "checked": len(results),
+            "skipped": len(claimed) - len(to_check),
+            "results_written": written,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+        return self.last_cycle
+
+    def _models_with_new_data(self, model_names: List[str], last_ids: Dict[str, int]) -> Dict[str, int]:
+        """Newest log id of every model that logged predictions since its last check"""
+        since = min(last_ids[name] for name in model_names)
+        db = self.session_factory()
+        try:
+            newest = db.query(ModelPerformance.model_name, func.max(ModelPerformance.id))\
+                .filter(ModelPerformance.metric_name == "prediction")\
+                .filter(ModelPerformance.model_name.in_(model_names))\
+                .filter(ModelPerformance.id > since)\
+                .group_by(ModelPerformance.model_name)\
+                .all()
+        finally:
+            db.close()
+
+        return {name: max_id for name, max_id in newest if max_id > last_ids[name]}
+
+    def _score(self, model_names: List[str], newest_ids: Dict[str, int], last_ids: Dict[str, int]) -> List[Dict[str, Any]]:
+        if self._pool is None:
+            # Spawned workers don't inherit the server's threads or locks
+            self._pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+        futures = {}
+        for model_name in model_names:
+            try:
+                # References are small and fixed-size, so they are sent to the worker
+                references = self.model_service.get_references(model_name)
+            except ValueError as e:
+                print(f"Skipping scheduled drift check for {model_name}: {e}")
+                self.failures += 1
+                continue
+            future = self._pool.submit(
+                run_drift_check,
+                model_name,
+                references["version"],
+                references["features"],
+                references["reference"],
+                references["prediction_reference"],
+                last_ids[model_name],
+                newest_ids[model_name],
+                self.max_rows,
+                references["sample"],
+                self.multivariate_params,
+                self.model_service.drift_engine.min_samples
+            )
+            futures[future] = model_name
+
+        results = []
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+                self.checks += 1
+            except Exception as e:
+                print(f"Error checking drift for {futures[future]}: {e}")
+                self.failures += 1
+        return results
+
+    def _write_results(self, results: List[Dict[str, Any]], newest_ids: Dict[str, int], claimed: List[str]) -> int:
+        """Insert the results, advance the checked models' last ids and release the claims in one transaction"""
+        timestamp = datetime.now()
+        rows = [
+            {
+                "model_name": result["model_name"],
+                "model_version": result["model_version"],
+                "drift_type": drift["drift_type"],
+                "drift_score": drift["drift_score"],
+                "threshold": drift["threshold"],
+                "is_drift_detected": drift["is_drift_detected"],
+                "feature_name": drift["feature_name"],
+                "details": drift["details"],
+                "timestamp": timestamp
+            }
+            for result in results
+            for drift in result["results"]
+        ]
+
+        db = self.session_factory()
+        try:
+            if rows:
+                db.execute(insert(ModelDrift), rows)
+                if self.on_write is not None:
+                    self.on_write(db, rows)
+            for result in results:
+                db.query(DriftCheckState)\
+                    .filter(DriftCheckState.model_name == result["model_name"])\
+                    .update({"last_id": newest_ids[result["model_name"]]}, synchronize_session=False)
+            self._release(db, claimed)
+            db.commit()
+        finally:
+            db.close()
+        if rows and self.after_commit is not None:
+            self.after_commit(rows)
+        return len(rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = datetime.now()
+        db = self.session_factory()
+        try:
+            states = db.query(DriftCheckState).order_by(DriftCheckState.model_name).all()
+        finally:
+            db.close()
+        return {
+            "running": self._thread is not None,
+            "owner": self.owner,
+            "default_interval": self.default_interval,
+            "max_workers": self.max_workers,
+            "cycles": self.cycles,
+            "checks": self.checks,
+            "skipped": self.skipped,
+            "claimed_elsewhere": self.claimed_elsewhere,
+            "failures": self.failures,
+            "last_cycle": self.last_cycle,
+            "models": {
+                state.model_name: {
+                    "interval": state.interval or self.interval(state.model_name),
+                    "next_run_in": round((state.next_run_at - now).total_seconds(), 1),
+                    "last_checked_id": state.last_id,
+                    "claimed_by": state.claimed_by if state.claimed_until and state.claimed_until >= now else None
+                }
+                for state in states
+            }
+        }
@@ -0,0 +1,50 @@
+# Entry point of the drift scheduler's spawned worker processes. It imports only what
+# scoring needs, so workers never load the app, its services or the schema setup.
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+from app.core.database import SessionLocal
+from app.models.model_monitoring import ModelPerformance
+from app.services.drift_engine import DriftEngine, ReferenceDistribution
+from app.services.feature_vectorizer import FeatureVectorizer
+from app.services.multivariate_drift import MultivariateDriftDetector
+
+def run_drift_check(
+    model_name: str,
+    model_version: str,
+    features: List[str],
+    reference: ReferenceDistribution,
+    prediction_reference: ReferenceDistribution,
+    after_id: int,
+    up_to_id: int,
+    max_rows: int,
+    reference_sample: Optional[np.ndarray] = None,
+    multivariate_params: Optional[Dict[str, Any]] = None,
+    min_samples: int = 1
+) -> Dict[str, Any]:
+    """Score one model's predictions logged in (after_id, up_to_id]; runs in a worker process"""
+    db = SessionLocal()
+    try:
+        rows = db.query(ModelPerformance.id, ModelPerformance.metadata_)\
+            .filter(ModelPerformance.model_name == model_name)\
+            .filter(ModelPerformance.metric_name == "prediction")\
+            .filter(ModelPerformance.id > after_id)\
+            .filter(ModelPerformance.id <= up_to_id)\
+            .order_by(ModelPerformance.id.desc())\
+            .limit(max_rows)\
+            .all()
+    finally:
+        db.close()
+
+    recent = FeatureVectorizer(features).from_log_records([row[1] for row in rows])
+
+    results = DriftEngine(min_samples=min_samples).score_model(
+        reference,
+        prediction_reference,
+        reference.bin_counts(recent["X"]),
+        prediction_reference.bin_counts(recent["predictions"])
+    )
+    if reference_sample is not None and multivariate_params is not None:
+        detector = MultivariateDriftDetector(**multivariate_params)
+        results.extend(detector.drift_results(detector.test(model_name, reference_sample, recent["X"])))
+    return {"model_name": model_name, "model_version": model_version, "sample_size": len(rows), "results": results}
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from operator import itemgetter
+from typing import Any, Dict, List, Sequence, Union
+
+class MissingFeaturesError(ValueError):
+    """Raised when an input does not provide every feature a model needs"""
+
+    def __init__(self, missing: List[str], rows: int = 1):
+        self.missing = missing
+        self.rows = rows
+        shown = ", ".join(missing[:20]) + (", ..." if len(missing) > 20 else "")
+        super().__init__(f"Missing {len(missing)} feature(s) in {rows} row(s): {shown}")
+
+class ExtraFeaturesError(MissingFeaturesError):
+    """Raised when a positional input has more values than the model has features"""
+
+    def __init__(self, expected: int, received: int):
+        self.missing: List[str] = []
+        self.rows = 1
+        ValueError.__init__(self, f"Expected {expected} feature values, got {received}")
+
+class FeatureVectorizer:
+    """Maps named feature inputs onto a model's column order
+
+    Built once per model: the name to column index map and a C-level
+    itemgetter over the feature names are compiled up front, so turning a
+    dict into a row never loops over features in Python.
+    """
+
+    def __init__(self, features: Sequence[str]):
+        self.features = list(features)
+        self.index = {name: i for i, name in enumerate(self.features)}
+        self._getter = itemgetter(*self.features) if self.features else (lambda values: ())
+        self._feature_set = frozenset(self.features)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.features)
+
+    def missing(self, provided) -> List[str]:
+        """Model features absent from the provided names, in model order"""
+        absent = self._feature_set.difference(provided)
+        return [name for name in self.features if name in absent]
+
+    def from_dict(self, values: Dict[str, Any]) -> np.ndarray:
+        """One row from a {feature: value} dict"""
+        try:
+            row = self._getter(values)
+        except KeyError:
+            raise MissingFeaturesError(self.missing(values))
+        if self.n_features == 1:
+            row = (row,)
+        return np.array(row, dtype=np.float64)
+
+    def from_list(self, values: Sequence[Any]) -> np.ndarray:
+        """One row from values already in model feature order"""
+        # Rejected like dict inputs, so clients get the same validation error
+        if len(values) < self.n_features:
+            raise MissingFeaturesError(self.features[len(values):])
+        if len(values) > self.n_features:
+            raise ExtraFeaturesError(self.n_features, len(values))
+        return np.asarray(values, dtype=np.float64)
+
+    def from_row(self, values: Union[Dict[str, Any], Sequence[Any]]) -> np.ndarray:
+        """One row from either a dict or a positional list"""
+        if isinstance(values, dict):
+            return self.from_dict(values)
+        return self.from_list(values)
+
+    def from_columns(self, columns: Dict[str, Sequence[Any]]) -> np.ndarray:
+        """A (rows, features) matrix from one list of values per feature"""
+        missing = self.missing(columns)
+        if missing:
+            lengths = {len(values) for values in columns.values()}
+            raise MissingFeaturesError(missing, max(lengths) if lengths else 0)
+
+        # One C-level conversion per column
+        try:
+            X = np.array(self._getter(columns) if self.n_features > 1 else [columns[self.features[0]]], dtype=np.float64)
+        except ValueError:
+            X = None
+        if X is None or X.ndim != 2:
+            raise ValueError("All feature columns must have the same length")
+        return np.ascontiguousarray(X.T)
+
+    def from_rows(self, rows: Sequence[Union[Dict[str, Any], Sequence[Any]]]) -> np.ndarray:
+        """A (rows, features) matrix from a list of dicts or positional lists"""
+        if not rows:
+            return np.empty((0, self.n_features))
+        if isinstance(rows[0], dict):
+            return self.from_frame(pd.DataFrame.from_records(rows))
+
+        X = np.asarray(rows, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected rows of {self.n_features} feature values")
+        return X
+
+    def from_frame(self, df: pd.DataFrame, strict: bool = True) -> np.ndarray:
+        """A (rows, features) matrix from a DataFrame, reporting absent or null features
+
+        With strict=False, missing values are left as NaN instead.
+        """
+        missing = self.missing(df.columns)
+        if missing and strict:
+            raise MissingFeaturesError(missing, len(df))
+
+        X = df.reindex(columns=self.features).to_numpy(dtype=np.float64)
+        if strict:
+            null_columns = np.isnan(X).any(axis=0)
+            if null_columns.any():
+                rows = int(np.isnan(X).any(axis=1).sum())
+                raise MissingFeaturesError([self.features[i] for i in np.flatnonzero(null_columns)], rows)
+        return X
+
+    def from_log_records(self, records: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Feature matrix and predictions from logged prediction metadata
+
+        Features missing from old log rows are left as NaN, which the
+        drift engine skips.
+        """
+        records = [r for r in records if r and "features" in r]
+        X = self.from_frame(pd.DataFrame.from_records([r["features"] for r in records]), strict=False)
+        predictions = np.array([r.get("prediction", np.nan) for r in records], dtype=np.float64)
+        return {"X": X, "predictions": predictions}
@@ -0,0 +1,147 @@
+import threading
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+# Sub-buckets per power of two; bucket width is at most 1/2^(PRECISION_BITS-1) of its value
+PRECISION_BITS = 7
+# Durations are recorded in nanoseconds, up to about 2^40 ns (18 minutes)
+MAX_EXPONENT = 40 - PRECISION_BITS
+HALF = 1 << (PRECISION_BITS - 1)
+N_BUCKETS = (1 << PRECISION_BITS) + MAX_EXPONENT * HALF
+RATE_WINDOW = 60
+
+QUANTILES = {"p50_ms": 0.5, "p90_ms": 0.9, "p99_ms": 0.99, "p999_ms": 0.999}
+
+def bucket_index(value: int) -> int:
+    """HDR-style log-linear bucket of a non-negative integer duration"""
+    if value < (1 << PRECISION_BITS):
+        return value
+    exponent = value.bit_length() - PRECISION_BITS
+    if exponent > MAX_EXPONENT:
+        return N_BUCKETS - 1
+    return (1 << PRECISION_BITS) + (exponent - 1) * HALF + (value >> exponent) - HALF
+
+def _bucket_bounds() -> Tuple[np.ndarray, np.ndarray]:
+    """Lower bound and width of every bucket"""
+    index = np.arange(N_BUCKETS)
+    lower = index.astype(np.float64)
+    width = np.ones(N_BUCKETS)
+    upper = index >= (1 << PRECISION_BITS)
+    exponent = (index[upper] - (1 << PRECISION_BITS)) // HALF + 1
+    mantissa = HALF + (index[upper] - (1 << PRECISION_BITS)) % HALF
+    lower[upper] = mantissa.astype(np.float64) * 2.0 ** exponent
+    width[upper] = 2.0 ** exponent
+    return lower, width
+
+BUCKET_LOWER, BUCKET_WIDTH = _bucket_bounds()
+
+class _Series:
+    """Counters of one (model, version, stage) written by a single thread"""
+
+    __slots__ = ("counts", "calls", "rows", "total_ns", "max_ns", "second_tags", "second_rows")
+
+    def __init__(self):
+        self.counts = [0] * N_BUCKETS
+        self.calls = 0
+        self.rows = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        # Rows per second over the last RATE_WINDOW seconds, as a ring keyed by second
+        self.second_tags = [-1] * RATE_WINDOW
+        self.second_rows = [0] * RATE_WINDOW
+
+class LatencyTracker:
+    """Latency histograms of prediction stages per model and version
+
+    Every thread records into its own shard, so the hot path takes no
+    lock and does a handful of integer operations: one bucket increment,
+    call and row counters, and a per-second row counter for throughput.
+    Readers merge the shards; a snapshot taken while threads are writing
+    may miss their last few samples, which is fine for monitoring.
+    Quantiles are accurate to within half a bucket, under 1%.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, str, str], _Series]] = []
+        # Only taken when a thread records for the first time
+        self._shards_lock = threading.Lock()
+        self.started = time.monotonic()
+
+    def record(self, model_name: str, version: str, stage: str, duration_ns: int, rows: int = 1) -> None:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+
+        series = shard.get((model_name, version, stage))
+        if series is None:
+            series = shard[(model_name, version, stage)] = _Series()
+
+        series.counts[bucket_index(duration_ns)] += 1
+        series.calls += 1
+        series.rows += rows
+        series.total_ns += duration_ns
+        if duration_ns > series.max_ns:
+            series.max_ns = duration_ns
+
+        second = int(time.monotonic())
+        slot = second % RATE_WINDOW
+        if series.second_tags[slot] != second:
+            series.second_tags[slot] = second
+            series.second_rows[slot] = 0
+        series.second_rows[slot] += rows
+
+    def since(self, start_ns: int, model_name: str, version: str, stage: str, rows: int = 1) -> None:
+        """Record the time elapsed since a time.perf_counter_ns() reading"""
+        self.record(model_name, version, stage, time.perf_counter_ns() - start_ns, rows)
+
+    def get_stats(self, model_name: Optional[str] = None) -> Dict[str, Any]:
+        """Quantiles in milliseconds and throughput per model, version and stage"""
+        merged: Dict[Tuple[str, str, str], List[_Series]] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for key, series in list(shard.items()):
+                if model_name is None or key[0] == model_name:
+                    merged.setdefault(key, []).append(series)
+
+        now = int(time.monotonic())
+        # Only complete seconds count towards the recent rate
+        window = min(RATE_WINDOW - 1, max(now - int(self.started), 1))
+        models: Dict[str, Dict[str, Any]] = {}
+        for (name, version, stage), parts in sorted(merged.items()):
+            counts = np.sum([series.counts for series in parts], axis=0)
+            calls = sum(series.calls for series in parts)
+            rows = sum(series.rows for series in parts)
+            recent_rows = sum(
+                count
+                for series in parts
+                for tag, count in zip(series.second_tags, series.second_rows)
+                if now - window <= tag < now
+            )
+            stats = {
+                "calls": calls,
+                "rows": rows,
+                "mean_ms": round(sum(series.total_ns for series in parts) / calls / 1e6, 4) if calls else None,
+                "max_ms": round(max(series.max_ns for series in parts) / 1e6, 4),
+                **{label: _quantile_ms(counts, q) for label, q in QUANTILES.items()},
+                "rows_per_second": round(recent_rows / window, 2)
+            }
+            version_stats = models.setdefault(name, {}).setdefault(version, {"stages": {}})
+            version_stats["stages"][stage] = stats
+            if stage == "inference":
+                version_stats["qps"] = stats["rows_per_second"]
+
+        return {"rate_window_seconds": window, "models": models}
+
+def _quantile_ms(counts: np.ndarray, q: float) -> Optional[float]:
+    total = counts.sum()
+    if total == 0:
+        return None
+    index = int(np.searchsorted(np.cumsum(counts), q * total))
+    # Midpoint of the bucket the quantile falls in
+    return round((BUCKET_LOWER[index] + BUCKET_WIDTH[index] / 2) / 1e6, 4)
@@ -0,0 +1,443 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import case, delete, func, insert, update
+from sqlalchemy.orm import Session
+
+from app.models.model_monitoring import MetricRollup, ModelDrift, ModelPerformance
+
+# Rollup resolutions from finest to coarsest, in seconds
+RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+RAW_TABLES = {"performance": ModelPerformance, "drift": ModelDrift}
+
+# Columns of the unique key of a rollup bucket
+BUCKET_COLUMNS = ["source", "model_name", "model_version", "metric_name", "feature_name", "resolution", "bucket_start"]
+
+# (model, version, metric or drift type, feature) of one source
+SeriesKey = Tuple[str, str, str, str]
+
+def bucket_start(timestamp: datetime, seconds: int) -> datetime:
+    """Start of the bucket holding `timestamp`, aligned to midnight"""
+    timestamp = timestamp.replace(tzinfo=None)
+    day = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    offset = (timestamp - day).total_seconds() // seconds * seconds
+    return day + timedelta(seconds=offset)
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the points Largest-Triangle-Three-Buckets keeps to draw y(x) with n_out points
+
+    The first and last points are always kept. The points in between are
+    split into n_out - 2 buckets, and each bucket keeps the point forming
+    the largest triangle with the previously kept point and the average
+    of the next bucket, which preserves peaks and dips.
+    """
+    n = len(x)
+    if n <= n_out:
+        return np.arange(n)
+    n_out = max(n_out, 3)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+class MetricRollups:
+    """Minute, hour and day rollups of performance and drift history
+
+    Writers pass every batch of raw rows to `record_performance` or
+    `record_drift` before committing the session that inserted them. The
+    rows are folded into one rollup row per series, resolution and
+    bucket with an upsert, so raw rows and rollups commit together.
+    History queries then read at most one row per bucket. A background thread
+    enforces retention: raw rows and each resolution are deleted once
+    they are older than it, leaving the coarser rollups to cover them.
+    Raw rows are kept by default, since they include the prediction logs
+    that feedback and drift rescans read.
+    """
+
+    def __init__(
+        self,
+        retention_days: Dict[str, Optional[float]],
+        max_points: int = 2000,
+        compaction_interval: float = 3600.0,
+        state_file: Optional[str] = None,
+        chunk_size: int = 10000
+    ):
+        # Keys are "raw" and the resolutions; None keeps rows forever
+        self.retention_days = retention_days
+        self.max_points = max_points
+        self.compaction_interval = compaction_interval
+        self.state_file = state_file
+        self.chunk_size = chunk_size
+
+        # Raw rows written before rollups existed: ids up to "upto" are added by
+        # the backfill, which has covered everything up to "done"
+        self.backfill: Dict[str, Dict[str, int]] = {}
+        self.compacted: Dict[str, int] = defaultdict(int)
+        self.last_compaction: Optional[str] = None
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record_performance(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        """Fold inserted ModelPerformance rows into the rollups, in the session that inserted them"""
+        cells = self._cells(
+            rows,
+            lambda row: ((row["model_name"], row["model_version"], row["metric_name"], ""),
+                         row["metric_value"], row.get("sample_size") or 0, 0.0, 0)
+        )
+        self._write(db, "performance", cells)
+
+    def record_drift(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        """Fold inserted ModelDrift rows into the rollups, in the session that inserted them"""
+        cells = self._cells(
+            rows,
+            lambda row: ((row["model_name"], row["model_version"], row["drift_type"], row.get("feature_name") or ""),
+                         row["drift_score"], 0, row["threshold"], int(bool(row["is_drift_detected"])))
+        )
+        self._write(db, "drift", cells)
+
+    def _cells(self, rows: List[Dict[str, Any]], fields: Callable) -> Dict[Tuple[SeriesKey, str, datetime], List[float]]:
+        # One pass into minute cells; hours and days are summed from those
+        minute_cells: Dict[Tuple[SeriesKey, datetime], List[float]] = {}
+        minutes: Dict[datetime, datetime] = {}
+        now = datetime.now()
+        for row in rows:
+            series, value, sample_size, threshold, detected = fields(row)
+            timestamp = row.get("timestamp") or now
+            minute = minutes.get(timestamp)
+            if minute is None:
+                minute = minutes[timestamp] = bucket_start(timestamp, RESOLUTIONS["minute"])
+
+            cell = minute_cells.get((series, minute))
+            if cell is None:
+                minute_cells[(series, minute)] = [1, value, value, value, sample_size, threshold, detected]
+            else:
+                cell[0] += 1
+                cell[1] += value
+                cell[2] = min(cell[2], value)
+                cell[3] = max(cell[3], value)
+                cell[4] += sample_size
+                cell[5] += threshold
+                cell[6] += detected
+
+        cells = {}
+        for resolution, seconds in RESOLUTIONS.items():
+            for (series, minute), cell in minute_cells.items():
+                key = (series, resolution, bucket_start(minute, seconds))
+                merged = cells.get(key)
+                if merged is None:
+                    cells[key] = list(cell)
+                else:
+                    merged[0] += cell[0]
+                    merged[1] += cell[1]
+                    merged[2] = min(merged[2], cell[2])
+                    merged[3] = max(merged[3], cell[3])
+                    merged[4] += cell[4]
+                    merged[5] += cell[5]
+                    merged[6] += cell[6]
+        return cells
+
+    def _write(self, db: Session, source: str, cells: Dict[Tuple[SeriesKey, str, datetime], List[float]]) -> None:
+        rows = [
+            {
+                "source": source,
+                "model_name": model_name,
+                "model_version": version,
+                "metric_name": metric_name,
+                "feature_name": feature_name,
+                "resolution": resolution,
+                "bucket_start": bucket,
+                "count": count,
+                "sum_value": sum_value,
+                "min_value": low,
+                "max_value": high,
+                "sum_sample_size": sample_size,
+                "sum_threshold": threshold,
+                "detected_count": detected
+            }
+            for ((model_name, version, metric_name, feature_name), resolution, bucket),
+                (count, sum_value, low, high, sample_size, threshold, detected) in cells.items()
+        ]
+        if not rows:
+            return
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            for row in rows:
+                self._update_or_insert(db, row)
+            return
+
+        # One atomic upsert per bucket, so writers in other sessions and processes
+        # never race to insert the same bucket and no lock is held across the INSERT
+        statement = upsert(MetricRollup)
+        new = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=BUCKET_COLUMNS,
+            set_={
+                "count": MetricRollup.count + new["count"],
+                "sum_value": MetricRollup.sum_value + new.sum_value,
+                "min_value": case((MetricRollup.min_value < new.min_value, MetricRollup.min_value), else_=new.min_value),
+                "max_value": case((MetricRollup.max_value > new.max_value, MetricRollup.max_value), else_=new.max_value),
+                "sum_sample_size": MetricRollup.sum_sample_size + new.sum_sample_size,
+                "sum_threshold": MetricRollup.sum_threshold + new.sum_threshold,
+                "detected_count": MetricRollup.detected_count + new.detected_count
+            }
+        )
+        db.execute(statement, rows)
+
+    def _update_or_insert(self, db: Session, row: Dict[str, Any]) -> None:
+        query = update(MetricRollup)
+        for column in BUCKET_COLUMNS:
+            query = query.where(getattr(MetricRollup, column) == row[column])
+        result = db.execute(
+            query.values(
+                count=MetricRollup.count + row["count"],
+                sum_value=MetricRollup.sum_value + row["sum_value"],
+                min_value=case((MetricRollup.min_value < row["min_value"], MetricRollup.min_value), else_=row["min_value"]),
+                max_value=case((MetricRollup.max_value > row["max_value"], MetricRollup.max_value), else_=row["max_value"]),
+                sum_sample_size=MetricRollup.sum_sample_size + row["sum_sample_size"],
+                sum_threshold=MetricRollup.sum_threshold + row["sum_threshold"],
+                detected_count=MetricRollup.detected_count + row["detected_count"]
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(MetricRollup).values(**row))
+
+    def choose_resolution(self, start: datetime, end: datetime) -> str:
+        """Finest resolution that still covers `start` and has at most max_points buckets"""
+        oldest_kept = datetime.now()
+        for resolution, seconds in RESOLUTIONS.items():
+            retention = self.retention_days.get(resolution)
+            if retention is not None and start < oldest_kept - timedelta(days=retention):
+                continue
+            if (end - start).total_seconds() / seconds <= self.max_points:
+                return resolution
+        return "day"
+
+    def series(
+        self,
+        db: Session,
+        source: str,
+        model_name: str,
+        start: datetime,
+        end: datetime,
+        resolution: str,
+        metric_name: Optional[str] = None,
+        max_points: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Rollup points of a model's series in [start, end), newest first
+
+        With `max_points`, each series is downsampled with LTTB on its mean.
+        """
+        query = db.query(MetricRollup)\
+            .filter(MetricRollup.model_name == model_name)\
+            .filter(MetricRollup.source == source)\
+            .filter(MetricRollup.resolution == resolution)\
+            .filter(MetricRollup.bucket_start >= bucket_start(start, RESOLUTIONS[resolution]))\
+            .filter(MetricRollup.bucket_start < end)
+        if metric_name:
+            query = query.filter(MetricRollup.metric_name == metric_name)
+
+        points = [
+            {
+                "model_name": row.model_name,
+                "model_version": row.model_version,
+                "metric_name": row.metric_name,
+                "feature_name": row.feature_name or None,
+                "resolution": resolution,
+                "timestamp": row.bucket_start,
+                "count": row.count,
+                "mean": row.sum_value / row.count,
+                "min": row.min_value,
+                "max": row.max_value,
+                "sample_size": row.sum_sample_size,
+                "threshold": row.sum_threshold / row.count,
+                "detected_count": row.detected_count
+            }
+            for row in query.order_by(MetricRollup.bucket_start).all()
+        ]
+        if max_points:
+            points = self.downsample(points, max_points)
+        points.sort(key=lambda point: point["timestamp"], reverse=True)
+        return points
+
+    @staticmethod
+    def downsample(points: List[Dict[str, Any]], max_points: int, value_key: str = "mean") -> List[Dict[str, Any]]:
+        """Keep at most max_points of every series with LTTB; points must be in time order"""
+        by_series: Dict[SeriesKey, List[Dict[str, Any]]] = defaultdict(list)
+        for point in points:
+            by_series[(point["model_version"], point["metric_name"], point.get("feature_name"))].append(point)
+
+        kept = []
+        for series_points in by_series.values():
+            x = np.array([point["timestamp"].timestamp() for point in series_points])
+            y = np.array([point[value_key] for point in series_points], dtype=np.float64)
+            kept.extend(series_points[i] for i in lttb(x, y, max_points))
+        return kept
+
+    def start(self, session_factory: Callable) -> None:
+        """Plan the backfill of rows written before rollups existed and start compacting"""
+        if self._thread is not None:
+            return
+        self._load_state()
+        db = session_factory()
+        try:
+            for source, table in RAW_TABLES.items():
+                if source in self.backfill:
+                    continue
+                # Rows written from now on are rolled up on write; existing rollups
+                # without saved state mean the raw rows are already counted
+                rolled_up = db.query(MetricRollup.id).filter(MetricRollup.source == source).first() is not None
+                upto = 0 if rolled_up else db.query(func.max(table.id)).scalar() or 0
+                self.backfill[source] = {"upto": upto, "done": 0}
+        finally:
+            db.close()
+        self._save_state()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(session_factory,), name="metric-rollups", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, session_factory: Callable) -> None:
+        try:
+            for source in RAW_TABLES:
+                while not self._stop.is_set() and self._backfill_chunk(session_factory, source):
+                    pass
+        except Exception as e:
+            print(f"Error backfilling metric rollups: {e}")
+        while not self._stop.is_set():
+            try:
+                self.compact(session_factory)
+            except Exception as e:
+                print(f"Error compacting metric history: {e}")
+            self._stop.wait(self.compaction_interval)
+
+    def _backfill_chunk(self, session_factory: Callable, source: str) -> bool:
+        """Roll up the next chunk of pre-existing raw rows; returns False when none are left"""
+        state = self.backfill[source]
+        if state["done"] >= state["upto"]:
+            return False
+
+        table = RAW_TABLES[source]
+        if source == "performance":
+            columns = [table.id, table.model_name, table.model_version, table.metric_name, table.metric_value, table.sample_size, table.timestamp]
+        else:
+            columns = [table.id, table.model_name, table.model_version, table.drift_type, table.drift_score, table.threshold,
+                       table.is_drift_detected, table.feature_name, table.timestamp]
+
+        db = session_factory()
+        try:
+            rows = db.query(*columns)\
+                .filter(table.id > state["done"])\
+                .filter(table.id <= state["upto"])\
+                .order_by(table.id)\
+                .limit(self.chunk_size)\
+                .all()
+            if not rows:
+                state["done"] = state["upto"]
+            else:
+                records = [row._asdict() for row in rows]
+                if source == "performance":
+                    self.record_performance(db, records)
+                else:
+                    self.record_drift(db, records)
+                db.commit()
+                state["done"] = rows[-1].id
+        finally:
+            db.close()
+        self._save_state()
+        return True
+
+    def compact(self, session_factory: Callable) -> Dict[str, int]:
+        """Delete raw rows and rollups older than their retention; returns rows deleted per table"""
+        now = datetime.now()
+        deleted: Dict[str, int] = {}
+        for source, table in RAW_TABLES.items():
+            retention = self.retention_days.get("raw")
+            state = self.backfill.get(source)
+            # Rows the backfill has not reached yet are only in the raw table
+            if retention is None or state is None or state["done"] < state["upto"]:
+                continue
+            deleted[table.__tablename__] = self._delete_chunked(
+                session_factory, table, table.timestamp < now - timedelta(days=retention)
+            )
+
+        for resolution in RESOLUTIONS:
+            retention = self.retention_days.get(resolution)
+            if retention is None:
+                continue
+            deleted[f"rollups_{resolution}"] = self._delete_chunked(
+                session_factory,
+                MetricRollup,
+                (MetricRollup.resolution == resolution) & (MetricRollup.bucket_start < now - timedelta(days=retention))
+            )
+
+        for name, count in deleted.items():
+            self.compacted[name] += count
+        self.last_compaction = now.isoformat()
+        return deleted
+
+    def _delete_chunked(self, session_factory: Callable, table: Any, condition: Any) -> int:
+        # Short transactions, so writers are never blocked for the whole compaction
+        deleted = 0
+        while not self._stop.is_set():
+            db = session_factory()
+            try:
+                ids = [row[0] for row in db.query(table.id).filter(condition).limit(self.chunk_size).all()]
+                if not ids:
+                    break
+                db.execute(delete(table).where(table.id.in_(ids)).execution_options(synchronize_session=False))
+                db.commit()
+                deleted += len(ids)
+            finally:
+                db.close()
+        return deleted
+
+    def _load_state(self) -> None:
+        if self.state_file and os.path.exists(self.state_file):
+            with open(self.state_file) as f:
+                self.backfill = json.load(f)
+
+    def _save_state(self) -> None:
+        if not self.state_file:
+            return
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(self.backfill, f)
+        os.replace(tmp_file, self.state_file)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "retention_days": self.retention_days,
+            "max_points": self.max_points,
+            "backfill": self.backfill,
+            "compacted_rows": dict(self.compacted),
+            "last_compaction": self.last_compaction
+        }
@@ -0,0 +1,129 @@
+import asyncio
+import numpy as np
+from typing import Any, Callable, Dict, List, Tuple
+
+class MicroBatcher:
+    """Coalesces concurrent single-row predictions into vectorized batches
+
+    Each model gets a queue and a worker task. The worker takes the first
+    waiting row, collects more rows until the batch is full or the max
+    delay has passed, runs one vectorized prediction and resolves every
+    waiting caller. The delay adapts to load: when requests arrive further
+    apart than the max delay, waiting would not fill a batch, so rows are
+    predicted as soon as they arrive.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[str, np.ndarray], Dict[str, np.ndarray]],
+        max_batch_size: int = 64,
+        max_delay: float = 0.005
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.workers: Dict[str, asyncio.Task] = {}
+        # Exponentially weighted gap between arrivals, per model
+        self._arrival_gap: Dict[str, float] = {}
+        self._last_arrival: Dict[str, float] = {}
+        # Batch-size histogram buckets are powers of two up to the max batch size
+        self._buckets = [2 ** i for i in range(int(np.ceil(np.log2(max(max_batch_size, 1)))) + 1)]
+        self._batch_sizes: Dict[str, List[int]] = {}
+
+    async def submit(self, model_name: str, row: np.ndarray) -> Tuple[float, float, Any]:
+        """Queue one feature row and wait for its (prediction, confidence, model version)"""
+        loop = asyncio.get_running_loop()
+        if model_name not in self.workers or self.workers[model_name].done():
+            self.queues[model_name] = asyncio.Queue()
+            self._batch_sizes.setdefault(model_name, [0] * len(self._buckets))
+            self.workers[model_name] = loop.create_task(self._worker(model_name))
+
+        now = loop.time()
+        last = self._last_arrival.get(model_name)
+        if last is not None:
+            gap = self._arrival_gap.get(model_name, now - last)
+            self._arrival_gap[model_name] = 0.8 * gap + 0.2 * (now - last)
+        self._last_arrival[model_name] = now
+
+        future = loop.create_future()
+        self.queues[model_name].put_nowait((row, future))
+        return await future
+
+    async def _worker(self, model_name: str) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self.queues[model_name]
+
+        while True:
+            batch = [await queue.get()]
+
+            # Only wait for more rows when traffic is dense enough to fill them
+            wait = self._arrival_gap.get(model_name, self.max_delay) < self.max_delay
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if not wait or timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self._record_batch(model_name, len(batch))
+            futures = [future for _, future in batch]
+            try:
+                X = np.vstack([row for row, _ in batch])
+                result = await loop.run_in_executor(None, self.predict_fn, model_name, X)
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            predictions = result["predictions"].tolist()
+            confidence = result["confidence"].tolist()
+            version = result.get("version")
+            for i, future in enumerate(futures):
+                # Callers that gave up (e.g. client disconnects) are skipped
+                if not future.done():
+                    future.set_result((predictions[i], confidence[i], version))
+
+    def _record_batch(self, model_name: str, size: int) -> None:
+        histogram = self._batch_sizes[model_name]
+        for i, bound in enumerate(self._buckets):
+            if size <= bound:
+                histogram[i] += 1
+                return
+        histogram[-1] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth and batch-size histogram per model"""
+        models = {}
+        for model_name, histogram in self._batch_sizes.items():
+            batches = sum(histogram)
+            models[model_name] = {
+                "queue_depth": self.queues[model_name].qsize() if model_name in self.queues else 0,
+                "batches": batches,
+                "batch_size_histogram": {f"le_{bound}": count for bound, count in zip(self._buckets, histogram)},
+                "arrival_gap_ms": round(self._arrival_gap.get(model_name, 0.0) * 1000, 3)
+            }
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_delay_ms": self.max_delay * 1000,
+            "models": models
+        }
+
+    async def stop(self) -> None:
+        """Cancel the per-model workers"""
+        for task in self.workers.values():
+            task.cancel()
+        for task in self.workers.values():
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self.workers.clear()
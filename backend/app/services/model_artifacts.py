@@ -0,0 +1,35 @@
+import os
+import pickle
+import joblib
+from typing import Any, Optional
+
+ARTIFACT_EXTENSION = ".joblib"
+
+def save_model(model: Any, file_path: str) -> None:
+    """Write a model artifact that can be memory-mapped on load
+
+    Artifacts are uncompressed joblib files, so every NumPy array inside
+    the model is stored as a raw, aligned buffer. The file is written to
+    a temporary name and renamed, so workers never map a partial file.
+    """
+    tmp_path = f"{file_path}.tmp"
+    joblib.dump(model, tmp_path, compress=0)
+    os.replace(tmp_path, file_path)
+
+def load_model(file_path: str, mmap_mode: Optional[str] = "r") -> Any:
+    """Load a model artifact, memory-mapping its arrays read-only
+
+    Mapped arrays are backed by the page cache, so every worker process
+    that loads the same artifact shares one physical copy. Legacy pickle
+    artifacts are loaded into private memory.
+
+    Only arrays the model keeps as NumPy arrays stay mapped: sklearn's
+    Tree.__setstate__ copies node arrays into memory it owns, so fitted
+    forests are private per process. Their compiled FlatTreeEnsemble
+    artifacts are plain arrays and are shared.
+    """
+    if not file_path.endswith(ARTIFACT_EXTENSION):
+        with open(file_path, 'rb') as f:
+            return pickle.load(f)
+
+    return joblib.load(file_path, mmap_mode=mmap_mode)
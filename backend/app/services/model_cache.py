@@ -0,0 +1,129 @@
+import sys
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+def estimate_model_size(model: Any) -> int:
+    """Estimate the resident size of a fitted model in bytes
+
+    Walks the object graph and counts NumPy buffers, which dominate the
+    footprint of fitted estimators. Extension types such as sklearn's
+    tree objects expose their arrays through __getstate__. Memory-mapped
+    arrays live in the shared page cache and are not counted.
+    """
+    seen = set()
+    # Temporary state dicts are kept alive so their ids are not reused
+    keepalive = []
+    stack = [model]
+    total = 0
+
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        keepalive.append(obj)
+
+        if isinstance(obj, np.memmap):
+            continue
+        if isinstance(obj, np.ndarray):
+            total += obj.nbytes
+            if obj.dtype == object:
+                stack.extend(obj.ravel().tolist())
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            stack.extend(obj)
+        elif isinstance(obj, (str, bytes, int, float, bool, type(None))):
+            total += sys.getsizeof(obj)
+        elif hasattr(obj, "__dict__"):
+            total += sys.getsizeof(obj)
+            stack.append(vars(obj))
+        elif hasattr(obj, "__getstate__"):
+            try:
+                stack.append(obj.__getstate__())
+            except Exception:
+                total += sys.getsizeof(obj)
+
+    return total
+
+class ModelCache:
+    """LRU cache of loaded models bounded by their estimated memory footprint
+
+    The cache lock only guards lookups and inserts; a miss loads under a
+    lock of its own key, so one slow load neither blocks hits on other
+    models nor runs twice for the same one.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.RLock()
+        self._loading: Dict[str, threading.Lock] = {}
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Return a cached model, loading it with `loader` on a miss"""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry["model"]
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            try:
+                with self._lock:
+                    # Another thread may have loaded it while this one waited
+                    entry = self._lookup(key)
+                    if entry is not None:
+                        return entry["model"]
+                    self.misses += 1
+                model = loader()
+                self.put(key, model)
+                return model
+            finally:
+                with self._lock:
+                    if self._loading.get(key) is load_lock:
+                        del self._loading[key]
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, model: Any) -> None:
+        """Insert or replace a model, evicting least recently used ones over budget"""
+        size = estimate_model_size(model)
+        with self._lock:
+            self.invalidate(key)
+            self.entries[key] = {"model": model, "size": size}
+            self.resident_bytes += size
+
+            # A model larger than the whole budget is still kept on its own
+            while self.resident_bytes > self.max_bytes and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.resident_bytes -= evicted["size"]
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.resident_bytes -= entry["size"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_bytes": self.max_bytes,
+                "resident_bytes": self.resident_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "models": {key: entry["size"] for key, entry in self.entries.items()}
+            }
@@ -1,156 +1,441 @@
-import pickle
+import json
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
 import os
+import threading
+import time
 from datetime import datetime
-import random
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.drift_engine import DriftEngine
+from app.services.drift_monitor import StreamingDriftMonitor
+from app.services.model_cache import ModelCache
+from app.services.prediction_cache import PredictionCache
+from app.services.latency_metrics import LatencyTracker
+from app.services.model_registry import ModelRegistry
+from app.services.shadow_scoring import ShadowScorer
+from app.services.model_artifacts import ARTIFACT_EXTENSION, save_model, load_model
+from app.services.feature_vectorizer import FeatureVectorizer
+from app.services.tree_inference import FlatTreeEnsemble, can_compile, verify
+from app.services.performance_tracker import PerformanceTracker
+from app.services.reference_store import ReferenceSketch, ReferenceStore
+from app.services.multivariate_drift import MultivariateDriftDetector
+from app.services.concept_drift import ConceptDriftMonitor
+
+# Built-in sample models; they are registered at startup and trained on first use
+SAMPLE_MODELS = {
+    "iris_classifier": {
+        "type": "classification",
+        "features": ["sepal_length", "sepal_width", "petal_length", "petal_width"],
+        "target": "species"
+    },
+    "diabetes_regressor": {
+        "type": "regression",
+        "features": ["age", "sex", "bmi", "bp", "s1", "s2", "s3", "s4", "s5", "s6"],
+        "target": "disease_progression"
+    }
+}
 
 class ModelMonitoringService:
     """Service for ML model monitoring and drift detection"""
     
     def __init__(self):
-        self.models = {}
+        # Active version of every model, as immutable info dicts. Deploys build a new
+        # dict and swap it in whole, so readers never lock and never see a half-updated model.
+        self.models: Dict[str, Dict[str, Any]] = {}
+        # Every version loaded so far, including candidates, by (model, version)
+        self.versions: Dict[Tuple[str, str], Dict[str, Any]] = {}
         self.model_path = "models"
         os.makedirs(self.model_path, exist_ok=True)
+        self.registry = ModelRegistry(self.model_path)
+        self.reference_store = ReferenceStore(os.path.join(self.model_path, "references"))
+        self.model_cache = ModelCache(settings.model_cache_max_mb * 1024 * 1024)
+        self.prediction_cache = PredictionCache(settings.prediction_cache_max_mb * 1024 * 1024, settings.prediction_cache_ttl)
+        for model_name in settings.prediction_cache_models:
+            self.prediction_cache.enable(model_name)
+        self.latency = LatencyTracker()
+        self.shadow = ShadowScorer(self.score_version, max_pending=settings.shadow_max_pending_batches)
+        self.drift_engine = DriftEngine(min_samples=settings.drift_min_samples)
+        self.performance_tracker = PerformanceTracker(settings.performance_bucket_seconds)
+        self.drift_monitor = StreamingDriftMonitor(
+            self.drift_engine,
+            snapshot_path=str(settings.DATA_PATH / "drift_windows"),
+            window_type=settings.drift_window_type,
+            window_unit=settings.drift_window_unit,
+            window_size=settings.drift_window_size,
+            n_slices=settings.drift_window_slices,
+            min_samples=settings.drift_min_samples,
+            snapshot_interval=settings.drift_snapshot_interval,
+            sample_size=settings.multivariate_drift_max_samples
+        )
+        self.multivariate_drift = MultivariateDriftDetector(
+            max_samples=settings.multivariate_drift_max_samples,
+            n_fourier_features=settings.multivariate_drift_fourier_features,
+            n_permutations=settings.multivariate_drift_permutations,
+            significance=settings.multivariate_drift_significance,
+            min_samples=settings.drift_min_samples
+        )
+        self.concept_drift = ConceptDriftMonitor(
+            adwin_delta=settings.concept_drift_adwin_delta,
+            ph_delta=settings.concept_drift_ph_delta,
+            ph_threshold=settings.concept_drift_ph_threshold,
+            min_samples=settings.concept_drift_min_samples,
+            max_pending=settings.concept_drift_max_pending
+        )
+        self.performance_tracker.on_errors = self._update_error_stream
+        # Serializes deploys and activations; predictions never take it
+        self._deploy_lock = threading.RLock()
+        # Registry generation whose active versions are published
+        self._registry_generation = self.registry.generation
         
-        # Initialize with sample models
-        self._initialize_sample_models()
+        # Register models without loading or training any of them
+        for model_name in self.registry.models():
+            version = self.registry.active_version(model_name)
+            if version is not None:
+                self._publish(self._version_info(model_name, version), resume_window=True)
+        for model_name, spec in SAMPLE_MODELS.items():
+            if model_name not in self.models:
+                # Sample models get their first version when they are first used
+                self.models = {**self.models, model_name: {"model_name": model_name, "version": None, **spec}}
     
-    def _initialize_sample_models(self):
-        """Initialize with sample ML models"""
-        # Sample classification model (Iris dataset)
-        from sklearn.ensemble import RandomForestClassifier
-        from sklearn.datasets import load_iris
-        from sklearn.model_selection import train_test_split
+    def _version_info(self, model_name: str, version: str) -> Dict[str, Any]:
+        """Metadata, compiled vectorizer and mapped references of one model version"""
+        model_info = self.versions.get((model_name, version))
+        if model_info is not None:
+            return model_info
         
-        # Load iris dataset
-        iris = load_iris()
-        X, y = iris.data, iris.target
+        meta = self.registry.version_meta(model_name, version)
+        model_info = {
+            "model_name": model_name,
+            "version": version,
+            "file_path": meta["file_path"],
+            "type": meta["type"],
+            "features": list(meta["features"]),
+            "target": meta["target"],
+            "vectorizer": FeatureVectorizer(meta["features"])
+        }
+        self._load_references(model_info)
+        self.versions[(model_name, version)] = model_info
+        return model_info
+    
+    def _active(self, model_name: str) -> Dict[str, Any]:
+        """Info of the model's active version; sample models are trained on first use"""
+        self.registry.refresh()
+        if self.registry.generation != self._registry_generation:
+            self._sync_registry()
+        model_info = self.models.get(model_name)
+        if model_info is None:
+            raise ValueError(f"Model {model_name} not found")
+        if model_info["version"] is None:
+            with self._deploy_lock:
+                if self.models[model_name]["version"] is None:
+                    self.deploy_sample_model(model_name, model_info["type"])
+            model_info = self.models[model_name]
+        return model_info
+    
+    def _sync_registry(self) -> None:
+        """Publish the versions other processes activated since the registry was last read"""
+        with self._deploy_lock:
+            generation = self.registry.generation
+            for model_name in self.registry.models():
+                version = self.registry.active_version(model_name)
+                current = self.models.get(model_name)
+                if version is not None and (current is None or current["version"] != version):
+                    self._publish(self._version_info(model_name, version))
+            self._registry_generation = generation
+    
+    def ensure_active(self, model_name: str) -> Dict[str, Any]:
+        """Info of the model's active version, training a sample model's first version if needed
         
-        # Train a simple model
-        model = RandomForestClassifier(n_estimators=10, random_state=42)
-        model.fit(X, y)
+        Async routes call this from the threadpool before touching a model
+        that has no version yet, so first-use training never runs on the
+        event loop.
+        """
+        return self._active(model_name)
+    
+    def _publish(self, model_info: Dict[str, Any], resume_window: bool = False) -> None:
+        """Make a loaded version the active one with a single reference swap"""
+        model_name = model_info["model_name"]
+        previous = self.models.get(model_name)
+        self.models = {**self.models, model_name: model_info}
         
-        # Save model
-        model_file = os.path.join(self.model_path, "iris_classifier.pkl")
-        with open(model_file, 'wb') as f:
-            pickle.dump(model, f)
-        
-        self.models["iris_classifier"] = {
-            "model": model,
-            "file_path": model_file,
-            "type": "classification",
-            "features": ["sepal_length", "sepal_width", "petal_length", "petal_width"],
-            "target": "species",
-            "version": "1.0"
-        }
+        if "reference" in model_info:
+            # A new version starts a new drift window; a restart resumes the saved one
+            self.drift_monitor.register(
+                model_name, model_info["reference"], model_info["prediction_reference"], resume=resume_window
+            )
+        # Results and projections of the previous version must not outlive it
+        self.prediction_cache.invalidate(model_name)
+        self.multivariate_drift.invalidate(model_name)
+        if previous is not None and previous["version"] != model_info["version"]:
+            self.concept_drift.reset(model_name)
+        if previous is not None and previous["version"] not in (None, model_info["version"]):
+            # Requests still running on the old version keep their own reference to it
+            self.model_cache.invalidate(f"{model_name}@{previous['version']}")
+            self.model_cache.invalidate(f"{model_name}@{previous['version']}:flat")
+    
+    def get_model(self, model_name: str, version: Optional[str] = None) -> Any:
+        """Get a fitted model version, the active one by default, loading it on first use"""
+        model_info = self._active(model_name) if version is None else self._version_info(model_name, version)
+        return self._fitted(model_info)
+    
+    def _fitted(self, model_info: Dict[str, Any]) -> Any:
+        key = f"{model_info['model_name']}@{model_info['version']}"
+        return self.model_cache.get(key, lambda: load_model(model_info["file_path"], settings.model_mmap_mode))
+    
+    def _flat(self, model_info: Dict[str, Any]) -> Optional[FlatTreeEnsemble]:
+        """Compiled tree arrays of a model version, or None if it can't run on the flat backend"""
+        key = f"{model_info['model_name']}@{model_info['version']}:flat"
+        return self.model_cache.get(key, lambda: self._load_flat_model(model_info))
+    
+    def get_flat_model(self, model_name: str) -> Optional[FlatTreeEnsemble]:
+        """Get the compiled tree arrays of the active version, or None if it can't run on the flat backend"""
+        return self._flat(self._active(model_name))
+    
+    def _load_flat_model(self, model_info: Dict[str, Any]) -> Optional[FlatTreeEnsemble]:
+        model_name = model_info["model_name"]
+        model = self._fitted(model_info)
+        if not can_compile(model):
+            return None
         
-        # Sample regression model
-        from sklearn.linear_model import LinearRegression
-        from sklearn.datasets import load_boston
-        
-        # Load boston dataset
-        boston = load_boston()
-        X_reg, y_reg = boston.data, boston.target
-        
-        # Train regression model
-        reg_model = LinearRegression()
-        reg_model.fit(X_reg, y_reg)
-        
-        # Save model
-        reg_model_file = os.path.join(self.model_path, "boston_regressor.pkl")
-        with open(reg_model_file, 'wb') as f:
-            pickle.dump(reg_model, f)
-        
-        self.models["boston_regressor"] = {
-            "model": reg_model,
-            "file_path": reg_model_file,
-            "type": "regression",
-            "features": boston.feature_names.tolist(),
-            "target": "price",
-            "version": "1.0"
-        }
+        # Version IDs are content hashes, so a compiled file never goes stale
+        flat_file = model_info["file_path"][:-len(ARTIFACT_EXTENSION)] + f".flat{ARTIFACT_EXTENSION}"
+        if os.path.exists(flat_file):
+            return load_model(flat_file, settings.model_mmap_mode)
+        
+        try:
+            flat = FlatTreeEnsemble.from_sklearn(model)
+        except ValueError as e:
+            print(f"Cannot compile model {model_name} for flat inference: {e}")
+            return None
+        
+        # Only switch backends when outputs match sklearn exactly
+        if not verify(model, flat, self._verification_sample(model_info)):
+            print(f"Flat inference output differs from sklearn for model {model_name}, not using it")
+            return None
+        
+        save_model(flat, flat_file)
+        return load_model(flat_file, settings.model_mmap_mode)
+    
+    def _verification_sample(self, model_info: Dict[str, Any], n_rows: int = 2048) -> np.ndarray:
+        """Random rows spanning the model's reference feature ranges"""
+        rng = np.random.default_rng(0)
+        if "reference" not in model_info:
+            return rng.standard_normal((n_rows, len(model_info["features"])))
+        
+        reference = model_info["reference"]
+        margin = 0.1 * (reference.upper - reference.lower)
+        return rng.uniform(reference.lower - margin, reference.upper + margin, (n_rows, reference.n_features))
     
-    def deploy_sample_model(self, model_name: str, model_type: str = "classification") -> Dict[str, Any]:
-        """Deploy a sample model"""
-        if model_name in self.models:
-            return {
-                "version": self.models[model_name]["version"],
-                "type": self.models[model_name]["type"],
-                "features": self.models[model_name]["features"]
-            }
-        
-        # Create a new sample model
-        if model_type == "classification":
+    def _train_sample_model(self, model_name: str, model_type: str, random_state: int = 42) -> Tuple[Any, np.ndarray]:
+        """Train a sample model and return it with its training features"""
+        if model_name == "iris_classifier":
             from sklearn.ensemble import RandomForestClassifier
-            from sklearn.datasets import make_classification
+            from sklearn.datasets import load_iris
             
-            X, y = make_classification(n_samples=1000, n_features=4, random_state=42)
-            model = RandomForestClassifier(n_estimators=10, random_state=42)
-            model.fit(X, y)
+            X, y = load_iris(return_X_y=True)
+            model = RandomForestClassifier(n_estimators=10, random_state=random_state)
+        elif model_name == "diabetes_regressor":
+            from sklearn.linear_model import LinearRegression
+            from sklearn.datasets import load_diabetes
             
-            features = [f"feature_{i}" for i in range(4)]
+            X, y = load_diabetes(return_X_y=True)
+            model = LinearRegression()
+        elif model_type == "classification":
+            from sklearn.ensemble import RandomForestClassifier
+            from sklearn.datasets import make_classification
+            
+            X, y = make_classification(n_samples=1000, n_features=4, random_state=random_state)
+            model = RandomForestClassifier(n_estimators=10, random_state=random_state)
         else:
             from sklearn.linear_model import LinearRegression
             from sklearn.datasets import make_regression
             
-            X, y = make_regression(n_samples=1000, n_features=4, random_state=42)
+            X, y = make_regression(n_samples=1000, n_features=4, random_state=random_state)
             model = LinearRegression()
-            model.fit(X, y)
-            
-            features = [f"feature_{i}" for i in range(4)]
-        
-        # Save model
-        model_file = os.path.join(self.model_path, f"{model_name}.pkl")
-        with open(model_file, 'wb') as f:
-            pickle.dump(model, f)
-        
-        self.models[model_name] = {
-            "model": model,
-            "file_path": model_file,
-            "type": model_type,
-            "features": features,
-            "target": "target",
-            "version": "1.0"
+        
+        model.fit(X, y)
+        return model, X
+    
+    def deploy_sample_model(
+        self,
+        model_name: str,
+        model_type: str = "classification",
+        random_state: int = 42,
+        activate: bool = True
+    ) -> Dict[str, Any]:
+        """Train a sample model and deploy it as a new version
+        
+        Existing models keep their type and features. Training the same
+        model again yields the same content hash, so it maps to the
+        existing version instead of adding one.
+        """
+        current = self.models.get(model_name)
+        if current is not None:
+            spec = {key: current[key] for key in ("type", "features", "target")}
+        else:
+            spec = {"type": model_type, "features": [f"feature_{i}" for i in range(4)], "target": "target"}
+        
+        model, X = self._train_sample_model(model_name, spec["type"], random_state)
+        return self.deploy_version(model_name, model, X, spec, activate)
+    
+    def deploy_version(
+        self,
+        model_name: str,
+        model: Any,
+        X: np.ndarray,
+        spec: Dict[str, Any],
+        activate: bool = True
+    ) -> Dict[str, Any]:
+        """Store a fitted model as a version, preload and warm it up, then optionally make it active
+        
+        `X` is the training data its reference sketch is built from. The
+        active version keeps serving until the new one is ready.
+        """
+        with self._deploy_lock:
+            version, created = self.registry.add_version(model_name, model, spec)
+            if not self.reference_store.exists(model_name, version):
+                self._store_reference(model_name, version, model, X)
+            model_info = self._version_info(model_name, version)
+            warmup_ms = self._warm_up(model_info)
+            if activate:
+                self._activate(model_info)
+        
+        return {
+            "version": version,
+            "type": model_info["type"],
+            "features": model_info["features"],
+            "created": created,
+            "active": self.models[model_name]["version"] == version,
+            "warmup_ms": warmup_ms
         }
+    
+    def activate_version(self, model_name: str, version: str) -> Dict[str, Any]:
+        """Make a stored version active, e.g. to roll back; it is warmed up before the swap"""
+        with self._deploy_lock:
+            model_info = self._version_info(model_name, version)
+            warmup_ms = self._warm_up(model_info)
+            self._activate(model_info)
+        return {"model_name": model_name, "version": version, "active": True, "warmup_ms": warmup_ms}
+    
+    def _activate(self, model_info: Dict[str, Any]) -> None:
+        self._publish(model_info)
+        self.registry.set_active(model_info["model_name"], model_info["version"])
+    
+    def _warm_up(self, model_info: Dict[str, Any]) -> float:
+        """Map the artifact and run it once, so the first live requests don't pay for loading"""
+        start = time.perf_counter()
+        sample = self._verification_sample(model_info, settings.model_warmup_rows)
+        if settings.tree_inference_backend == "flat":
+            self._flat(model_info)
+        # One single-row and one batch call exercise both backends
+        self._predict_array(model_info, sample[:1])
+        self._predict_array(model_info, sample)
+        return round((time.perf_counter() - start) * 1000, 2)
+    
+    def get_versions(self, model_name: str) -> List[Dict[str, Any]]:
+        """Stored versions of a model, oldest first"""
+        self._active(model_name)
+        return self.registry.versions(model_name)
+    
+    def score_version(self, model_name: str, version: str, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """Run a specific version over X without touching drift windows or caches"""
+        return self._predict_array(self._version_info(model_name, version), X)
+    
+    def set_shadow(self, model_name: str, version: str, sample_rate: float) -> Dict[str, Any]:
+        """Score a sample of live traffic with a candidate version, after preloading it"""
+        active = self._active(model_name)
+        model_info = self._version_info(model_name, version)
+        if version == active["version"]:
+            raise ValueError(f"Version {version} is already active for model {model_name}")
+        
+        warmup_ms = self._warm_up(model_info)
+        self.shadow.set_shadow(model_name, version, sample_rate, model_info["type"])
+        return {"model_name": model_name, "candidate_version": version, "sample_rate": sample_rate, "warmup_ms": warmup_ms}
+    
+    def _store_reference(self, model_name: str, version: str, model: Any, X: np.ndarray) -> None:
+        """Sketch training-time feature and prediction distributions for drift checks"""
+        features = self.registry.version_meta(model_name, version)["features"]
+        sketch = ReferenceSketch.build(pd.DataFrame(X, columns=features), model.predict(X))
+        self.reference_store.save(model_name, version, sketch)
+    
+    def _load_references(self, model_info: Dict[str, Any]) -> bool:
+        """Map the stored reference sketch of a version, if it has one"""
+        model_name, version = model_info["model_name"], model_info["version"]
+        if not self.reference_store.exists(model_name, version):
+            return False
         
+        sketch = self.reference_store.load(model_name, version)
+        model_info["reference_sketch"] = sketch
+        model_info["reference"] = sketch.histogram(model_info["features"])
+        model_info["prediction_reference"] = sketch.prediction_histogram()
+        return True
+    
+    def _ensure_references(self, model_name: str) -> Dict[str, Any]:
+        """Active version info of a model, which must have reference distributions"""
+        model_info = self._active(model_name)
+        if "reference" not in model_info:
+            raise ValueError(f"No reference distribution stored for model {model_name}")
+        return model_info
+    
+    def get_references(self, model_name: str) -> Dict[str, Any]:
+        """The active version's feature and prediction reference histograms and reference row sample"""
+        model_info = self._ensure_references(model_name)
         return {
-            "version": "1.0",
-            "type": model_type,
-            "features": features
+            "version": model_info["version"],
+            "features": model_info["features"],
+            "reference": model_info["reference"],
+            "prediction_reference": model_info["prediction_reference"],
+            "sample": model_info["reference_sketch"].sample()
+        }
+    
+    def get_reference_summary(self, model_name: str) -> Dict[str, Any]:
+        """Quantiles, histograms and top categories of a model's training data"""
+        model_info = self._ensure_references(model_name)
+        return {
+            "model_name": model_name,
+            "model_version": model_info["version"],
+            "file_path": self.reference_store.file_path(model_name, model_info["version"]),
+            **model_info["reference_sketch"].summary()
         }
     
     def get_deployed_models(self) -> List[str]:
         """Get list of deployed models"""
         return list(self.models.keys())
     
+    def get_active_version(self, model_name: str) -> str:
+        return self._active(model_name)["version"]
+    
     def make_prediction(self, model_name: str, features: Dict[str, Any]) -> Dict[str, Any]:
         """Make a prediction using the deployed model"""
-        if model_name not in self.models:
-            raise ValueError(f"Model {model_name} not found")
-        
-        model_info = self.models[model_name]
-        model = model_info["model"]
-        
-        # Convert features to array
-        feature_values = []
-        for feature in model_info["features"]:
-            if feature in features:
-                feature_values.append(features[feature])
-            else:
-                feature_values.append(0.0)  # Default value
-        
-        X = np.array([feature_values])
-        
-        # Make prediction
-        if model_info["type"] == "classification":
-            prediction = model.predict(X)[0]
-            confidence = max(model.predict_proba(X)[0]) if hasattr(model, 'predict_proba') else 0.8
-        else:
-            prediction = model.predict(X)[0]
-            confidence = 0.9  # For regression, we'll use a fixed confidence
+        X = self.vectorize(model_name, features).reshape(1, -1)
+        result = self.predict_batch(model_name, X)
+        return self.prediction_result(model_name, result["predictions"][0], result["confidence"][0], result["version"])
+    
+    def get_vectorizer(self, model_name: str) -> FeatureVectorizer:
+        """Get the compiled feature vectorizer of a model's active version"""
+        return self._active(model_name)["vectorizer"]
+    
+    def vectorize(self, model_name: str, features: Union[Dict[str, Any], List[Any]]) -> np.ndarray:
+        """Convert a feature dict or positional list to a row in the model's feature order
         
+        Raises MissingFeaturesError listing any feature the input lacks.
+        """
+        model_info = self._active(model_name)
+        start = time.perf_counter_ns()
+        row = model_info["vectorizer"].from_row(features)
+        self.latency.since(start, model_name, model_info["version"], "vectorize")
+        return row
+    
+    def record_latency(self, model_name: str, stage: str, start_ns: int, rows: int = 1, version: Optional[str] = None) -> None:
+        """Record the time since a perf_counter_ns() reading, under the active version by default"""
+        self.latency.since(start_ns, model_name, version or self._active(model_name)["version"], stage, rows)
+    
+    def prediction_result(self, model_name: str, prediction: float, confidence: float, version: Optional[str] = None) -> Dict[str, Any]:
+        """Build the response for a single prediction made by `version`, the active one by default"""
+        model_info = self._active(model_name) if version is None else self._version_info(model_name, version)
         return {
             "prediction": float(prediction),
             "confidence": float(confidence),
@@ -159,68 +444,205 @@ class ModelMonitoringService:
             "features_used": model_info["features"]
         }
     
-    def check_model_drift(self, model_name: str) -> List[Dict[str, Any]]:
-        """Check for model drift using various methods"""
-        if model_name not in self.models:
-            raise ValueError(f"Model {model_name} not found")
+    def predict_batch(self, model_name: str, X: np.ndarray) -> Dict[str, Any]:
+        """Make predictions for a (rows, features) matrix in one vectorized call
         
-        model_info = self.models[model_name]
-        model = model_info["model"]
+        The whole batch runs on the version that is active when it starts,
+        which is returned under "version".
+        """
+        model_info = self._active(model_name)
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(model_info["features"]):
+            raise ValueError(f"Expected a matrix with {len(model_info['features'])} feature columns")
         
-        drift_results = []
+        start = time.perf_counter_ns()
+        if self.prediction_cache.is_enabled(model_name):
+            result = self._predict_cached(model_info, X)
+        else:
+            result = self._predict_array(model_info, X)
+        self.latency.since(start, model_name, model_info["version"], "inference", len(X))
+        # Cached rows are still traffic, so they count towards drift windows
+        self.drift_monitor.update_batch(model_name, X, result["predictions"])
+        self.shadow.offer(model_name, model_info["version"], X, result)
+        if settings.concept_drift_enabled and model_info["type"] == "classification":
+            # Regressors report a constant confidence, so only their errors are watched
+            self.concept_drift.update(model_name, "confidence", result["confidence"])
+        result["version"] = model_info["version"]
+        return result
+    
+    def _predict_cached(self, model_info: Dict[str, Any], X: np.ndarray) -> Dict[str, np.ndarray]:
+        """Serve rows scored before from the prediction cache and run the model on the rest"""
+        model_name, version = model_info["model_name"], model_info["version"]
+        digests = self.prediction_cache.digests(X)
+        cached = self.prediction_cache.get_many(model_name, version, digests)
         
-        # Simulate feature drift detection
-        for feature in model_info["features"]:
-            # Simulate drift score (in real implementation, this would compare distributions)
-            drift_score = random.uniform(0.1, 0.3)  # Simulated drift score
-            threshold = 0.2
-            
-            drift_results.append({
-                "drift_type": "feature_drift",
-                "drift_score": round(drift_score, 3),
-                "threshold": threshold,
-                "is_drift_detected": drift_score > threshold,
-                "feature_name": feature,
-                "details": f"Feature drift detected for {feature} with score {drift_score:.3f}"
-            })
-        
-        # Simulate prediction drift
-        pred_drift_score = random.uniform(0.05, 0.25)
-        pred_threshold = 0.15
-        
-        drift_results.append({
-            "drift_type": "prediction_drift",
-            "drift_score": round(pred_drift_score, 3),
-            "threshold": pred_threshold,
-            "is_drift_detected": pred_drift_score > pred_threshold,
-            "feature_name": None,
-            "details": f"Prediction drift detected with score {pred_drift_score:.3f}"
-        })
-        
-        # Simulate data drift
-        data_drift_score = random.uniform(0.1, 0.4)
-        data_threshold = 0.25
-        
-        drift_results.append({
-            "drift_type": "data_drift",
-            "drift_score": round(data_drift_score, 3),
-            "threshold": data_threshold,
-            "is_drift_detected": data_drift_score > data_threshold,
-            "feature_name": None,
-            "details": f"Data drift detected with score {data_drift_score:.3f}"
-        })
+        predictions = np.empty(len(X))
+        confidence = np.empty(len(X))
+        missed = [i for i, hit in enumerate(cached) if hit is None]
+        if missed:
+            result = self._predict_array(model_info, X[missed])
+            predictions[missed] = result["predictions"]
+            confidence[missed] = result["confidence"]
+            self.prediction_cache.put_many(
+                model_name,
+                version,
+                [digests[i] for i in missed],
+                result["predictions"],
+                result["confidence"]
+            )
         
-        return drift_results
+        hits = [i for i, hit in enumerate(cached) if hit is not None]
+        if hits:
+            predictions[hits] = [cached[i][0] for i in hits]
+            confidence[hits] = [cached[i][1] for i in hits]
+        return {"predictions": predictions, "confidence": confidence}
     
-    def get_model_performance_metrics(self, model_name: str) -> Dict[str, float]:
-        """Get model performance metrics"""
+    def set_prediction_cache(self, model_name: str, enabled: bool, ttl: Optional[float] = None) -> Dict[str, Any]:
+        """Turn result caching on or off for a model"""
         if model_name not in self.models:
             raise ValueError(f"Model {model_name} not found")
         
-        # Simulate performance metrics
+        if enabled:
+            self.prediction_cache.enable(model_name, ttl)
+        else:
+            self.prediction_cache.disable(model_name)
+        return {"model_name": model_name, "enabled": enabled, "ttl_seconds": self.prediction_cache.enabled.get(model_name)}
+    
+    def batch_from_json(self, model_name: str, payload: Union[Dict[str, List[Any]], List[Any]]) -> np.ndarray:
+        """Build a feature matrix from columnar JSON or a JSON list of rows"""
+        model_info = self._active(model_name)
+        vectorizer = model_info["vectorizer"]
+        start = time.perf_counter_ns()
+        X = vectorizer.from_columns(payload) if isinstance(payload, dict) else vectorizer.from_rows(payload)
+        self.latency.since(start, model_name, model_info["version"], "vectorize", len(X))
+        return X
+    
+    def batch_from_frame(self, model_name: str, df: pd.DataFrame) -> np.ndarray:
+        """Build a feature matrix from a DataFrame of feature columns"""
+        model_info = self._active(model_name)
+        start = time.perf_counter_ns()
+        X = model_info["vectorizer"].from_frame(df)
+        self.latency.since(start, model_name, model_info["version"], "vectorize", len(X))
+        return X
+    
+    def _predict_array(self, model_info: Dict[str, Any], X: np.ndarray) -> Dict[str, np.ndarray]:
+        """Run a model version once over X; classifier labels are derived from predict_proba
+        
+        Small batches of tree models can run on the compiled flat backend.
+        """
+        model = self._fitted(model_info)
+        if settings.tree_inference_backend == "flat" and len(X) <= settings.tree_inference_flat_max_batch:
+            model = self._flat(model_info) or model
+        
+        if model_info["type"] == "classification" and hasattr(model, "predict_proba"):
+            proba = model.predict_proba(X)
+            best = proba.argmax(axis=1)
+            predictions = model.classes_[best].astype(np.float64)
+            confidence = proba[np.arange(len(best)), best]
+        elif model_info["type"] == "classification":
+            predictions = model.predict(X).astype(np.float64)
+            confidence = np.full(len(predictions), 0.8)
+        else:
+            predictions = model.predict(X).astype(np.float64)
+            confidence = np.full(len(predictions), 0.9)  # For regression, we'll use a fixed confidence
+        
+        return {"predictions": predictions, "confidence": confidence}
+
+    def features_from_logs(self, model_name: str, records: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Rebuild feature and prediction arrays from logged prediction metadata"""
+        return self.get_vectorizer(model_name).from_log_records(records)
+    
+    def check_model_drift(
+        self,
+        model_name: str,
+        X: Optional[np.ndarray] = None,
+        predictions: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        """Check recent features and predictions against the active version's reference distributions"""
+        model_info = self._ensure_references(model_name)
+        reference = model_info["reference"]
+        prediction_reference = model_info["prediction_reference"]
+        
+        if X is None:
+            X = np.empty((0, reference.n_features))
+        if predictions is None:
+            predictions = np.empty(0)
+        
+        return self._drift_results(
+            model_info,
+            reference.bin_counts(X),
+            prediction_reference.bin_counts(predictions),
+            X
+        )
+    
+    def check_window_drift(self, model_name: str) -> List[Dict[str, Any]]:
+        """Check drift on the in-memory streaming window, without a database scan"""
+        model_info = self._ensure_references(model_name)
+        feature_counts, prediction_counts = self.drift_monitor.window_counts(model_name)
+        # Multivariate results are reused until new rows reach the window
+        rows, seen = self.drift_monitor.recent_rows(model_name)
+        return self._drift_results(model_info, feature_counts, prediction_counts, rows, window_key=seen)
+    
+    def _drift_results(
+        self,
+        model_info: Dict[str, Any],
+        feature_counts: np.ndarray,
+        prediction_counts: np.ndarray,
+        current_rows: Optional[np.ndarray] = None,
+        window_key: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Score binned counts against a version's references, plus multivariate tests on raw rows
+        
+        Every result carries the "model_version" it was scored against.
+        """
+        model_name = model_info["model_name"]
+        drift_results = self.drift_engine.score_model(
+            model_info["reference"],
+            model_info["prediction_reference"],
+            feature_counts,
+            prediction_counts
+        )
+        
+        sample = model_info["reference_sketch"].sample()
+        if settings.multivariate_drift_enabled and sample is not None and current_rows is not None:
+            test = self.multivariate_drift.test(model_name, sample, current_rows, window_key)
+            drift_results.extend(self.multivariate_drift.drift_results(test))
+        for result in drift_results:
+            result["model_version"] = model_info["version"]
+        return drift_results
+    
+    def record_feedback(self, db: Session, model_name: str, feedback: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Join ground-truth values to logged predictions by prediction ID"""
+        return self.performance_tracker.record_feedback(db, model_name, self._active(model_name)["type"], feedback)
+    
+    def _update_error_stream(self, model_name: str, version: str, errors: np.ndarray) -> None:
+        model_info = self.models.get(model_name)
+        # Late feedback for a replaced version would look like a change in the new one
+        if not settings.concept_drift_enabled or model_info is None or model_info["version"] != version:
+            return
+        self.concept_drift.update(model_name, f"{model_info['type']}_error", errors)
+    
+    def get_concept_drift_state(self, model_name: str) -> Dict[str, Any]:
+        """Detector state of the active version's confidence and error streams"""
+        model_info = self._active(model_name)
         return {
-            "accuracy": random.uniform(0.75, 0.95),
-            "precision": random.uniform(0.70, 0.90),
-            "recall": random.uniform(0.70, 0.90),
-            "f1_score": random.uniform(0.70, 0.90)
-        } 
\ No newline at end of file
+            "model_name": model_name,
+            "model_version": model_info["version"],
+            "streams": self.concept_drift.get_state(model_name),
+            "monitor": self.concept_drift.get_stats()
+        }
+    
+    def get_model_performance_metrics(
+        self,
+        db: Session,
+        model_name: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        version: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get ground-truth performance metrics of a model over a time window
+        
+        Classifiers report accuracy and macro precision, recall and F1;
+        regressors report RMSE, MAE and mean error.
+        """
+        return self.performance_tracker.window_metrics(db, model_name, self._active(model_name)["type"], start, end, version)
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from app.services.model_artifacts import ARTIFACT_EXTENSION, save_model
+
+# Hex digits of the artifact's SHA-256 used as the version ID
+VERSION_DIGITS = 12
+
+def file_sha256(file_path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ModelRegistry:
+    """Versioned model artifacts, addressed by content hash
+
+    A version's ID is the start of the SHA-256 of its artifact and the
+    artifact lives at {path}/{model}/{version}.joblib, so saving the same
+    fitted model twice yields the same version and never overwrites a
+    file in use. The registry file records every version's metadata and
+    which version of each model is active.
+
+    Every app process shares the registry file. Changes are applied to
+    its current contents under an exclusive file lock and written to a
+    temporary file that replaces it, and readers reload it once its
+    modification time changes, checking at most every `refresh_interval`
+    seconds. `generation` counts the loads, so callers can tell when the
+    entries may have changed.
+    """
+
+    def __init__(self, path: str, refresh_interval: float = 1.0):
+        self.path = path
+        self.registry_file = os.path.join(path, "registry.json")
+        self.lock_file = f"{self.registry_file}.lock"
+        self.refresh_interval = refresh_interval
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.generation = 0
+        self._mtime: Optional[int] = None
+        self._checked_at = time.monotonic()
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            mtime = os.stat(self.registry_file).st_mtime_ns
+        except FileNotFoundError:
+            return
+
+        entries = {}
+        with open(self.registry_file) as f:
+            for model_name, entry in json.load(f).items():
+                if "versions" not in entry:
+                    # Registries written before versioning held one unhashed artifact per model
+                    version = entry["version"]
+                    entry = {
+                        "active": version,
+                        "versions": {version: {
+                            "file_path": entry["file_path"],
+                            "sha256": None,
+                            "created_at": None,
+                            "type": entry["type"],
+                            "features": entry["features"],
+                            "target": entry["target"]
+                        }}
+                    }
+                entries[model_name] = entry
+        self.entries = entries
+        self._mtime = mtime
+        self.generation += 1
+
+    def refresh(self) -> None:
+        """Reload the registry file if another process has changed it"""
+        now = time.monotonic()
+        if now - self._checked_at < self.refresh_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.registry_file).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._mtime:
+            with self._lock:
+                self._load()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock held by one process at a time"""
+        with open(self.lock_file, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _update(self, change: Callable[[Dict[str, Dict[str, Any]]], Any]) -> Any:
+        """Apply `change` to the entries as currently on disk and write them back"""
+        with self._lock, self._file_lock():
+            # Picks up versions and activations of other processes, so none are lost
+            self._load()
+            result = change(self.entries)
+            tmp_file = f"{self.registry_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w") as f:
+                f.write(json.dumps(self.entries, indent=2))
+            os.replace(tmp_file, self.registry_file)
+            self._mtime = os.stat(self.registry_file).st_mtime_ns
+        return result
+
+    def models(self) -> List[str]:
+        self.refresh()
+        return list(self.entries)
+
+    def active_version(self, model_name: str) -> Optional[str]:
+        self.refresh()
+        entry = self.entries.get(model_name)
+        return entry["active"] if entry else None
+
+    def version_meta(self, model_name: str, version: str) -> Dict[str, Any]:
+        self.refresh()
+        entry = self.entries.get(model_name)
+        if entry is None or version not in entry["versions"]:
+            raise ValueError(f"Version {version} of model {model_name} not found")
+        return entry["versions"][version]
+
+    def versions(self, model_name: str) -> List[Dict[str, Any]]:
+        """Every stored version of a model, oldest first"""
+        self.refresh()
+        entry = self.entries.get(model_name)
+        if entry is None:
+            raise ValueError(f"Model {model_name} not found")
+        return [
+            {"version": version, "active": version == entry["active"], **meta}
+            for version, meta in sorted(entry["versions"].items(), key=lambda item: item[1]["created_at"] or "")
+        ]
+
+    def add_version(self, model_name: str, model: Any, spec: Dict[str, Any]) -> Tuple[str, bool]:
+        """Store a fitted model as a version of `model_name`; returns (version, whether it is new)
+
+        `spec` holds the version's type, features and target. The version
+        is recorded in the registry file before this returns.
+        """
+        model_dir = os.path.join(self.path, model_name)
+        os.makedirs(model_dir, exist_ok=True)
+        tmp_path = os.path.join(model_dir, f"incoming-{os.getpid()}-{threading.get_ident()}{ARTIFACT_EXTENSION}")
+        save_model(model, tmp_path)
+
+        sha256 = file_sha256(tmp_path)
+        version = sha256[:VERSION_DIGITS]
+        file_path = os.path.join(model_dir, f"{version}{ARTIFACT_EXTENSION}")
+
+        def record(entries: Dict[str, Dict[str, Any]]) -> bool:
+            entry = entries.setdefault(model_name, {"active": None, "versions": {}})
+            if version in entry["versions"]:
+                return False
+            os.replace(tmp_path, file_path)
+            entry["versions"][version] = {
+                "file_path": file_path,
+                "sha256": sha256,
+                "created_at": datetime.now().isoformat(),
+                "type": spec["type"],
+                "features": list(spec["features"]),
+                "target": spec["target"]
+            }
+            return True
+
+        created = self._update(record)
+        if not created:
+            os.remove(tmp_path)
+        return version, created
+
+    def set_active(self, model_name: str, version: str) -> None:
+        def activate(entries: Dict[str, Dict[str, Any]]) -> None:
+            entry = entries.get(model_name)
+            if entry is None or version not in entry["versions"]:
+                raise ValueError(f"Version {version} of model {model_name} not found")
+            entry["active"] = version
+
+        self._update(activate)
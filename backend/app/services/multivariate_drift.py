@@ -0,0 +1,266 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+class MultivariateDriftDetector:
+    """Whole-vector drift tests that catch shifts per-feature tests miss
+
+    Two tests compare a reference sample with a current sample:
+
+    - MMD: squared distance between the mean random Fourier feature
+      embeddings of both samples, an approximation of the Gaussian-kernel
+      Maximum Mean Discrepancy that is linear in the number of rows.
+    - Domain classifier: out-of-fold ROC AUC of a logistic regression
+      trained to tell the two samples apart; 0.5 means indistinguishable.
+
+    Both samples are capped at `max_samples` rows and every p-value comes
+    from `n_permutations` label permutations, so the cost does not depend
+    on traffic. Results are cached per (model, window key). As in the
+    per-feature checks, drift is only flagged once the current sample
+    has `min_samples` complete rows.
+    """
+
+    def __init__(
+        self,
+        max_samples: int = 500,
+        n_fourier_features: int = 256,
+        n_permutations: int = 200,
+        significance: float = 0.05,
+        cache_size: int = 256,
+        random_state: int = 0,
+        min_samples: int = 1
+    ):
+        self.max_samples = max_samples
+        self.n_fourier_features = n_fourier_features
+        self.n_permutations = n_permutations
+        self.significance = significance
+        self.cache_size = cache_size
+        self.random_state = random_state
+        # A capped sample can never exceed max_samples rows
+        self.min_samples = min(min_samples, max_samples)
+
+        self._cache: "OrderedDict[Tuple[str, Hashable], Dict[str, Any]]" = OrderedDict()
+        # Per-model Fourier projection, fitted on the reference sample
+        self._projections: Dict[str, Dict[str, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def test(
+        self,
+        model_name: str,
+        reference: np.ndarray,
+        current: np.ndarray,
+        window_key: Optional[Hashable] = None
+    ) -> Dict[str, Any]:
+        """Run both tests, reusing the cached result when the window has not changed"""
+        key = (model_name, window_key)
+        if window_key is not None:
+            with self._lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    return self._cache[key]
+
+        rng = np.random.default_rng(self.random_state)
+        ref = self._subsample(reference, rng)
+        cur = self._subsample(current, rng)
+        # Rows with missing values can't be embedded
+        ref = ref[~np.isnan(ref).any(axis=1)]
+        cur = cur[~np.isnan(cur).any(axis=1)]
+
+        if len(ref) < 2 or len(cur) < 2:
+            result = {"mmd": None, "classifier": None, "reference_size": len(ref), "current_size": len(cur)}
+        else:
+            projection = self._projection(model_name, reference)
+            # Standardize on the pooled sample: it treats both sides alike, so the
+            # permutation null holds, while reference-only statistics would leave
+            # the reference rows exactly centered and the current rows not
+            Z = np.vstack([ref, cur])
+            scale = Z.std(axis=0)
+            scale[scale == 0] = 1.0
+            Z = (Z - Z.mean(axis=0)) / scale
+            labels = np.r_[np.zeros(len(ref), dtype=bool), np.ones(len(cur), dtype=bool)]
+            result = {
+                "mmd": self._mmd_test(Z, labels, projection, rng),
+                "classifier": self._classifier_test(Z, labels, rng),
+                "reference_size": len(ref),
+                "current_size": len(cur)
+            }
+
+        if window_key is not None:
+            with self._lock:
+                self._cache[key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    def get_params(self) -> Dict[str, Any]:
+        """Constructor arguments, to build an equivalent detector in another process"""
+        return {
+            "max_samples": self.max_samples,
+            "n_fourier_features": self.n_fourier_features,
+            "n_permutations": self.n_permutations,
+            "significance": self.significance,
+            "random_state": self.random_state,
+            "min_samples": self.min_samples
+        }
+
+    def drift_results(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Model-level drift result dicts
+
+        Both tests score 1 - p-value against 1 - significance, so the score
+        crosses the threshold exactly when the test rejects; the MMD
+        statistic and the classifier AUC are kept in the details.
+        """
+        sizes = {"reference_size": result["reference_size"], "current_size": result["current_size"]}
+        threshold = round(1.0 - self.significance, 6)
+        enough_samples = result["current_size"] >= self.min_samples
+        results = []
+        if result["mmd"] is not None:
+            results.append({
+                "drift_type": "multivariate_mmd",
+                "drift_score": round(1.0 - result["mmd"]["p_value"], 4),
+                "threshold": threshold,
+                "is_drift_detected": result["mmd"]["is_drift_detected"] and enough_samples,
+                "feature_name": None,
+                "details": {
+                    "statistic": round(result["mmd"]["statistic"], 6),
+                    "p_value": round(result["mmd"]["p_value"], 4),
+                    "bandwidth": round(result["mmd"]["bandwidth"], 3),
+                    **sizes
+                }
+            })
+        if result["classifier"] is not None:
+            results.append({
+                "drift_type": "multivariate_classifier",
+                "drift_score": round(1.0 - result["classifier"]["p_value"], 4),
+                "threshold": threshold,
+                "is_drift_detected": result["classifier"]["is_drift_detected"] and enough_samples,
+                "feature_name": None,
+                "details": {
+                    "auc": round(result["classifier"]["auc"], 3),
+                    "p_value": round(result["classifier"]["p_value"], 4),
+                    **sizes
+                }
+            })
+        return results
+
+    def invalidate(self, model_name: str) -> None:
+        """Forget the projection and cached results of a model, e.g. after redeploying it"""
+        with self._lock:
+            self._projections.pop(model_name, None)
+            for key in [key for key in self._cache if key[0] == model_name]:
+                del self._cache[key]
+
+    def _subsample(self, X: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) <= self.max_samples:
+            return X
+        return X[rng.choice(len(X), self.max_samples, replace=False)]
+
+    def _projection(self, model_name: str, reference: np.ndarray) -> Dict[str, np.ndarray]:
+        """Random Fourier weights, with the bandwidth set by the median heuristic on the standardized reference"""
+        with self._lock:
+            if model_name in self._projections:
+                return self._projections[model_name]
+
+        rng = np.random.default_rng(self.random_state)
+        ref = self._subsample(reference, rng)
+        ref = ref[~np.isnan(ref).any(axis=1)]
+        mean = ref.mean(axis=0)
+        scale = ref.std(axis=0)
+        scale[scale == 0] = 1.0
+        z = (ref - mean) / scale
+
+        # Median pairwise distance over at most 200 rows
+        z_small = z[:200]
+        sq_norms = (z_small ** 2).sum(axis=1)
+        distances = np.sqrt(np.maximum(sq_norms[:, None] + sq_norms[None, :] - 2 * z_small @ z_small.T, 0))
+        bandwidth = float(np.median(distances[np.triu_indices(len(z_small), k=1)])) or 1.0
+
+        projection = {
+            "weights": rng.normal(scale=1.0 / bandwidth, size=(z.shape[1], self.n_fourier_features)),
+            "offsets": rng.uniform(0, 2 * np.pi, size=self.n_fourier_features),
+            "bandwidth": bandwidth
+        }
+        with self._lock:
+            self._projections[model_name] = projection
+        return projection
+
+    def _mmd_test(
+        self,
+        Z: np.ndarray,
+        labels: np.ndarray,
+        projection: Dict[str, np.ndarray],
+        rng: np.random.Generator
+    ) -> Dict[str, Any]:
+        features = np.sqrt(2.0 / self.n_fourier_features) * np.cos(Z @ projection["weights"] + projection["offsets"])
+
+        def mmd(assignments: np.ndarray) -> np.ndarray:
+            # Each row of `assignments` gives +1/n_cur to current rows and -1/n_ref to reference rows
+            n_cur = assignments.sum(axis=-1, keepdims=True)
+            weights = np.where(assignments, 1.0 / n_cur, -1.0 / (assignments.shape[-1] - n_cur))
+            difference = weights @ features
+            return (difference ** 2).sum(axis=-1)
+
+        observed = float(mmd(labels[None, :])[0])
+        permuted = mmd(rng.permuted(np.tile(labels, (self.n_permutations, 1)), axis=1))
+        p_value = (1 + int((permuted >= observed).sum())) / (1 + self.n_permutations)
+        return {
+            "statistic": observed,
+            "p_value": p_value,
+            "is_drift_detected": p_value < self.significance,
+            "bandwidth": projection["bandwidth"]
+        }
+
+    def _classifier_test(self, Z: np.ndarray, labels: np.ndarray, rng: np.random.Generator) -> Dict[str, Any]:
+        from sklearn.linear_model import LogisticRegression
+
+        # Two-fold cross-fitting: every row is scored by a model that never saw it.
+        # Held-out scores are independent of the labels under no drift, so permuting
+        # labels against fixed scores gives the null distribution without refitting.
+        # AUCs are computed and permuted within each fold, since the two models'
+        # scores are not on the same scale.
+        folds = rng.permutation(len(Z)) % 2
+        observed = 0.0
+        permuted = np.zeros(self.n_permutations)
+        for fold in (0, 1):
+            train, test = folds != fold, folds == fold
+            held_out = labels[test]
+            n_pos = int(held_out.sum())
+            n_neg = len(held_out) - n_pos
+            if labels[train].all() or not labels[train].any() or n_pos == 0 or n_neg == 0:
+                observed += 0.25
+                permuted += 0.25
+                continue
+
+            classifier = LogisticRegression(C=0.1, max_iter=200)
+            classifier.fit(Z[train], labels[train])
+            ranks = _average_ranks(classifier.decision_function(Z[test]))
+
+            def auc(assignments: np.ndarray) -> np.ndarray:
+                return ((assignments * ranks).sum(axis=-1) - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+            observed += 0.5 * float(auc(held_out[None, :])[0])
+            permuted += 0.5 * auc(rng.permuted(np.tile(held_out, (self.n_permutations, 1)), axis=1))
+
+        # One-sided: only above-chance separation is drift; below-chance AUCs come from
+        # cross-fitting on near-duplicate rows, where each fold learns the opposite label
+        p_value = (1 + int((permuted >= observed).sum())) / (1 + self.n_permutations)
+        return {
+            "auc": observed,
+            "p_value": p_value,
+            "is_drift_detected": p_value < self.significance
+        }
+
+def _average_ranks(values: np.ndarray) -> np.ndarray:
+    """1-based ranks with ties sharing their average rank"""
+    order = np.argsort(values, kind="mergesort")
+    sorted_values = values[order]
+    ranks = np.empty(len(values))
+    ranks[order] = np.arange(1, len(values) + 1)
+    # Average ties
+    unique, inverse, counts = np.unique(sorted_values, return_inverse=True, return_counts=True)
+    if len(unique) < len(values):
+        sums = np.bincount(inverse, weights=np.arange(1, len(values) + 1))
+        ranks[order] = (sums / counts)[inverse]
+    return ranks
@@ -0,0 +1,346 @@
+import os
+import queue
+import random
+import smtplib
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.message import Message
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import and_, func, or_, update
+
+from app.models.alerts import Notification
+
+class SmtpConnectionPool:
+    """Authenticated SMTP connections kept open and reused across messages
+
+    A connection is opened, upgraded with STARTTLS and logged in once, then
+    returned to the pool after each message. Connections idle for longer
+    than `idle_timeout` are checked with NOOP before reuse, since servers
+    drop quiet clients; one that fails the check or a send is closed
+    instead of returned.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: Optional[str],
+        password: Optional[str],
+        use_tls: bool = True,
+        size: int = 4,
+        timeout: float = 30.0,
+        idle_timeout: float = 60.0
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+
+        # (connection, returned at) of idle connections
+        self._idle: "queue.LifoQueue" = queue.LifoQueue(size)
+        self.opened = 0
+        self.reused = 0
+
+    def _open(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.user and self.password:
+                server.login(self.user, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        self.opened += 1
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _acquire(self) -> smtplib.SMTP:
+        while True:
+            try:
+                server, returned_at = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+            if time.monotonic() - returned_at < self.idle_timeout:
+                self.reused += 1
+                return server
+            try:
+                if server.noop()[0] == 250:
+                    self.reused += 1
+                    return server
+            except smtplib.SMTPException:
+                pass
+            self._close(server)
+
+    def _release(self, server: smtplib.SMTP) -> None:
+        try:
+            self._idle.put_nowait((server, time.monotonic()))
+        except queue.Full:
+            self._close(server)
+
+    def send(self, message: Message) -> None:
+        """Send on a pooled connection, retrying once on a fresh one if the server dropped it"""
+        for attempt in range(2):
+            server = self._acquire()
+            try:
+                server.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                self._close(server)
+                if attempt == 1:
+                    raise
+                continue
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                # The server rejected this message but the session is still usable
+                try:
+                    server.rset()
+                    self._release(server)
+                except Exception:
+                    self._close(server)
+                raise
+            except Exception:
+                self._close(server)
+                raise
+            self._release(server)
+            return
+
+    def close(self) -> None:
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(server)
+
+class NotificationDispatcher:
+    """Delivers queued notifications from a table in the background
+
+    `enqueue` only inserts a row, so callers never wait on a mail server.
+    One thread claims due rows and hands them to a thread pool per
+    channel, whose size is the channel's concurrency limit; rows are only
+    claimed while the channel has a free worker. Failed deliveries are
+    retried with exponential backoff and jitter until `max_attempts`.
+    A claim holds a row for `claim_timeout` seconds; rows still "sending"
+    after that, e.g. because their dispatcher's process died, are claimed
+    again by any dispatcher.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        senders: Dict[str, Callable[[Dict[str, Any]], None]],
+        concurrency: Optional[Dict[str, int]] = None,
+        max_attempts: int = 5,
+        backoff_base: float = 2.0,
+        backoff_max: float = 300.0,
+        poll_interval: float = 1.0,
+        claim_timeout: float = 300.0
+    ):
+        self.session_factory = session_factory
+        # channel -> function delivering one payload, raising on failure
+        self.senders = senders
+        self.concurrency = {channel: (concurrency or {}).get(channel, 1) for channel in senders}
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.claim_timeout = claim_timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self.sent: Dict[str, int] = {channel: 0 for channel in senders}
+        self.retried: Dict[str, int] = {channel: 0 for channel in senders}
+        self.failed: Dict[str, int] = {channel: 0 for channel in senders}
+        self._in_flight: Dict[str, int] = {channel: 0 for channel in senders}
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, channel: str, payload: Dict[str, Any], alert_id: Optional[int] = None) -> int:
+        """Persist a notification for delivery; returns its queue id"""
+        if channel not in self.senders:
+            raise ValueError(f"Unknown notification channel: {channel}")
+
+        now = datetime.now()
+        db = self.session_factory()
+        try:
+            notification = Notification(
+                channel=channel,
+                alert_id=alert_id,
+                payload=payload,
+                status="pending",
+                attempts=0,
+                next_attempt_at=now,
+                created_at=now
+            )
+            db.add(notification)
+            db.commit()
+            notification_id = notification.id
+        finally:
+            db.close()
+        self._wake.set()
+        return notification_id
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._pools = {
+            channel: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"notify-{channel}")
+            for channel, limit in self.concurrency.items()
+        }
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop claiming rows and wait for deliveries in progress"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+        self._pools = {}
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                claimed = self._dispatch_due()
+            except Exception as e:
+                print(f"Error dispatching notifications: {e}")
+                claimed = 0
+            if not claimed:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _dispatch_due(self) -> int:
+        """Claim due rows for every channel with free workers and submit them"""
+        claimed = 0
+        now = datetime.now()
+        # Due rows, and rows whose sender's claim ran out; claims of older releases have no expiry
+        claimable = or_(
+            and_(Notification.status == "pending", Notification.next_attempt_at <= now),
+            and_(
+                Notification.status == "sending",
+                or_(Notification.claimed_until == None, Notification.claimed_until < now)
+            )
+        )
+        db = self.session_factory()
+        try:
+            for channel, limit in self.concurrency.items():
+                with self._lock:
+                    free = limit - self._in_flight[channel]
+                if free <= 0:
+                    continue
+
+                rows = db.query(Notification.id, Notification.payload, Notification.attempts)\
+                    .filter(Notification.channel == channel)\
+                    .filter(claimable)\
+                    .order_by(Notification.next_attempt_at)\
+                    .limit(free)\
+                    .all()
+                for row in rows:
+                    # Conditional update, so another dispatcher process can't claim it too
+                    result = db.execute(
+                        update(Notification)
+                        .where(Notification.id == row.id)
+                        .where(claimable)
+                        .values(
+                            status="sending",
+                            claimed_by=self.owner,
+                            claimed_until=now + timedelta(seconds=self.claim_timeout)
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                    db.commit()
+                    if result.rowcount == 0:
+                        continue
+                    with self._lock:
+                        self._in_flight[channel] += 1
+                    self._pools[channel].submit(self._deliver, channel, row.id, row.payload, row.attempts)
+                    claimed += 1
+        finally:
+            db.close()
+        return claimed
+
+    def _deliver(self, channel: str, notification_id: int, payload: Dict[str, Any], attempts: int) -> None:
+        try:
+            self.senders[channel](payload)
+            values = {"status": "sent", "attempts": attempts + 1, "sent_at": datetime.now(), "last_error": None}
+            self.sent[channel] += 1
+        except Exception as e:
+            attempts += 1
+            if attempts >= self.max_attempts:
+                values = {"status": "failed", "attempts": attempts, "last_error": str(e)}
+                self.failed[channel] += 1
+                print(f"Giving up on {channel} notification {notification_id} after {attempts} attempts: {e}")
+            else:
+                delay = min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max) * random.uniform(0.5, 1.0)
+                values = {
+                    "status": "pending",
+                    "attempts": attempts,
+                    "next_attempt_at": datetime.now() + timedelta(seconds=delay),
+                    "last_error": str(e)
+                }
+                self.retried[channel] += 1
+
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                update(Notification)
+                .where(Notification.id == notification_id)
+                .where(Notification.claimed_by == self.owner)
+                .values(claimed_by=None, claimed_until=None, **values)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            if result.rowcount == 0:
+                # The claim ran out and another dispatcher took the row over
+                print(f"Notification {notification_id} was claimed by another dispatcher while being sent")
+        except Exception as e:
+            print(f"Error recording delivery of notification {notification_id}: {e}")
+        finally:
+            db.close()
+            with self._lock:
+                self._in_flight[channel] -= 1
+            # A worker is free again
+            self._wake.set()
+
+    def get_stats(self, db: Optional[Any] = None) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "running": self._thread is not None,
+            "channels": {
+                channel: {
+                    "concurrency": self.concurrency[channel],
+                    "in_flight": self._in_flight[channel],
+                    "sent": self.sent[channel],
+                    "retried": self.retried[channel],
+                    "failed": self.failed[channel]
+                }
+                for channel in self.senders
+            }
+        }
+        if db is not None:
+            queued = db.query(Notification.channel, Notification.status, func.count())\
+                .group_by(Notification.channel, Notification.status)\
+                .all()
+            for channel, status, count in queued:
+                stats["channels"].setdefault(channel, {}).setdefault("queue", {})[status] = count
+        return stats
@@ -0,0 +1,288 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import case, func, insert, update
+from sqlalchemy.orm import Session
+
+from app.models.model_monitoring import ModelPerformance, ModelMetricBucket
+
+def label_key(value: Any) -> str:
+    """Canonical label string, so 1, 1.0 and "1" count as the same class"""
+    try:
+        return format(float(value), "g")
+    except (TypeError, ValueError):
+        return str(value)
+
+class PerformanceTracker:
+    """Joins ground-truth feedback to logged predictions and keeps running metric sums
+
+    Feedback is folded into one row per (model, version, time bucket,
+    confusion matrix cell) for classifiers and one row of error moments per
+    bucket for regressors. Metrics over a window are computed from those
+    rows, so the cost grows with the number of buckets, not predictions.
+    Buckets are aligned to midnight of the prediction's timestamp.
+
+    Feedback is safe across sessions and processes: a prediction's ground
+    truth is set with a conditional UPDATE that only matches it while it
+    has none, only rows that UPDATE claimed are counted, and bucket rows
+    are incremented with an atomic upsert.
+    """
+
+    def __init__(self, bucket_seconds: int = 3600, chunk_size: int = 500):
+        self.bucket_seconds = bucket_seconds
+        self.chunk_size = chunk_size
+        # on_errors(model_name, version, errors) receives the errors of newly labelled
+        # predictions in prediction order: 0/1 misclassifications or absolute errors
+        self.on_errors: Optional[Callable[[str, str, np.ndarray], None]] = None
+
+    def bucket_start(self, timestamp: datetime) -> datetime:
+        timestamp = timestamp.replace(tzinfo=None)
+        day = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+        offset = (timestamp - day).total_seconds() // self.bucket_seconds * self.bucket_seconds
+        return day + timedelta(seconds=offset)
+
+    def record_feedback(
+        self,
+        db: Session,
+        model_name: str,
+        model_type: str,
+        feedback: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Attach actual values to logged predictions and update the bucket sums
+
+        Each item is {"prediction_id": ..., "actual": ...}. Predictions that
+        already have ground truth are skipped, so resending feedback is safe.
+        """
+        actual_by_id = {str(item["prediction_id"]): item["actual"] for item in feedback}
+        ids = list(actual_by_id)
+
+        logged = []
+        for start in range(0, len(ids), self.chunk_size):
+            logged.extend(
+                db.query(
+                    ModelPerformance.id,
+                    ModelPerformance.prediction_id,
+                    ModelPerformance.model_version,
+                    ModelPerformance.timestamp,
+                    ModelPerformance.metadata_,
+                    ModelPerformance.ground_truth
+                )
+                .filter(ModelPerformance.model_name == model_name)
+                .filter(ModelPerformance.prediction_id.in_(ids[start:start + self.chunk_size]))
+                .all()
+            )
+
+        pending = [row for row in logged if row.ground_truth is None]
+        # Feedback for the same predictions racing in another session loses here
+        claimed = self._claim(db, {row.id: label_key(actual_by_id[row.prediction_id]) for row in pending})
+
+        cells: Dict[Tuple[str, datetime, str, str], List[float]] = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+        errors: Dict[str, List[Tuple[datetime, float]]] = defaultdict(list)
+        for row in pending:
+            if row.id not in claimed:
+                continue
+            actual = actual_by_id[row.prediction_id]
+            predicted = (row.metadata_ or {}).get("prediction")
+            bucket = self.bucket_start(row.timestamp)
+            if model_type == "classification":
+                cell = cells[(row.model_version, bucket, label_key(actual), label_key(predicted))]
+                cell[0] += 1
+                errors[row.model_version].append((row.timestamp, float(label_key(actual) != label_key(predicted))))
+            else:
+                error = float(predicted) - float(actual)
+                cell = cells[(row.model_version, bucket, "", "")]
+                cell[0] += 1
+                cell[1] += error
+                cell[2] += error * error
+                cell[3] += abs(error)
+                errors[row.model_version].append((row.timestamp, abs(error)))
+
+        self._add_to_cells(db, model_name, cells)
+        db.commit()
+
+        if self.on_errors is not None:
+            for version, timed_errors in errors.items():
+                timed_errors.sort(key=lambda item: item[0])
+                self.on_errors(model_name, version, np.array([error for _, error in timed_errors]))
+
+        matched = {row.prediction_id for row in logged}
+        return {
+            "received": len(ids),
+            "recorded": len(claimed),
+            "duplicates": len(logged) - len(claimed),
+            # Unknown IDs may belong to predictions the log writer has not flushed yet
+            "unmatched_prediction_ids": [pid for pid in ids if pid not in matched]
+        }
+
+    def _claim(self, db: Session, labels: Dict[int, str]) -> Set[int]:
+        """Set ground truth on the given prediction rows that still have none; returns the ids it set"""
+        claimed = set()
+        ids = list(labels)
+        for start in range(0, len(ids), self.chunk_size):
+            chunk = ids[start:start + self.chunk_size]
+            statement = update(ModelPerformance)\
+                .where(ModelPerformance.id.in_(chunk))\
+                .where(ModelPerformance.ground_truth.is_(None))\
+                .values(ground_truth=case({row_id: labels[row_id] for row_id in chunk}, value=ModelPerformance.id))\
+                .execution_options(synchronize_session=False)
+            if db.get_bind().dialect.update_returning:
+                claimed.update(row[0] for row in db.execute(statement.returning(ModelPerformance.id)))
+                continue
+            for row_id in chunk:
+                result = db.execute(
+                    update(ModelPerformance)
+                    .where(ModelPerformance.id == row_id)
+                    .where(ModelPerformance.ground_truth.is_(None))
+                    .values(ground_truth=labels[row_id])
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount:
+                    claimed.add(row_id)
+        return claimed
+
+    def _add_to_cells(
+        self,
+        db: Session,
+        model_name: str,
+        cells: Dict[Tuple[str, datetime, str, str], List[float]]
+    ) -> None:
+        """Add feedback sums to bucket rows in the caller's transaction; the caller commits"""
+        rows = [
+            {
+                "model_name": model_name,
+                "model_version": version,
+                "bucket_start": bucket,
+                "actual_label": actual_label,
+                "predicted_label": predicted_label,
+                "count": count,
+                "sum_error": sum_error,
+                "sum_squared_error": sum_squared_error,
+                "sum_abs_error": sum_abs_error
+            }
+            for (version, bucket, actual_label, predicted_label), (count, sum_error, sum_squared_error, sum_abs_error) in cells.items()
+        ]
+        if not rows:
+            return
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            for row in rows:
+                self._update_or_insert(db, row)
+            return
+
+        statement = upsert(ModelMetricBucket)
+        new = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=["model_name", "model_version", "bucket_start", "actual_label", "predicted_label"],
+            set_={
+                "count": ModelMetricBucket.count + new["count"],
+                "sum_error": ModelMetricBucket.sum_error + new.sum_error,
+                "sum_squared_error": ModelMetricBucket.sum_squared_error + new.sum_squared_error,
+                "sum_abs_error": ModelMetricBucket.sum_abs_error + new.sum_abs_error
+            }
+        )
+        db.execute(statement, rows)
+
+    def _update_or_insert(self, db: Session, row: Dict[str, Any]) -> None:
+        result = db.execute(
+            update(ModelMetricBucket)
+            .where(ModelMetricBucket.model_name == row["model_name"])
+            .where(ModelMetricBucket.model_version == row["model_version"])
+            .where(ModelMetricBucket.bucket_start == row["bucket_start"])
+            .where(ModelMetricBucket.actual_label == row["actual_label"])
+            .where(ModelMetricBucket.predicted_label == row["predicted_label"])
+            .values(
+                count=ModelMetricBucket.count + row["count"],
+                sum_error=ModelMetricBucket.sum_error + row["sum_error"],
+                sum_squared_error=ModelMetricBucket.sum_squared_error + row["sum_squared_error"],
+                sum_abs_error=ModelMetricBucket.sum_abs_error + row["sum_abs_error"]
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(ModelMetricBucket).values(**row))
+
+    def window_metrics(
+        self,
+        db: Session,
+        model_name: str,
+        model_type: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        version: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Metrics over the buckets whose predictions fall in [start, end)"""
+        query = db.query(
+            ModelMetricBucket.actual_label,
+            ModelMetricBucket.predicted_label,
+            func.sum(ModelMetricBucket.count),
+            func.sum(ModelMetricBucket.sum_error),
+            func.sum(ModelMetricBucket.sum_squared_error),
+            func.sum(ModelMetricBucket.sum_abs_error)
+        ).filter(ModelMetricBucket.model_name == model_name)
+
+        if version:
+            query = query.filter(ModelMetricBucket.model_version == version)
+        if start:
+            query = query.filter(ModelMetricBucket.bucket_start >= self.bucket_start(start))
+        if end:
+            query = query.filter(ModelMetricBucket.bucket_start < end.replace(tzinfo=None))
+
+        rows = query.group_by(ModelMetricBucket.actual_label, ModelMetricBucket.predicted_label).all()
+        if model_type == "classification":
+            return classification_metrics({(row[0], row[1]): int(row[2]) for row in rows})
+        return regression_metrics(
+            sum(int(row[2]) for row in rows),
+            sum(row[3] for row in rows),
+            sum(row[4] for row in rows),
+            sum(row[5] for row in rows)
+        )
+
+def classification_metrics(confusion: Dict[Tuple[str, str], int]) -> Dict[str, Any]:
+    """Accuracy and macro-averaged precision, recall and F1 from confusion matrix cells"""
+    labels = sorted({label for cell in confusion for label in cell})
+    total = sum(confusion.values())
+    if total == 0:
+        return {"accuracy": None, "precision": None, "recall": None, "f1_score": None, "sample_size": 0}
+
+    per_class = {}
+    for label in labels:
+        tp = confusion.get((label, label), 0)
+        predicted = sum(count for (_, p), count in confusion.items() if p == label)
+        actual = sum(count for (a, _), count in confusion.items() if a == label)
+        precision = tp / predicted if predicted else 0.0
+        recall = tp / actual if actual else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        per_class[label] = {"precision": precision, "recall": recall, "f1_score": f1, "support": actual}
+
+    # Macro averages over every actual or predicted label, as sklearn computes them
+    return {
+        "accuracy": sum(confusion.get((label, label), 0) for label in labels) / total,
+        "precision": sum(m["precision"] for m in per_class.values()) / len(labels),
+        "recall": sum(m["recall"] for m in per_class.values()) / len(labels),
+        "f1_score": sum(m["f1_score"] for m in per_class.values()) / len(labels),
+        "sample_size": total,
+        "per_class": per_class,
+        "confusion_matrix": {
+            "labels": labels,
+            "matrix": [[confusion.get((actual, predicted), 0) for predicted in labels] for actual in labels]
+        }
+    }
+
+def regression_metrics(count: int, sum_error: float, sum_squared_error: float, sum_abs_error: float) -> Dict[str, Any]:
+    """RMSE, MAE and mean error (bias) from running error sums"""
+    if count == 0:
+        return {"rmse": None, "mae": None, "mean_error": None, "sample_size": 0}
+    return {
+        "rmse": math.sqrt(sum_squared_error / count),
+        "mae": sum_abs_error / count,
+        "mean_error": sum_error / count,
+        "sample_size": count
+    }
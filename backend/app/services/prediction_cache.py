@@ -0,0 +1,143 @@
+import hashlib
+import sys
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Estimated bytes per entry: key and value tuples, the digest, expiry and two results, and the dict slot.
+# Model name and version strings are shared between entries and not counted.
+ENTRY_BYTES = 2 * sys.getsizeof((None, None, None)) + sys.getsizeof(b"") + 16 + 3 * sys.getsizeof(0.0) + 2 * 8 + 32
+
+class PredictionCache:
+    """Results of previously scored feature vectors, for models that opt in
+
+    Keys are a 128-bit BLAKE2b digest of the canonicalized float64 row
+    (-0.0 folded into 0.0, one NaN bit pattern), taken together with the
+    model version, so a cached result is never served for another
+    version. Entries expire after a per-model TTL and the least recently
+    used ones are evicted once the estimated size passes `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int, default_ttl: float = 300.0):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        # model name -> TTL in seconds; models not listed are not cached
+        self.enabled: Dict[str, float] = {}
+        self.entries: "OrderedDict[Tuple[str, str, bytes], Tuple[float, float, float]]" = OrderedDict()
+        self.resident_bytes = 0
+
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.expirations = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def enable(self, model_name: str, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self.enabled[model_name] = self.default_ttl if ttl is None else ttl
+            self.hits.setdefault(model_name, 0)
+            self.misses.setdefault(model_name, 0)
+
+    def disable(self, model_name: str) -> None:
+        with self._lock:
+            self.enabled.pop(model_name, None)
+        self.invalidate(model_name)
+
+    def is_enabled(self, model_name: str) -> bool:
+        return model_name in self.enabled
+
+    @staticmethod
+    def digests(X: np.ndarray) -> List[bytes]:
+        """Digest of every row of X after canonicalizing signed zeros and NaNs"""
+        X = np.ascontiguousarray(X, dtype=np.float64) + 0.0
+        X[np.isnan(X)] = np.nan
+        return [hashlib.blake2b(row, digest_size=16).digest() for row in X]
+
+    def get_many(self, model_name: str, version: str, digests: Iterable[bytes]) -> List[Optional[Tuple[float, float]]]:
+        """Cached (prediction, confidence) per digest, None for misses and expired entries"""
+        now = time.monotonic()
+        found = []
+        hits = 0
+        with self._lock:
+            for digest in digests:
+                key = (model_name, version, digest)
+                entry = self.entries.get(key)
+                if entry is not None and entry[0] <= now:
+                    self._remove(key)
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    found.append(None)
+                    continue
+                self.entries.move_to_end(key)
+                found.append((entry[1], entry[2]))
+                hits += 1
+
+            self.hits[model_name] = self.hits.get(model_name, 0) + hits
+            self.misses[model_name] = self.misses.get(model_name, 0) + len(found) - hits
+        return found
+
+    def put_many(
+        self,
+        model_name: str,
+        version: str,
+        digests: Iterable[bytes],
+        predictions: Iterable[float],
+        confidence: Iterable[float]
+    ) -> None:
+        with self._lock:
+            ttl = self.enabled.get(model_name)
+            if ttl is None:
+                return
+            expires = time.monotonic() + ttl
+            for digest, prediction, conf in zip(digests, predictions, confidence):
+                key = (model_name, version, digest)
+                if key in self.entries:
+                    self._remove(key)
+                self.entries[key] = (expires, float(prediction), float(conf))
+                self.resident_bytes += ENTRY_BYTES
+
+            while self.resident_bytes > self.max_bytes and self.entries:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate(self, model_name: str) -> int:
+        """Drop every cached result of a model, e.g. when it is redeployed"""
+        with self._lock:
+            keys = [key for key in self.entries if key[0] == model_name]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def _remove(self, key: Tuple[str, str, bytes]) -> None:
+        del self.entries[key]
+        self.resident_bytes -= ENTRY_BYTES
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sizes: Dict[str, int] = {}
+            for model_name, _, _ in self.entries:
+                sizes[model_name] = sizes.get(model_name, 0) + 1
+
+            models = {}
+            for model_name in set(self.hits) | set(self.enabled):
+                hits = self.hits.get(model_name, 0)
+                lookups = hits + self.misses.get(model_name, 0)
+                models[model_name] = {
+                    "enabled": model_name in self.enabled,
+                    "ttl_seconds": self.enabled.get(model_name),
+                    "entries": sizes.get(model_name, 0),
+                    "hits": hits,
+                    "misses": self.misses.get(model_name, 0),
+                    "hit_ratio": round(hits / lookups, 4) if lookups else None
+                }
+            return {
+                "max_bytes": self.max_bytes,
+                "resident_bytes": self.resident_bytes,
+                "entries": len(self.entries),
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "models": models
+            }
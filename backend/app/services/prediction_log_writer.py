@@ -0,0 +1,186 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+class PredictionLogWriter:
+    """Background writer that batches prediction log rows into multi-row INSERTs
+
+    Rows are queued in a bounded ring buffer and written by one thread when
+    a batch fills up or the flush interval passes. When the buffer is full,
+    the "drop" policy discards the oldest queued row and the "block" policy
+    makes the caller wait up to `block_timeout` seconds for space before
+    dropping the new row; coroutines use `submit_async`, which does that
+    waiting in a worker thread instead of on the event loop.
+    `on_write(db, rows)` runs after each INSERT, before its commit. A
+    batch that violates a constraint is retried row by row, so only the
+    offending rows are lost.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        model: Any,
+        max_buffer: int = 100000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        overflow_policy: str = "drop",
+        block_timeout: float = 1.0,
+        on_write: Optional[Callable[[Any, List[Dict[str, Any]]], None]] = None
+    ):
+        if overflow_policy not in ("drop", "block"):
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+
+        self.session_factory = session_factory
+        self.model = model
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.on_write = on_write
+
+        self.buffer: deque = deque()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """Queue one row; returns False if it was dropped"""
+        return self.submit_many([row]) == 1
+
+    async def submit_async(self, row: Dict[str, Any]) -> bool:
+        """Queue one row from a coroutine; a full buffer is only waited on off the event loop"""
+        if self.submit_many([row], wait=False) == 1:
+            return True
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.submit, row)
+
+    def submit_many(self, rows: List[Dict[str, Any]], wait: bool = True) -> int:
+        """Queue rows without waiting on the database; returns how many were accepted
+
+        With `wait` off, the "block" policy stops at a full buffer instead
+        of waiting for space and leaves the remaining rows to the caller.
+        """
+        accepted = 0
+        with self._cond:
+            for row in rows:
+                if len(self.buffer) >= self.max_buffer:
+                    if self.overflow_policy == "drop":
+                        self.buffer.popleft()
+                        self.dropped += 1
+                    elif not wait:
+                        self._cond.notify_all()
+                        break
+                    else:
+                        self._cond.notify_all()
+                        deadline = time.monotonic() + self.block_timeout
+                        while len(self.buffer) >= self.max_buffer:
+                            remaining = deadline - time.monotonic()
+                            if remaining <= 0:
+                                break
+                            self._cond.wait(remaining)
+                        if len(self.buffer) >= self.max_buffer:
+                            self.dropped += 1
+                            continue
+
+                self.buffer.append(row)
+                accepted += 1
+
+            if len(self.buffer) >= self.batch_size:
+                self._cond.notify_all()
+        return accepted
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="prediction-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the writer thread and flush everything still buffered"""
+        if self._thread is not None:
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+            self._thread.join()
+            self._thread = None
+        while self.buffer:
+            self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while self._running and len(self.buffer) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if not self._running:
+                    return
+            self.flush()
+
+    def flush(self) -> int:
+        """Write up to one batch of buffered rows with a single INSERT"""
+        with self._cond:
+            count = min(len(self.buffer), self.batch_size)
+            batch = [self.buffer.popleft() for _ in range(count)]
+            # Wake producers blocked on a full buffer
+            self._cond.notify_all()
+        if not batch:
+            return 0
+
+        try:
+            self._write(batch)
+            self.written += len(batch)
+        except IntegrityError:
+            # e.g. a duplicate prediction ID; the rest of the batch is still written
+            for row in batch:
+                try:
+                    self._write([row])
+                    self.written += 1
+                except Exception as e:
+                    self.failed += 1
+                    print(f"Error writing prediction log row: {e}")
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"Error writing {len(batch)} prediction log rows: {e}")
+        finally:
+            self.flushes += 1
+        return len(batch)
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        """INSERT rows and run on_write in one transaction"""
+        db = self.session_factory()
+        try:
+            db.execute(insert(self.model), rows)
+            if self.on_write is not None:
+                self.on_write(db, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": len(self.buffer),
+            "max_buffer": self.max_buffer,
+            "overflow_policy": self.overflow_policy,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes
+        }
@@ -0,0 +1,173 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.services.drift_engine import ReferenceDistribution
+
+MAGIC = b"REFSKT01"
+# Arrays start on 64-byte boundaries so they can be mapped in place
+ALIGNMENT = 64
+
+PREDICTION_FEATURE = "__prediction__"
+
+class ReferenceSketch:
+    """Fixed-size summary of a model version's training data, per feature
+
+    Every feature keeps an equal-width histogram and evenly spaced
+    quantiles. Model predictions are summarized as one more feature. A
+    fixed-size uniform sample of rows is kept for multivariate tests. The
+    size depends on the number of features only, never on the number of
+    training rows.
+    """
+
+    def __init__(self, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        self.meta = meta
+        self.arrays = arrays
+
+    @property
+    def features(self) -> List[str]:
+        return [name for name in self.meta["numeric_features"] if name != PREDICTION_FEATURE]
+
+    @property
+    def n_rows(self) -> int:
+        return self.meta["n_rows"]
+
+    @classmethod
+    def build(
+        cls,
+        data: pd.DataFrame,
+        predictions: Optional[np.ndarray] = None,
+        n_bins: int = 10,
+        n_quantiles: int = 101,
+        sample_size: int = 1000
+    ) -> "ReferenceSketch":
+        """Summarize numeric training data, as the model's feature vectorizer produces it"""
+        features = list(data.columns)
+        X = data.to_numpy(dtype=np.float64)
+        sample_rows = np.random.default_rng(0).choice(len(X), min(sample_size, len(X)), replace=False)
+        # Uniform row sample of the model features for multivariate tests
+        sample = X[np.sort(sample_rows)]
+        if predictions is not None:
+            features.append(PREDICTION_FEATURE)
+            X = np.column_stack([X, np.asarray(predictions, dtype=np.float64)])
+
+        histogram = ReferenceDistribution.from_data(features, X, n_bins)
+        arrays = {
+            "lower": histogram.lower,
+            "upper": histogram.upper,
+            "histogram": histogram.counts,
+            "quantiles": np.nanquantile(X, np.linspace(0, 1, n_quantiles), axis=0).T if len(X) else np.full((len(features), n_quantiles), np.nan),
+            "missing": np.isnan(X).sum(axis=0).astype(np.int64),
+            "sample": sample
+        }
+        return cls({"n_rows": len(data), "numeric_features": features}, arrays)
+
+    def save(self, file_path: str) -> None:
+        """Write the sketch as one binary file: magic, JSON header, then aligned raw arrays"""
+        layout = {}
+        offset = 0
+        for name, array in self.arrays.items():
+            layout[name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+            offset += _aligned(array.nbytes)
+
+        header = json.dumps({**self.meta, "arrays": layout}).encode()
+        header += b" " * (_aligned(len(MAGIC) + 8 + len(header)) - len(MAGIC) - 8 - len(header))
+
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(np.uint64(len(header)).tobytes())
+            f.write(header)
+            for array in self.arrays.values():
+                data = np.ascontiguousarray(array).tobytes()
+                f.write(data + b"\0" * (_aligned(len(data)) - len(data)))
+        os.replace(tmp_path, file_path)
+
+    @classmethod
+    def load(cls, file_path: str) -> "ReferenceSketch":
+        """Map a sketch file read-only; arrays are views into the page cache"""
+        with open(file_path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{file_path} is not a reference sketch file")
+            header_size = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+            meta = json.loads(f.read(header_size))
+
+        data_start = len(MAGIC) + 8 + header_size
+        arrays = {}
+        for name, spec in meta.pop("arrays").items():
+            shape = tuple(spec["shape"])
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.empty(shape, dtype=spec["dtype"])
+            else:
+                arrays[name] = np.memmap(file_path, dtype=spec["dtype"], mode="r", offset=data_start + spec["offset"], shape=shape)
+        return cls(meta, arrays)
+
+    def histogram(self, features: Sequence[str]) -> ReferenceDistribution:
+        """Histograms of the given features, sharing the mapped arrays"""
+        numeric = self.meta["numeric_features"]
+        index = [numeric.index(name) for name in features]
+        # Contiguous ranges stay views of the mapping; other selections are copied
+        contiguous = bool(index) and index == list(range(index[0], index[0] + len(index)))
+        rows = slice(index[0], index[0] + len(index)) if contiguous else index
+        return ReferenceDistribution(
+            list(features),
+            self.arrays["lower"][rows],
+            self.arrays["upper"][rows],
+            self.arrays["histogram"][rows]
+        )
+
+    def feature_histogram(self) -> ReferenceDistribution:
+        return self.histogram([name for name in self.meta["numeric_features"] if name != PREDICTION_FEATURE])
+
+    def prediction_histogram(self) -> ReferenceDistribution:
+        reference = self.histogram([PREDICTION_FEATURE])
+        reference.features = ["prediction"]
+        return reference
+
+    def sample(self) -> Optional[np.ndarray]:
+        """Reference rows of the model features; None for sketches written without one"""
+        return self.arrays.get("sample")
+
+    def quantile(self, feature: str, q: float) -> float:
+        """Approximate quantile of a feature, interpolated between stored quantiles"""
+        quantiles = self.arrays["quantiles"][self.meta["numeric_features"].index(feature)]
+        return float(np.interp(q, np.linspace(0, 1, len(quantiles)), quantiles))
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-feature quantiles and histograms for display"""
+        numeric = {}
+        for i, name in enumerate(self.meta["numeric_features"]):
+            numeric["prediction" if name == PREDICTION_FEATURE else name] = {
+                "min": float(self.arrays["lower"][i]),
+                "max": float(self.arrays["upper"][i]),
+                "missing": int(self.arrays["missing"][i]),
+                "quantiles": {f"p{p}": self.quantile(name, p / 100) for p in (1, 5, 25, 50, 75, 95, 99)},
+                "histogram": self.arrays["histogram"][i].astype(int).tolist()
+            }
+        return {"n_rows": self.n_rows, "numeric": numeric}
+
+def _aligned(size: int) -> int:
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+class ReferenceStore:
+    """Reference sketches on disk, one file per model version"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def file_path(self, model_name: str, version: str) -> str:
+        return os.path.join(self.path, f"{model_name}-{version}.refsketch")
+
+    def exists(self, model_name: str, version: str) -> bool:
+        return os.path.exists(self.file_path(model_name, version))
+
+    def save(self, model_name: str, version: str, sketch: ReferenceSketch) -> str:
+        os.makedirs(self.path, exist_ok=True)
+        file_path = self.file_path(model_name, version)
+        sketch.save(file_path)
+        return file_path
+
+    def load(self, model_name: str, version: str) -> ReferenceSketch:
+        return ReferenceSketch.load(self.file_path(model_name, version))
@@ -0,0 +1,132 @@
+import queue
+import threading
+import time
+import numpy as np
+from typing import Any, Callable, Dict, Optional
+
+class ShadowScorer:
+    """Scores a sample of live traffic with a candidate model version
+
+    The request path only draws the sample and enqueues it; one
+    background thread runs the candidate and compares its output with
+    what the active version returned. When the queue is full, samples
+    are dropped instead of slowing down live predictions.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[[str, str, np.ndarray], Dict[str, np.ndarray]],
+        max_pending: int = 64,
+        random_state: Optional[int] = None
+    ):
+        self.score_fn = score_fn
+        self.max_pending = max_pending
+        # model name -> shadow configuration and comparison counters
+        self.shadows: Dict[str, Dict[str, Any]] = {}
+        self._queue: "queue.Queue" = queue.Queue(max_pending)
+        self._rng = np.random.default_rng(random_state)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def set_shadow(self, model_name: str, version: str, sample_rate: float, model_type: str) -> None:
+        """Start shadowing a model with `version`, resetting its comparison counters"""
+        self.shadows[model_name] = {
+            "version": version,
+            "sample_rate": sample_rate,
+            "model_type": model_type,
+            "started_at": time.time(),
+            "batches": 0,
+            "rows": 0,
+            "dropped": 0,
+            "errors": 0,
+            "agreements": 0,
+            "sum_abs_difference": 0.0,
+            "max_abs_difference": 0.0,
+            "sum_confidence_difference": 0.0,
+            "candidate_ns": 0,
+            "last_error": None
+        }
+        self._ensure_worker()
+
+    def remove(self, model_name: str) -> Optional[Dict[str, Any]]:
+        stats = self.get_stats(model_name)
+        self.shadows.pop(model_name, None)
+        return stats
+
+    def offer(self, model_name: str, active_version: str, X: np.ndarray, result: Dict[str, np.ndarray]) -> None:
+        """Queue a sample of a scored batch for the model's candidate, if it has one"""
+        shadow = self.shadows.get(model_name)
+        if shadow is None or shadow["version"] == active_version:
+            return
+
+        rows = np.flatnonzero(self._rng.random(len(X)) < shadow["sample_rate"])
+        if len(rows) == 0:
+            return
+        try:
+            self._queue.put_nowait((model_name, shadow, X[rows], result["predictions"][rows], result["confidence"][rows]))
+        except queue.Full:
+            shadow["dropped"] += len(rows)
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="shadow-scoring", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            model_name, shadow, X, predictions, confidence = item
+            # Samples queued before the shadow was replaced or removed are discarded
+            if self.shadows.get(model_name) is not shadow:
+                continue
+
+            start = time.perf_counter_ns()
+            try:
+                candidate = self.score_fn(model_name, shadow["version"], X)
+            except Exception as e:
+                shadow["errors"] += len(X)
+                shadow["last_error"] = str(e)
+                continue
+            shadow["candidate_ns"] += time.perf_counter_ns() - start
+
+            difference = np.abs(candidate["predictions"] - predictions)
+            shadow["batches"] += 1
+            shadow["rows"] += len(X)
+            shadow["agreements"] += int((difference == 0).sum())
+            shadow["sum_abs_difference"] += float(difference.sum())
+            shadow["max_abs_difference"] = max(shadow["max_abs_difference"], float(difference.max()))
+            shadow["sum_confidence_difference"] += float((candidate["confidence"] - confidence).sum())
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                self._queue.put(None)
+                self._thread.join()
+            self._thread = None
+
+    def get_stats(self, model_name: str) -> Optional[Dict[str, Any]]:
+        """How the candidate's predictions compare with the active version's on the same rows"""
+        shadow = self.shadows.get(model_name)
+        if shadow is None:
+            return None
+
+        rows = shadow["rows"]
+        stats = {
+            "candidate_version": shadow["version"],
+            "sample_rate": shadow["sample_rate"],
+            "rows_scored": rows,
+            "rows_dropped": shadow["dropped"],
+            "errors": shadow["errors"],
+            "last_error": shadow["last_error"],
+            "mean_confidence_difference": round(shadow["sum_confidence_difference"] / rows, 6) if rows else None,
+            "candidate_ms_per_batch": round(shadow["candidate_ns"] / shadow["batches"] / 1e6, 4) if shadow["batches"] else None
+        }
+        if shadow["model_type"] == "classification":
+            stats["agreement"] = round(shadow["agreements"] / rows, 6) if rows else None
+        else:
+            stats["mean_abs_difference"] = round(shadow["sum_abs_difference"] / rows, 6) if rows else None
+            stats["max_abs_difference"] = round(shadow["max_abs_difference"], 6)
+        return stats
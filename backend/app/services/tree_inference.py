@@ -0,0 +1,145 @@
+import numpy as np
+from typing import Any, Optional
+
+class FlatTreeEnsemble:
+    """A fitted sklearn forest or tree compiled into flat contiguous node arrays
+
+    Nodes of all trees are concatenated into single feature, threshold,
+    children and value arrays, with each node's left and right child stored
+    side by side. Leaves point to themselves and compare against +inf, so a
+    batch of rows walks every tree at once with a fixed number of
+    vectorized steps, one per tree level. predict and predict_proba mirror
+    the sklearn estimator they were compiled from.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        n_features: int,
+        classes_: Optional[np.ndarray] = None
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.classes_ = classes_
+
+    @property
+    def is_classifier(self) -> bool:
+        return self.classes_ is not None
+
+    @property
+    def left(self) -> np.ndarray:
+        return self.children[:, 0]
+
+    @property
+    def right(self) -> np.ndarray:
+        return self.children[:, 1]
+
+    @classmethod
+    def from_sklearn(cls, model: Any) -> "FlatTreeEnsemble":
+        """Compile a fitted single-output forest or decision tree"""
+        estimators = getattr(model, "estimators_", None)
+        if estimators is None:
+            estimators = [model]
+        trees = [estimator.tree_ for estimator in estimators]
+        if any(tree.n_outputs != 1 for tree in trees):
+            raise ValueError("Only single-output tree models can be compiled")
+
+        classes = getattr(model, "classes_", None)
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+        features, thresholds, children, values = [], [], [], []
+        for tree, offset in zip(trees, offsets[:-1]):
+            nodes = np.arange(tree.node_count, dtype=np.int64) + offset
+            is_leaf = tree.children_left < 0
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            children.append(np.column_stack([
+                np.where(is_leaf, nodes, tree.children_left + offset),
+                np.where(is_leaf, nodes, tree.children_right + offset)
+            ]))
+
+            value = tree.value[:, 0, :]
+            # Older sklearn stores class counts and normalizes them at predict time;
+            # newer releases store the fractions directly and return them as is
+            if classes is not None and not np.allclose(value.sum(axis=1), 1.0):
+                normalizer = value.sum(axis=1, keepdims=True)
+                normalizer[normalizer == 0.0] = 1.0
+                value = value / normalizer
+            values.append(value)
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            children=np.ascontiguousarray(np.concatenate(children), dtype=np.intp),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.ascontiguousarray(offsets[:-1], dtype=np.intp),
+            max_depth=int(max(tree.max_depth for tree in trees)),
+            n_features=int(model.n_features_in_),
+            classes_=None if classes is None else np.asarray(classes)
+        )
+
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node index reached in every tree, shaped (rows, trees)"""
+        # Trees compare float32 inputs against float64 thresholds, like sklearn
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.intp) * self.n_features)[:, None]
+
+        children = self.children.ravel()
+
+        node = np.repeat(self.roots[None, :], n_rows, axis=0)
+        for _ in range(self.max_depth):
+            # Negated so NaN goes right, as in sklearn
+            go_right = ~(flat_X[row_offsets + self.feature[node]] <= self.threshold[node])
+            node = children[2 * node + go_right]
+        return node
+
+    def _accumulate(self, X: np.ndarray, chunk_size: int) -> np.ndarray:
+        X = np.asarray(X)
+        out = np.zeros((X.shape[0], self.value.shape[1]))
+        n_trees = len(self.roots)
+
+        for start in range(0, X.shape[0], chunk_size):
+            node = self.leaves(X[start:start + chunk_size])
+            acc = out[start:start + chunk_size]
+            # Sum trees in estimator order so results match sklearn bit for bit
+            for t in range(n_trees):
+                acc += self.value[node[:, t]]
+        out /= n_trees
+        return out
+
+    def predict_proba(self, X: np.ndarray, chunk_size: int = 512) -> np.ndarray:
+        if not self.is_classifier:
+            raise ValueError("predict_proba is only available for classifiers")
+        return self._accumulate(X, chunk_size)
+
+    def predict(self, X: np.ndarray, chunk_size: int = 512) -> np.ndarray:
+        result = self._accumulate(X, chunk_size)
+        if self.is_classifier:
+            return self.classes_[result.argmax(axis=1)]
+        return result[:, 0]
+
+def can_compile(model: Any) -> bool:
+    """Whether a model is a tree or forest the flat backend can run"""
+    estimators = getattr(model, "estimators_", None)
+    if isinstance(estimators, list) and estimators:
+        return all(hasattr(estimator, "tree_") for estimator in estimators)
+    return hasattr(model, "tree_")
+
+def verify(model: Any, flat: FlatTreeEnsemble, X: np.ndarray) -> bool:
+    """Check that the flat backend reproduces the model's outputs exactly on X"""
+    if flat.is_classifier:
+        return np.array_equal(flat.predict_proba(X), model.predict_proba(X))
+    return np.array_equal(flat.predict(X), model.predict(X))
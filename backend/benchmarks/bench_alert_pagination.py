@@ -0,0 +1,126 @@
+"""Alert listing cost by page depth, keyset cursors against OFFSET
+
+Usage: python benchmarks/bench_alert_pagination.py [n_alerts]
+
+Builds a SQLite database of n_alerts (10M by default, a few GB and some
+minutes to load) with the listing indexes, then times page 1 and deep
+pages for several filter combinations.
+"""
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text, tuple_
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateIndex
+
+from app.core.database import Base
+from app.models.alerts import Alert
+from app.services.alert_service import AlertService, encode_cursor
+
+N_ALERTS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+PAGE_SIZE = 50
+PAGES = [1, 100, 10_000, 100_000]
+N_RUNS = 5
+CHUNK = 500_000
+FILTERS = [
+    {},
+    {"severity": "high"},
+    {"alert_type": "data_quality", "is_resolved": False},
+    {"alert_type": "model_drift", "severity": "critical", "is_resolved": True}
+]
+
+def load(db_file: str) -> None:
+    """Bulk load alerts with the indexes dropped, then build them"""
+    engine = create_engine(f"sqlite:///{db_file}")
+    Base.metadata.create_all(bind=engine, tables=[Alert.__table__])
+    engine.dispose()
+    conn = sqlite3.connect(db_file)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    for index in Alert.__table__.indexes:
+        conn.execute(f"DROP INDEX {index.name}")
+    conn.commit()
+
+    rng = np.random.default_rng(0)
+    start_time = datetime(2024, 1, 1)
+    types = np.array(["data_quality", "model_drift", "system"])
+    severities = np.array(["low", "medium", "high", "critical"])
+    start = time.perf_counter()
+    for offset in range(0, N_ALERTS, CHUNK):
+        n = min(CHUNK, N_ALERTS - offset)
+        # Roughly one alert every three seconds, in insertion order
+        seconds = np.sort(rng.uniform(offset * 3, (offset + n) * 3, n))
+        alert_types = types[rng.integers(0, 3, n)]
+        alert_severities = severities[rng.choice(4, n, p=[0.4, 0.3, 0.2, 0.1])]
+        resolved = rng.random(n) < 0.9
+        conn.executemany(
+            "INSERT INTO alerts (alert_type, severity, title, message, source, is_resolved, created_at, occurrence_count) "
+            "VALUES (?, ?, 'Alert', 'Alert message', 'source', ?, ?, 1)",
+            (
+                (alert_types[i], alert_severities[i], int(resolved[i]),
+                 (start_time + timedelta(seconds=float(seconds[i]))).isoformat(sep=" "))
+                for i in range(n)
+            )
+        )
+        conn.commit()
+    print(f"loaded {N_ALERTS} alerts in {time.perf_counter() - start:.0f} s")
+
+    start = time.perf_counter()
+    for index in Alert.__table__.indexes:
+        conn.execute(str(CreateIndex(index).compile(engine)))
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    print(f"built {len(Alert.__table__.indexes)} indexes in {time.perf_counter() - start:.0f} s")
+
+def timed(fn) -> float:
+    fn()
+    times = []
+    for _ in range(N_RUNS):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+def main():
+    db_file = os.path.join(tempfile.mkdtemp(), "alerts.db")
+    load(db_file)
+    engine = create_engine(f"sqlite:///{db_file}")
+    db = sessionmaker(bind=engine)()
+    service = AlertService()
+
+    for filters in FILTERS:
+        print(f"filters {filters or 'none'}:")
+        query = db.query(Alert)
+        for column, value in filters.items():
+            query = query.filter(getattr(Alert, column) == value)
+        query = query.order_by(Alert.created_at.desc(), Alert.id.desc())
+        # Plan of a page after a cursor
+        keyset = query.filter(tuple_(Alert.created_at, Alert.id) < tuple_(datetime(2024, 6, 1), 1)).limit(PAGE_SIZE)
+        plan = db.execute(text("EXPLAIN QUERY PLAN " + str(keyset.statement.compile(
+            engine, compile_kwargs={"literal_binds": True}))))
+        print(f"  plan: {'; '.join(row[-1] for row in plan)}")
+
+        for page in PAGES:
+            # The cursor a client would hold after reading page - 1 pages
+            cursor = None
+            if page > 1:
+                previous = query.offset((page - 1) * PAGE_SIZE - 1).first()
+                if previous is None:
+                    break
+                cursor = encode_cursor(previous)
+
+            keyset_ms = timed(lambda: service.list_alerts(db, cursor=cursor, limit=PAGE_SIZE, **filters))
+            offset_ms = timed(lambda: query.offset((page - 1) * PAGE_SIZE).limit(PAGE_SIZE).all())
+            print(f"  page {page:>7}: keyset {keyset_ms:7.2f} ms  offset {offset_ms:9.2f} ms")
+
+if __name__ == "__main__":
+    main()
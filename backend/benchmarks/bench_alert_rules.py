@@ -0,0 +1,74 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.alert_rules import AlertRuleEngine
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+N_ROWS = 20000
+N_RUNS = 5
+# The default rules plus a few that compare fields
+RULES = settings.alert_rules + [
+    {"name": "drift_far_over", "source": "drift", "when": {"drift_score": [">", {"field": "threshold", "scale": 2}]}, "severity": "critical"},
+    {"name": "feature_drift", "source": "drift", "when": {"drift_type": ["in", ["feature_drift", "mmd"]], "drift_score": [">=", 0.3]}},
+    {"name": "quality_low_score", "source": "quality", "when": {"score": ["<", 0.5], "check_type": ["!=", "outliers"]}}
+]
+
+def drift_rows(rng, n: int) -> list:
+    scores = rng.uniform(0, 0.6, n)
+    types = ["feature_drift", "prediction_drift", "mmd"]
+    return [
+        {
+            "model_name": f"model_{i % 20}",
+            "drift_type": types[i % 3],
+            "feature_name": f"feature_{i % 50}",
+            "drift_score": float(scores[i]),
+            "threshold": 0.2,
+            "is_drift_detected": bool(scores[i] > 0.2)
+        }
+        for i in range(n)
+    ]
+
+def quality_rows(rng, n: int) -> list:
+    scores = rng.uniform(0, 1, n)
+    checks = ["missing_values", "duplicates", "data_types", "outliers", "completeness"]
+    return [
+        {
+            "source_name": f"source_{i % 20}",
+            "check_type": checks[i % 5],
+            "score": float(scores[i]),
+            "status": "passed" if scores[i] >= 0.8 else "warning" if scores[i] >= 0.5 else "failed",
+            "details": ""
+        }
+        for i in range(n)
+    ]
+
+def main():
+    rng = np.random.default_rng(0)
+    rows = {"drift": drift_rows(rng, N_ROWS), "quality": quality_rows(rng, N_ROWS)}
+    engine = AlertRuleEngine(None, None, RULES)
+    print(f"{len(RULES)} rules, {N_ROWS} results per source")
+
+    for source, source_rows in rows.items():
+        for batch_size in BATCH_SIZES:
+            times = []
+            for _ in range(N_RUNS):
+                start = time.perf_counter()
+                matched = 0
+                for offset in range(0, N_ROWS, batch_size):
+                    matched += len(engine.evaluate(source, source_rows[offset:offset + batch_size]))
+                times.append(time.perf_counter() - start)
+            total = float(np.median(times))
+            per_batch_ms = total * 1000 / -(-N_ROWS // batch_size)
+            print(
+                f"{source:>7} batch {batch_size:>5}: {per_batch_ms:8.3f} ms per batch  "
+                f"{total * 1e6 / N_ROWS:6.2f} us per result  ({matched} matches)"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import sys
+import os
+import tempfile
+import time
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.alerts import Alert
+from app.services.alert_service import AlertService
+
+N_ALERTS = 5000
+
+def make_alerts(service: AlertService, run: str) -> list:
+    return [
+        service.create_model_drift_alert(f"model_{i % 20}_{run}", f"feature_drift (feature_{i})", 0.4, 0.2)
+        for i in range(N_ALERTS)
+    ]
+
+def main():
+    db_file = os.path.join(tempfile.mkdtemp(), "alerts.db")
+    engine = create_engine(f"sqlite:///{db_file}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    service = AlertService()
+    service.counters.sync(db)
+
+    start = time.perf_counter()
+    for alert in make_alerts(service, "single"):
+        service.record_alert(db, alert)
+    create_single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for alert in db.query(Alert).filter(Alert.source.like("%_single")).all():
+        service.resolve_alert(db, alert, "benchmark")
+    resolve_single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_alerts, _, _ = service.record_alerts(db, make_alerts(service, "bulk"))
+    create_bulk = time.perf_counter() - start
+
+    start = time.perf_counter()
+    resolved = service.bulk_resolve(db, service.selection(ids=[alert.id for alert in new_alerts]), "benchmark")
+    resolve_bulk = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reopened = service.bulk_reopen(db, service.selection(created_after=new_alerts[0].created_at))
+    reopen_bulk = time.perf_counter() - start
+
+    print(f"create {N_ALERTS}:  one at a time {create_single:6.2f} s   bulk {create_bulk:6.2f} s ({len(new_alerts)} inserted)")
+    print(f"resolve {N_ALERTS}: one at a time {resolve_single:6.2f} s   bulk {resolve_bulk:6.2f} s ({resolved['resolved']} resolved)")
+    print(f"reopen {N_ALERTS}:  bulk {reopen_bulk:6.2f} s ({reopened['reopened']} reopened)")
+
+    summary = service.counters.summary(db)
+    service.counters.enabled = False
+    assert summary == service.counters.summary(db), "counters out of sync with the alerts table"
+    print(f"counters consistent: {summary['unresolved_alerts']} open, {summary['total_alerts']} total")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.concept_drift import Adwin, PageHinkley, Ddm
+
+N_BEFORE = 20_000
+N_AFTER = 20_000
+BATCH_SIZE = 100
+N_RUNS = 20
+
+def run(detector, stream: np.ndarray) -> list:
+    """Feed a stream in batches and return the positions of detected changes"""
+    detections = []
+    for start in range(0, len(stream), BATCH_SIZE):
+        index = detector.update(stream[start:start + BATCH_SIZE])
+        if index is not None:
+            detections.append(start + index)
+    return detections
+
+def main():
+    rng = np.random.default_rng(0)
+    streams = {
+        # Confidence drops from 0.85 to 0.75
+        "adwin": (lambda: Adwin(), lambda n, after: np.clip(rng.normal(0.75 if after else 0.85, 0.1, n), 0, 1)),
+        "page_hinkley": (lambda: PageHinkley(), lambda n, after: np.clip(rng.normal(0.75 if after else 0.85, 0.1, n), 0, 1)),
+        # Error rate rises from 10% to 20%
+        "ddm": (lambda: Ddm(), lambda n, after: (rng.random(n) < (0.2 if after else 0.1)).astype(np.float64))
+    }
+
+    for name, (make, sample) in streams.items():
+        delays, false_alarms, missed, elapsed = [], 0, 0, 0.0
+        for _ in range(N_RUNS):
+            stream = np.concatenate([sample(N_BEFORE, False), sample(N_AFTER, True)])
+            detector = make()
+            start = time.perf_counter()
+            detections = run(detector, stream)
+            elapsed += time.perf_counter() - start
+            false_alarms += sum(index < N_BEFORE for index in detections)
+            after = [index - N_BEFORE for index in detections if index >= N_BEFORE]
+            if after:
+                delays.append(after[0])
+            else:
+                missed += 1
+
+        per_value_ns = elapsed / (N_RUNS * (N_BEFORE + N_AFTER)) * 1e9
+        delay = f"{np.median(delays):6.0f}" if delays else "     -"
+        print(
+            f"{name:<13} {per_value_ns:6.0f} ns/value  median delay {delay} values  "
+            f"missed {missed}/{N_RUNS}  false alarms {false_alarms} in {N_RUNS * N_BEFORE} values"
+        )
+
+    detector = Adwin()
+    run(detector, rng.random(1_000_000))
+    print(f"ADWIN after 1M values: {detector.get_state()['buckets']} buckets ({detector.totals.nbytes * 2 + detector.counts.nbytes} bytes of state)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import sys
+import os
+import pickle
+import tempfile
+import multiprocessing as mp
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.model_artifacts import save_model, load_model
+
+N_WORKERS = 16
+
+def memory_kb():
+    """Resident and proportional set size of the current process"""
+    stats = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                stats[parts[0][:-1]] = int(parts[1])
+    return stats
+
+def worker(file_path, mmap_mode, n_features, barrier, results):
+    # Import estimator modules first so the baseline excludes them
+    import sklearn.linear_model
+    import sklearn.ensemble
+    baseline = memory_kb()
+    model = load_model(file_path, mmap_mode)
+    model.predict(np.zeros((1, n_features)))
+    # Touch every model array so all pages are resident
+    for value in vars(model).values():
+        if isinstance(value, np.ndarray):
+            float(np.asarray(value, dtype=np.float64).sum())
+    # Measure while every worker holds the model
+    barrier.wait()
+    loaded = memory_kb()
+    barrier.wait()
+    results.put({key: loaded[key] - baseline[key] for key in loaded})
+
+def run(file_path, mmap_mode, n_features):
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(N_WORKERS)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(file_path, mmap_mode, n_features, barrier, results))
+        for _ in range(N_WORKERS)
+    ]
+    for p in processes:
+        p.start()
+    stats = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+    return {key: sum(s[key] for s in stats) / len(stats) / 1024 for key in stats[0]}
+
+def main():
+    from sklearn.linear_model import LinearRegression
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.datasets import make_classification
+    
+    rng = np.random.default_rng(42)
+    
+    # A wide multi-output linear model: 64 MB of coefficients
+    n_features = 20000
+    linear = LinearRegression()
+    linear.coef_ = rng.normal(size=(400, n_features))
+    linear.intercept_ = rng.normal(size=400)
+    linear.n_features_in_ = n_features
+    
+    X, y = make_classification(n_samples=20000, n_features=20, random_state=42)
+    forest = RandomForestClassifier(n_estimators=50, random_state=42).fit(X, y)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = []
+        for name, model, width in (("linear", linear, n_features), ("forest", forest, 20)):
+            pkl_path = os.path.join(tmp, f"{name}.pkl")
+            with open(pkl_path, "wb") as f:
+                pickle.dump(model, f)
+            joblib_path = os.path.join(tmp, f"{name}.joblib")
+            save_model(model, joblib_path)
+            cases.append((name, "pickle", pkl_path, None, width))
+            cases.append((name, "joblib mmap", joblib_path, "r", width))
+        
+        # RSS counts shared pages in full; PSS splits them across the processes mapping them
+        print(f"Workers: {N_WORKERS}")
+        print(f"{'model':<8} {'artifact':<12} {'RSS/worker MB':>14} {'PSS/worker MB':>14}")
+        for name, label, path, mmap_mode, width in cases:
+            stats = run(path, mmap_mode, width)
+            print(f"{name:<8} {label:<12} {stats['Rss']:>14.1f} {stats['Pss']:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Alert email delivery against a local SMTP stand-in
+
+Needs aiosmtpd (pip install aiosmtpd). The stand-in takes SMTP_DELAY
+seconds per message and rejects every FAIL_EVERY-th message once with a
+temporary error, so retries and backoff are exercised too.
+"""
+import sys
+import os
+import asyncio
+import logging
+import smtplib
+import socket
+import tempfile
+import time
+import warnings
+import numpy as np
+from email.mime.text import MIMEText
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult, LoginPassword
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.alerts import Notification
+from app.services.notification_dispatcher import NotificationDispatcher, SmtpConnectionPool
+
+N_MESSAGES = 200
+SMTP_DELAY = 0.02
+FAIL_EVERY = 20
+CONCURRENCY = 4
+
+class SlowHandler:
+    def __init__(self):
+        self.received = 0
+        self.attempts = 0
+        self.connections = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(SMTP_DELAY)
+        self.attempts += 1
+        if self.attempts % FAIL_EVERY == 0:
+            return "451 Temporary failure, try again later"
+        self.received += 1
+        return "250 OK"
+
+def authenticate(server, session, envelope, mechanism, auth_data):
+    ok = isinstance(auth_data, LoginPassword) and auth_data.password == b"secret"
+    return AuthResult(success=ok)
+
+def message(i: int) -> MIMEText:
+    msg = MIMEText(f"Alert {i}")
+    msg["From"] = "alerts@example.com"
+    msg["To"] = "oncall@example.com"
+    msg["Subject"] = f"[HIGH] Alert {i}"
+    return msg
+
+def main():
+    logging.getLogger("mail.log").setLevel(logging.ERROR)
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    host = "127.0.0.1"
+    with socket.socket() as s:
+        s.bind((host, 0))
+        port = s.getsockname()[1]
+    handler = SlowHandler()
+    controller = Controller(handler, hostname=host, port=port, authenticator=authenticate, auth_require_tls=False)
+    controller.start()
+
+    # Inline baseline: a new connection and login per message, as alerts used to be sent
+    start = time.perf_counter()
+    for i in range(20):
+        with smtplib.SMTP(host, port) as server:
+            server.login("alerts", "secret")
+            try:
+                server.send_message(message(i))
+            except smtplib.SMTPResponseException:
+                pass
+    inline_ms = (time.perf_counter() - start) / 20 * 1000
+    print(f"inline send:     {inline_ms:7.2f} ms per alert on the request path")
+
+    db_file = os.path.join(tempfile.mkdtemp(), "notifications.db")
+    engine = create_engine(f"sqlite:///{db_file}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+
+    pool = SmtpConnectionPool(host, port, "alerts", "secret", use_tls=False, size=CONCURRENCY)
+    dispatcher = NotificationDispatcher(
+        session_factory,
+        {"email": lambda payload: pool.send(message(payload["i"]))},
+        concurrency={"email": CONCURRENCY},
+        backoff_base=0.05,
+        poll_interval=0.05
+    )
+    dispatcher.start()
+    handler.received = handler.attempts = handler.connections = 0
+
+    enqueue_ms = []
+    start = time.perf_counter()
+    for i in range(N_MESSAGES):
+        t = time.perf_counter()
+        dispatcher.enqueue("email", {"i": i})
+        enqueue_ms.append((time.perf_counter() - t) * 1000)
+    while handler.received < N_MESSAGES and time.perf_counter() - start < 60:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    dispatcher.stop()
+    pool.close()
+    controller.stop()
+
+    db = session_factory()
+    statuses = dict(db.query(Notification.status, func.count()).group_by(Notification.status).all())
+    db.close()
+
+    print(f"queued enqueue:  {np.median(enqueue_ms):7.2f} ms p50, {np.percentile(enqueue_ms, 99):.2f} ms p99 on the request path")
+    print(f"delivered {handler.received}/{N_MESSAGES} in {elapsed:.2f} s ({handler.received / elapsed:.0f}/s with {CONCURRENCY} workers)")
+    print(f"SMTP connections opened: {pool.opened} ({handler.connections} EHLOs), reused {pool.reused} times")
+    print(f"temporary failures retried: {dispatcher.retried['email']}, given up: {dispatcher.failed['email']}, queue: {statuses}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from app.services.prediction_cache import PredictionCache
+
+BATCH_SIZES = [1, 64, 1_000]
+N_FEATURES = 20
+
+def predict(model, X):
+    return model.predict(X).astype(np.float64), model.predict_proba(X).max(axis=1)
+
+def cached_predict(cache, model, X):
+    """Same flow as ModelMonitoringService._predict_cached"""
+    digests = cache.digests(X)
+    cached = cache.get_many("bench", "1.0", digests)
+    missed = [i for i, hit in enumerate(cached) if hit is None]
+    if missed:
+        predictions, confidence = predict(model, X[missed])
+        cache.put_many("bench", "1.0", [digests[i] for i in missed], predictions, confidence)
+
+def best_time_ms(fn, runs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def _fresh_cache() -> PredictionCache:
+    cache = PredictionCache(64 * 1024 * 1024)
+    cache.enable("bench")
+    return cache
+
+def main():
+    X_train, y_train = make_classification(n_samples=5_000, n_features=N_FEATURES, n_informative=10, random_state=42)
+    model = RandomForestClassifier(n_estimators=100, max_depth=12, random_state=42).fit(X_train, y_train)
+
+    print(f"100 trees, {N_FEATURES} features")
+    print(f"{'batch':>8} {'uncached ms':>12} {'all hits ms':>12} {'all misses ms':>14}")
+    rng = np.random.default_rng(0)
+    for batch_size in BATCH_SIZES:
+        X = rng.normal(size=(batch_size, N_FEATURES))
+        cache = _fresh_cache()
+        cached_predict(cache, model, X)
+
+        uncached_ms = best_time_ms(lambda: predict(model, X), 20)
+        hit_ms = best_time_ms(lambda: cached_predict(cache, model, X), 20)
+        # Fresh cache every run, so every row misses and is inserted
+        miss_ms = best_time_ms(lambda: cached_predict(_fresh_cache(), model, X), 20)
+        print(f"{batch_size:>8,} {uncached_ms:>12.3f} {hit_ms:>12.3f} {miss_ms:>14.3f}")
+
+    cache = _fresh_cache()
+    X = rng.normal(size=(100_000, N_FEATURES))
+    cached_predict(cache, model, X)
+    print(f"\n100,000 entries: ~{cache.resident_bytes / 1024 / 1024:.1f} MB estimated")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from app.services.tree_inference import FlatTreeEnsemble
+
+BATCH_SIZES = [1, 32, 1_000, 100_000]
+N_FEATURES = 20
+
+def best_time_ms(fn, X, runs):
+    fn(X)
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(X)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    X_train, y_train = make_classification(
+        n_samples=10_000, n_features=N_FEATURES, n_informative=10, n_classes=3, random_state=42
+    )
+    
+    for n_estimators, max_depth in [(10, None), (100, 12)]:
+        model = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth, random_state=42)
+        model.fit(X_train, y_train)
+        flat = FlatTreeEnsemble.from_sklearn(model)
+        
+        print(f"\n{n_estimators} trees, max depth {flat.max_depth}, {len(flat.feature):,} nodes")
+        print(f"{'batch':>8} {'sklearn ms':>12} {'flat ms':>10} {'speedup':>8} {'identical':>10}")
+        
+        rng = np.random.default_rng(0)
+        for batch_size in BATCH_SIZES:
+            X = rng.normal(size=(batch_size, N_FEATURES))
+            runs = 3 if batch_size >= 100_000 else 50
+            
+            sklearn_ms = best_time_ms(model.predict_proba, X, runs)
+            flat_ms = best_time_ms(flat.predict_proba, X, runs)
+            identical = np.array_equal(flat.predict_proba(X), model.predict_proba(X))
+            
+            print(f"{batch_size:>8,} {sklearn_ms:>12.3f} {flat_ms:>10.3f} {sklearn_ms / flat_ms:>7.1f}x {str(identical):>10}")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import uvicorn
-from app.main import app
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    # Passed as an import string, so neither spawned drift check workers, which
+    # re-import this module, nor the reloader build the app when importing it
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file